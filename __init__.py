@@ -1,5 +1,26 @@
-# core/__init__.py — inicializa schema/migração ao importar o pacote
-from .database import init_schema, migrate_schema_if_needed
-
-init_schema()
-migrate_schema_if_needed()
+# core/__init__.py — confere a versão do schema (e migra se preciso) ao importar o pacote
+import sys
+
+from . import instrumentacao
+from .database import init_schema, migrate_schema_if_needed
+
+def _processo_filho() -> bool:
+    """True nos processos do pool de importação (multiprocessing "spawn"), que
+       importam o core de novo só para rodar o parse: não mexem no banco."""
+    mp = sys.modules.get("multiprocessing")     # sempre carregado num filho
+    # o nome do processo já vale enquanto o filho importa o __main__ do pai
+    return mp is not None and mp.current_process().name != "MainProcess"
+
+if not _processo_filho():
+    migrate_schema_if_needed()      # banco em dia: só lê PRAGMA user_version
+
+    if instrumentacao.ATIVO:
+        from . import models, ofx_importer
+        instrumentacao.instrumentar_modulo(models)
+        instrumentacao.instrumentar_modulo(ofx_importer)
+        try:
+            from . import export_excel       # depende do openpyxl
+        except ImportError:
+            pass
+        else:
+            instrumentacao.instrumentar_modulo(export_excel)
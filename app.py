@@ -1,7 +1,7 @@
-# app.py — ponto de entrada da aplicação
-from gui.finance_gui import main_window
-
-if __name__ == "__main__":
-    main_window()
-
+# app.py — ponto de entrada da aplicação
+from gui.finance_gui import main_window
+
+if __name__ == "__main__":
+    main_window()
+
     
\ No newline at end of file
@@ -0,0 +1 @@
+# benchmarks/ — medições de desempenho (não fazem parte da aplicação)
@@ -0,0 +1,71 @@
+# benchmarks/bench_load_all.py — compara o load_all antigo (N+1) com o carregamento via JOIN
+#
+# Uso (a partir da raiz do projeto, onde fica o pacote core/):
+#   python -m benchmarks.bench_load_all                 # 10k, 100k e 1M linhas
+#   python -m benchmarks.bench_load_all 10000 50000     # tamanhos escolhidos
+#
+# Cada tamanho gera um banco sintético temporário (benchmarks.gerador); o
+# financeiro.db real não é tocado. Para os demais cenários: benchmarks.suite.
+
+import os
+import sys
+import tempfile
+import time
+
+from . import gerador
+
+TAMANHOS_PADRAO = (10_000, 100_000, 1_000_000)
+
+def _load_all_n_mais_1():
+    """Reprodução do load_all original: um SELECT do nome da conta por linha."""
+    from core.database import conn
+    con = conn(); cur = con.cursor()
+    cur.execute("SELECT id, nome FROM contas_financeiras ORDER BY nome")
+    contas_fin = [{"id": r["id"], "nome": r["nome"]} for r in cur.fetchall()]
+    cur.execute("SELECT nome FROM categorias ORDER BY nome")
+    categorias = [r["nome"] for r in cur.fetchall()]
+    saida = []
+    for tabela, status_col in (("contas_a_pagar", "pago"), ("contas_a_receber", "recebido")):
+        cur.execute(f"SELECT * FROM {tabela} ORDER BY date(data) ASC, id ASC")
+        linhas = []
+        for r in cur.fetchall():
+            c2 = con.cursor()
+            c2.execute("SELECT nome FROM contas_financeiras WHERE id=?", (r["conta_id"],))
+            n = c2.fetchone()
+            linhas.append({
+                "id": r["id"], "descricao": r["descricao"] or "", "valor": float(r["valor"] or 0.0),
+                "vencimento": r["data"] or "", "conta_id": r["conta_id"],
+                "conta_nome": n["nome"] if n else "", "categoria": r["categoria"] or "",
+                status_col: bool(r[status_col]),
+            })
+        saida.append(linhas)
+    con.close()
+    return (saida[0], saida[1], contas_fin, categorias)
+
+def _cronometrar(fn, repeticoes: int = 3) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        fn()
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    tamanhos = [int(a) for a in argv] or list(TAMANHOS_PADRAO)
+
+    for linhas in tamanhos:
+        with tempfile.TemporaryDirectory() as tmp:
+            gerador.usar_banco(os.path.join(tmp, "bench.db"))
+            from core import models
+
+            gerador.gerar_banco(linhas)
+            rep = 1 if linhas >= 500_000 else 3
+            t_novo = _cronometrar(models.load_all, rep)
+            t_antigo = _cronometrar(_load_all_n_mais_1, rep)
+            assert models.load_all()[0] == _load_all_n_mais_1()[0]
+            print(f"{linhas:>10,} linhas | N+1: {t_antigo:8.3f}s | JOIN: {t_novo:8.3f}s | "
+                  f"ganho: {t_antigo / t_novo:5.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# benchmarks/bench_startup.py — tempo de abertura do programa, até a primeira janela
+#
+# Uso (a partir da raiz do projeto, onde ficam os pacotes core/ e gui/):
+#   python -m benchmarks.bench_startup                 # 10k e 100k linhas, 5 aberturas
+#   python -m benchmarks.bench_startup 1000000 -n 10   # tamanhos e nº de aberturas
+#
+# Cada abertura é um interpretador novo, como o usuário abrindo o programa,
+# num banco sintético temporário (benchmarks.gerador). Fases (mediana):
+#   python   do início do processo até a primeira linha do script
+#   core     import core (confere a versão do schema; migra se preciso)
+#   gui      import gui.finance_gui (módulos da interface)
+#   janela   main_window() até a janela desenhada com as grids preenchidas
+#   total    do início do processo até a primeira janela
+# "migrando" repete a abertura com PRAGMA user_version zerado: é o custo de
+# quando há migração pendente (e o que toda abertura custava antes do controle
+# de versão). Sem display (servidor, CI) a fase janela é pulada e o total vai
+# até o fim dos imports.
+
+import argparse
+import ast
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from . import gerador
+
+TAMANHOS_PADRAO = (10_000, 100_000)
+_FASES = ("python", "core", "gui", "janela", "total")
+
+# roda no processo novo; imprime os instantes (time.time) de cada marca
+_ABERTURA = r'''
+import sys, time
+marcas = {"inicio": time.time()}
+import core
+marcas["core"] = time.time()
+import gui.finance_gui as g
+marcas["gui"] = time.time()
+if sys.argv[1] == "janela":
+    import tkinter as tk
+    def _primeira_janela(self, n=0):
+        self.update()             # desenha a janela com o que main_window preparou
+        marcas["janela"] = time.time()
+        self.destroy()
+    tk.Misc.mainloop = _primeira_janela
+    g.main_window()
+print(repr(marcas))
+'''
+
+def _tem_display() -> bool:
+    try:
+        import tkinter
+        tkinter.Tk().destroy()
+        return True
+    except Exception:
+        return False
+
+def _abrir(db: str, com_janela: bool) -> dict:
+    """Abre o programa num processo novo e devolve a duração de cada fase (s)."""
+    env = dict(os.environ, FINANCEIRO_DB=db)
+    for var in ("FINANCEIRO_INSTRUMENTAR", "FINANCEIRO_PERFIL_GUI"):
+        env.pop(var, None)
+    t0 = time.time()
+    r = subprocess.run([sys.executable, "-c", _ABERTURA, "janela" if com_janela else "imports"],
+                       env=env, capture_output=True, text=True, check=True)
+    marcas = ast.literal_eval(r.stdout.strip().splitlines()[-1])
+    fases = {
+        "python": marcas["inicio"] - t0,
+        "core": marcas["core"] - marcas["inicio"],
+        "gui": marcas["gui"] - marcas["core"],
+    }
+    if "janela" in marcas:
+        fases["janela"] = marcas["janela"] - marcas["gui"]
+    fases["total"] = max(marcas.values()) - t0
+    return fases
+
+def _zerar_versao(db: str):
+    con = sqlite3.connect(db)
+    con.execute("PRAGMA user_version = 0")
+    con.close()
+
+def _linha(rotulo: str, medidas: list) -> str:
+    partes = []
+    for fase in _FASES:
+        valores = [m[fase] for m in medidas if fase in m]
+        partes.append(f"{fase} {statistics.median(valores) * 1000:7.1f} ms" if valores
+                      else f"{fase} {'—':>7}   ")
+    return f"   {rotulo:<14}" + " | ".join(partes)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_startup",
+                                     description="Tempo de abertura do financeiro até a primeira janela.")
+    parser.add_argument("tamanhos", nargs="*", type=int,
+                        help=f"linhas por banco (padrão: {' '.join(map(str, TAMANHOS_PADRAO))})")
+    parser.add_argument("-n", dest="aberturas", type=int, default=5, help="aberturas por medida (padrão 5)")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    com_janela = _tem_display()
+    if not com_janela:
+        print("Sem display: medindo só até o fim dos imports (fase janela pulada).")
+    for linhas in args.tamanhos or TAMANHOS_PADRAO:
+        with tempfile.TemporaryDirectory() as pasta:
+            db = os.path.join(pasta, "bench.db")
+            gerador.usar_banco(db)
+            gerador.gerar_banco(linhas, args.semente)
+            from core import database
+            database.close_all()
+
+            _abrir(db, com_janela)                 # aquece o cache de arquivos do SO
+            em_dia = [_abrir(db, com_janela) for _ in range(args.aberturas)]
+            migrando = []
+            for _ in range(args.aberturas):
+                _zerar_versao(db)
+                migrando.append(_abrir(db, com_janela))
+            print(f"== {linhas:,} linhas ({args.aberturas} aberturas, mediana)")
+            print(_linha("banco em dia", em_dia))
+            print(_linha("migrando", migrando))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
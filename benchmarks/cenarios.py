@@ -0,0 +1,235 @@
+# benchmarks/cenarios.py — cenários cronometrados das funções públicas do core
+#
+# Cada cenário recebe o contexto e o número da repetição e devolve a função
+# (sem argumentos) a cronometrar; o preparo (gerar OFX, escolher ids...) fica
+# fora da medição. Rodam na ordem em que estão aqui: primeiro as leituras,
+# depois exportações, alterações e importações — que fazem o banco crescer.
+# 'operacoes' é quantas chamadas a função cronometrada faz (para tempo por chamada).
+
+import os
+import random
+from dataclasses import dataclass
+
+from . import gerador
+
+@dataclass
+class Cenario:
+    nome: str
+    preparar: object          # (ctx, repeticao) -> callable cronometrado
+    repeticoes: int = 3
+    operacoes: int = 1
+    max_linhas: int | None = None   # acima disso o cenário é pulado (lento demais)
+
+CENARIOS = []
+
+def cenario(nome, repeticoes=3, operacoes=1, max_linhas=None):
+    def registrar(fn):
+        CENARIOS.append(Cenario(nome, fn, repeticoes, operacoes, max_linhas))
+        return fn
+    return registrar
+
+class Contexto:
+    """Estado compartilhado pelos cenários de um tamanho de banco."""
+
+    def __init__(self, pasta: str, linhas: int, semente=42):
+        from core import models, ofx_importer, export_excel
+        self.models, self.ofx_importer, self.export_excel = models, ofx_importer, export_excel
+        self.pasta = pasta
+        self.linhas = linhas
+        self.semente = semente
+        self.rnd = random.Random(f"{semente}-cenarios")
+        # tamanho das importações: proporcional ao banco, com teto
+        self.lote = max(1_000, min(linhas // 10, 50_000))
+        # (o que, repetição) -> ids/nomes criados por um cenário e usados pelo
+        # seguinte (ex.: add_category -> edit_category -> delete_category)
+        self.criados = {}
+
+    def ofx(self, nome: str, n: int) -> str:
+        path = os.path.join(self.pasta, f"{nome}.ofx")
+        if not os.path.exists(path):
+            gerador.gerar_ofx(path, n, semente=f"{self.semente}-{nome}")
+        return path
+
+    def ids(self, tipo: str, n: int) -> list:
+        tabela = self.models._TIPOS[tipo][0]
+        cur = self.models.get_conn().execute(f"SELECT MIN(id), MAX(id) FROM {tabela}")
+        lo, hi = cur.fetchone()
+        return [self.rnd.randint(lo, hi) for _ in range(n)]
+
+    def transacoes(self, nome: str, n: int) -> list:
+        contas = gerador.CONTAS
+        return [{"tipo": t["tipo"], "descricao": t["descricao"], "valor": t["centavos"] / 100,
+                 "data": t["data"], "conta_nome": contas[t["conta"]], "categoria": t["categoria"],
+                 "fitid": f"{nome}-{i}"}
+                for i, t in enumerate(gerador.transacoes(n, f"{self.semente}-{nome}"))]
+
+_LOTE_CRUD = 100
+
+# ---------------- core.models: leitura ----------------
+@cenario("models.load_all")
+def _(ctx, rep):
+    return ctx.models.load_all
+
+@cenario("models.load_entries")
+def _(ctx, rep):
+    return lambda: ctx.models.load_entries("pagar")
+
+@cenario("models.list_financial_accounts", operacoes=_LOTE_CRUD)
+def _(ctx, rep):
+    return lambda: [ctx.models.list_financial_accounts() for _ in range(_LOTE_CRUD)]
+
+@cenario("models.list_categories", operacoes=_LOTE_CRUD)
+def _(ctx, rep):
+    return lambda: [ctx.models.list_categories() for _ in range(_LOTE_CRUD)]
+
+@cenario("models.get_entry", operacoes=_LOTE_CRUD)
+def _(ctx, rep):
+    ids = ctx.ids("pagar", _LOTE_CRUD)
+    return lambda: [ctx.models.get_entry("pagar", i) for i in ids]
+
+@cenario("models.account_has_entries", operacoes=len(gerador.CONTAS))
+def _(ctx, rep):
+    ids = [c["id"] for c in ctx.models.list_financial_accounts()]
+    return lambda: [ctx.models.account_has_entries(i) for i in ids]
+
+@cenario("models.iter_entries")
+def _(ctx, rep):
+    return lambda: sum(1 for _ in ctx.models.iter_entries("pagar", ano=2024))
+
+@cenario("models.search_pagar")
+def _(ctx, rep):
+    return lambda: ctx.models.search_pagar(descricao="mercado", ano=2023)
+
+@cenario("models.search_receber")
+def _(ctx, rep):
+    return lambda: ctx.models.search_receber(status="pendente")
+
+@cenario("models.search_combined")
+def _(ctx, rep):
+    return lambda: ctx.models.search_combined(ano=2024)
+
+@cenario("models.search_page", operacoes=20)
+def _(ctx, rep):
+    def paginar():
+        token = None
+        for _ in range(20):
+            _itens, token = ctx.models.search_page(50, token)
+            if token is None:
+                break
+    return paginar
+
+@cenario("models.aggregate")
+def _(ctx, rep):
+    return lambda: ctx.models.aggregate(por=("mes", "categoria", "status"), ano=2024)
+
+@cenario("models.aggregate (varredura)")
+def _(ctx, rep):
+    # filtro de descrição: não dá para responder pelo resumo mensal
+    return lambda: ctx.models.aggregate(por=("mes",), descricao="compra")
+
+# ---------------- core.export_excel ----------------
+@cenario("export_excel.export_monthly_report")
+def _(ctx, rep):
+    return lambda: ctx.export_excel.export_monthly_report(6, 2024)
+
+@cenario("export_excel.export_database_to_excel", repeticoes=1, max_linhas=1_000_000)
+def _(ctx, rep):
+    out = os.path.join(ctx.pasta, "export_banco.xlsx")
+    return lambda: ctx.export_excel.export_database_to_excel(out)
+
+@cenario("export_excel.export_to_excel", repeticoes=1, max_linhas=1_000_000)
+def _(ctx, rep):
+    pagar, receber, _, _ = ctx.models.load_all()
+    return lambda: ctx.export_excel.export_to_excel(pagar, receber)
+
+# ---------------- core.models: alterações ----------------
+@cenario("models.add_category", operacoes=_LOTE_CRUD)
+def _(ctx, rep):
+    nomes = ctx.criados["categorias", rep] = [f"Bench {rep}-{i}" for i in range(_LOTE_CRUD)]
+    return lambda: [ctx.models.add_category(n) for n in nomes]
+
+@cenario("models.edit_category", operacoes=_LOTE_CRUD)
+def _(ctx, rep):
+    pares = [(n, n + " (editada)") for n in ctx.criados.get(("categorias", rep), [])]
+    ctx.criados["categorias", rep] = [novo for _, novo in pares]
+    return lambda: [ctx.models.edit_category(a, b) for a, b in pares]
+
+@cenario("models.delete_category", operacoes=_LOTE_CRUD)
+def _(ctx, rep):
+    nomes = ctx.criados.pop(("categorias", rep), [])
+    return lambda: [ctx.models.delete_category(n) for n in nomes]
+
+@cenario("models.add_financial_account", operacoes=_LOTE_CRUD)
+def _(ctx, rep):
+    nomes = [f"Conta bench {rep}-{i}" for i in range(_LOTE_CRUD)]
+    return lambda: [ctx.models.add_financial_account(n) for n in nomes]
+
+@cenario("models.edit_financial_account", operacoes=_LOTE_CRUD)
+def _(ctx, rep):
+    cur = ctx.models.get_conn().execute(
+        "SELECT id FROM contas_financeiras WHERE nome LIKE ?", (f"Conta bench {rep}-%",))
+    ids = ctx.criados["contas", rep] = [r[0] for r in cur]
+    return lambda: [ctx.models.edit_financial_account(i, f"Conta bench editada {rep}-{i}") for i in ids]
+
+@cenario("models.delete_financial_account_by_id", operacoes=_LOTE_CRUD)
+def _(ctx, rep):
+    ids = ctx.criados.pop(("contas", rep), [])
+    return lambda: [ctx.models.delete_financial_account_by_id(i) for i in ids]
+
+@cenario("models.add_entry", operacoes=_LOTE_CRUD)
+def _(ctx, rep):
+    trans = ctx.transacoes(f"add-{rep}", _LOTE_CRUD)
+    def criar():
+        ctx.criados["lancamentos", rep] = [
+            ctx.models.add_entry(t["tipo"], t["descricao"], f"{t['valor']:.2f}", t["data"],
+                                 None, t["conta_nome"], t["categoria"])
+            for t in trans]
+    return criar
+
+@cenario("models.edit_entry", operacoes=_LOTE_CRUD)
+def _(ctx, rep):
+    itens = ctx.criados.get(("lancamentos", rep), [])
+    return lambda: [ctx.models.edit_entry(e["tipo"], e["id"], e["descricao"] + " *", f"{e['valor'] + 1:.2f}",
+                                          e["vencimento"], e["conta_id"], "", e["categoria"])
+                    for e in itens]
+
+@cenario("models.set_paid", operacoes=_LOTE_CRUD)
+def _(ctx, rep):
+    ids = ctx.ids("pagar", _LOTE_CRUD)
+    return lambda: [ctx.models.set_paid(i, rep % 2 == 0) for i in ids]
+
+@cenario("models.set_received", operacoes=_LOTE_CRUD)
+def _(ctx, rep):
+    ids = ctx.ids("receber", _LOTE_CRUD)
+    return lambda: [ctx.models.set_received(i, rep % 2 == 0) for i in ids]
+
+@cenario("models.delete_entry", operacoes=_LOTE_CRUD)
+def _(ctx, rep):
+    itens = ctx.criados.pop(("lancamentos", rep), [])
+    return lambda: [ctx.models.delete_entry(e["tipo"], item_id=e["id"]) for e in itens]
+
+# ---------------- core.ofx_importer ----------------
+@cenario("ofx_importer.iter_ofx")
+def _(ctx, rep):
+    path = ctx.ofx("leitura", ctx.lote)
+    return lambda: sum(1 for _ in ctx.ofx_importer.iter_ofx(path, None, "Nubank"))
+
+@cenario("ofx_importer.process_ofx")
+def _(ctx, rep):
+    path = ctx.ofx("leitura", ctx.lote)
+    return lambda: ctx.ofx_importer.process_ofx(path, None, "Nubank")
+
+@cenario("ofx_importer.add_imported_transactions")
+def _(ctx, rep):
+    trans = ctx.transacoes(f"lista-{rep}", ctx.lote)
+    return lambda: ctx.ofx_importer.add_imported_transactions(trans)
+
+@cenario("ofx_importer.import_ofx")
+def _(ctx, rep):
+    path = ctx.ofx(f"import-{rep}", ctx.lote)
+    return lambda: ctx.ofx_importer.import_ofx(path, None, "Itaú")
+
+@cenario("ofx_importer.import_ofx_batch", repeticoes=2)
+def _(ctx, rep):
+    arquivos = [(ctx.ofx(f"lote-{rep}-{i}", ctx.lote // 4), gerador.CONTAS[i]) for i in range(4)]
+    return lambda: ctx.ofx_importer.import_ofx_batch(arquivos)
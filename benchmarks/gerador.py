@@ -0,0 +1,155 @@
+# benchmarks/gerador.py — dados financeiros sintéticos e reprodutíveis (banco e OFX)
+#
+# Mesma semente => mesmos lançamentos, na mesma ordem, em qualquer máquina.
+# Os dados imitam um histórico real: poucas contas, categorias com faixas de
+# valor próprias, descrições repetidas (como vêm dos extratos), vários anos
+# terminando numa data fixa e pagamentos antigos quase sempre quitados.
+#
+#   from benchmarks import gerador
+#   gerador.usar_banco(path)          # aponta o core para o arquivo (recarrega)
+#   gerador.gerar_banco(100_000)      # grava no banco do core
+#   gerador.gerar_ofx("extrato.ofx", 5_000, semente="extrato-1")
+
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+TAMANHOS = (10_000, 100_000, 1_000_000, 10_000_000)
+
+DATA_FIM = date(2025, 12, 31)     # fixa: o histórico não depende do dia em que roda
+ANOS = 10
+_DIAS = (DATA_FIM - date(DATA_FIM.year - ANOS + 1, 1, 1)).days + 1
+_RECENTES = 60                    # dias antes de DATA_FIM com muitos itens pendentes
+
+CONTAS = ["Banco do Brasil", "Itaú", "Nubank", "Caixa", "Bradesco", "Santander", "Inter", "Carteira"]
+
+_ESTABELECIMENTOS = [f"{p} {s}" for p in ("MERCADO", "PADARIA", "FARMACIA", "POSTO", "RESTAURANTE",
+                                          "LOJA", "PET SHOP", "ACOUGUE", "HORTIFRUTI", "LANCHONETE")
+                     for s in ("CENTRO", "SAO JOSE", "BOA VISTA", "JARDIM", "DAS FLORES",
+                               "DO BAIRRO", "EXPRESS", "PREMIUM", "POPULAR", "DA ESQUINA")]
+_PESSOAS = ["ANA SOUZA", "CARLOS LIMA", "JOAO PEREIRA", "MARIA SILVA", "PEDRO COSTA",
+            "LUCIA ALMEIDA", "RAFAEL GOMES", "JULIANA ROCHA", "MARCOS DIAS", "FERNANDA REIS"]
+
+# categoria: (tipo, peso, faixa em reais, descrições possíveis)
+CATEGORIAS = {
+    "Aluguel":     ("pagar", 2, (900, 3500), ["ALUGUEL APTO", "PAG BOLETO IMOBILIARIA"]),
+    "Energia":     ("pagar", 2, (80, 600), ["PAG CONTA LUZ CEMIG", "DEBITO AUT ENERGIA"]),
+    "Água":        ("pagar", 2, (40, 250), ["PAG CONTA AGUA COPASA", "DEBITO AUT SANEAMENTO"]),
+    "Internet":    ("pagar", 2, (90, 250), ["DEBITO AUT VIVO FIBRA", "PAG BOLETO CLARO NET"]),
+    "Mercado":     ("pagar", 14, (15, 900), ["COMPRA CARTAO {e}", "PIX ENVIADO {e}"]),
+    "Combustível": ("pagar", 6, (50, 400), ["COMPRA CARTAO POSTO {n}", "PIX ENVIADO POSTO {n}"]),
+    "Restaurante": ("pagar", 8, (20, 300), ["COMPRA CARTAO {e}", "IFOOD *PEDIDO {n}"]),
+    "Saúde":       ("pagar", 3, (30, 1500), ["COMPRA CARTAO {e}", "PAG BOLETO UNIMED"]),
+    "Educação":    ("pagar", 2, (150, 2500), ["PAG BOLETO ESCOLA", "CURSO ONLINE {n}"]),
+    "Impostos":    ("pagar", 1, (100, 5000), ["PAG DARF", "PAG IPVA", "PAG IPTU PARCELA {n}"]),
+    "Lazer":       ("pagar", 5, (20, 800), ["COMPRA CARTAO {e}", "NETFLIX.COM", "SPOTIFY"]),
+    "Transporte":  ("pagar", 5, (5, 120), ["UBER *TRIP {n}", "RECARGA BILHETE UNICO"]),
+    "Transferência": ("pagar", 4, (10, 2000), ["PIX ENVIADO {p}", "TED ENVIADA {p}"]),
+    "Salário":     ("receber", 2, (3000, 15000), ["CREDITO SALARIO", "TED RECEBIDA EMPRESA"]),
+    "Freelance":   ("receber", 2, (300, 6000), ["PIX RECEBIDO {p}", "TED RECEBIDA {p}"]),
+    "Rendimentos": ("receber", 2, (1, 900), ["RENDIMENTO POUPANCA", "RESGATE CDB {n}"]),
+    "Reembolso":   ("receber", 1, (20, 1500), ["PIX RECEBIDO {p}", "ESTORNO COMPRA {e}"]),
+    "Vendas":      ("receber", 2, (30, 2500), ["PIX RECEBIDO {p}", "VENDA MERCADO LIVRE {n}"]),
+}
+_NOMES_CAT = list(CATEGORIAS)
+_PESOS_CAT = [c[1] for c in CATEGORIAS.values()]
+
+def transacoes(n: int, semente=42):
+    """Gera n lançamentos: dicts com tipo, descricao, centavos, data (AAAA-MM-DD),
+       conta (índice em CONTAS), categoria e pago (bool)."""
+    rnd = random.Random(semente)
+    inicio = DATA_FIM - timedelta(days=_DIAS - 1)
+    escolher_cat = rnd.choices
+    for _ in range(n):
+        cat = escolher_cat(_NOMES_CAT, _PESOS_CAT)[0]
+        tipo, _, (lo, hi), modelos = CATEGORIAS[cat]
+        desc = rnd.choice(modelos)
+        if "{" in desc:
+            desc = desc.format(e=rnd.choice(_ESTABELECIMENTOS), p=rnd.choice(_PESSOAS), n=rnd.randint(1, 99))
+        # valores pequenos são mais comuns: distribuição inclinada para o início da faixa
+        centavos = round((lo + (hi - lo) * rnd.random() ** 2) * 100)
+        dias = rnd.randrange(_DIAS)
+        antigo = dias < _DIAS - _RECENTES
+        yield {
+            "tipo": tipo,
+            "descricao": desc,
+            "centavos": centavos,
+            "data": (inicio + timedelta(days=dias)).isoformat(),
+            "conta": rnd.randrange(len(CONTAS)),
+            "categoria": cat,
+            "pago": rnd.random() < (0.97 if antigo else 0.3),
+        }
+
+def usar_banco(path: str):
+    """Aponta o pacote core para `path`. O core lê FINANCEIRO_DB ao ser
+       importado, então os módulos já carregados são descartados; importe
+       core.* de novo depois desta chamada."""
+    os.environ["FINANCEIRO_DB"] = path
+    antigos = [m for m in sys.modules if m == "core" or m.startswith("core.")]
+    if antigos:
+        from core import database
+        database.close_all()
+    for mod in antigos:
+        del sys.modules[mod]
+
+_LOTE = 50_000
+# triggers de dados derivados: desligados durante a carga e recriados (com
+# reconstrução do FTS e do resumo mensal) por migrate_schema_if_needed(forcar=True)
+_PREFIXOS_DERIVADOS = ("trg_fts_", "trg_resumo_", "trg_alt_")
+
+def gerar_banco(linhas: int, semente=42) -> dict:
+    """Grava `linhas` lançamentos no banco do core (FINANCEIRO_DB; ver usar_banco).
+       Retorna {'pagar': n, 'receber': n}."""
+    from core import database
+
+    con = database.get_conn()
+    cur = con.cursor()
+    cur.executemany("INSERT OR IGNORE INTO contas_financeiras (nome) VALUES (?)", [(n,) for n in CONTAS])
+    cur.executemany("INSERT OR IGNORE INTO categorias (nome) VALUES (?)", [(n,) for n in CATEGORIAS])
+    ids_conta = [cur.execute("SELECT id FROM contas_financeiras WHERE nome=?", (n,)).fetchone()[0]
+                 for n in CONTAS]
+    cur.execute("SELECT name FROM sqlite_master WHERE type='trigger'")
+    for (nome,) in cur.fetchall():
+        if nome.startswith(_PREFIXOS_DERIVADOS):
+            cur.execute(f"DROP TRIGGER {nome}")
+
+    sql = {tipo: f"INSERT INTO {tabela} (descricao, valor, valor_centavos, data, conta_id, categoria, {st}) "
+                 "VALUES (?, ?, ?, ?, ?, ?, ?)"
+           for tipo, tabela, st in (("pagar", "contas_a_pagar", "pago"),
+                                    ("receber", "contas_a_receber", "recebido"))}
+    lotes = {"pagar": [], "receber": []}
+    qtd = {"pagar": 0, "receber": 0}
+    with database.storage_profile("bulk-import"), database.transaction():
+        for t in transacoes(linhas, semente):
+            lote = lotes[t["tipo"]]
+            lote.append((t["descricao"], t["centavos"] / 100, t["centavos"], t["data"],
+                         ids_conta[t["conta"]], t["categoria"], int(t["pago"])))
+            if len(lote) >= _LOTE:
+                cur.executemany(sql[t["tipo"]], lote)
+                qtd[t["tipo"]] += len(lote)
+                lote.clear()
+        for tipo, lote in lotes.items():
+            if lote:
+                cur.executemany(sql[tipo], lote)
+                qtd[tipo] += len(lote)
+    database.migrate_schema_if_needed(forcar=True)
+    return qtd
+
+def gerar_ofx(path: str, n: int, semente="ofx") -> str:
+    """Grava um extrato OFX (SGML) com n transações do gerador; FITIDs únicos
+       por semente. Retorna o caminho."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("OFXHEADER:100\nDATA:OFXSGML\nVERSION:102\nENCODING:UTF-8\n\n"
+                "<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><CURDEF>BRL\n<BANKTRANLIST>\n")
+        for i, t in enumerate(transacoes(n, semente)):
+            sinal = "-" if t["tipo"] == "pagar" else ""
+            f.write("<STMTTRN>\n"
+                    f"<TRNTYPE>{'DEBIT' if sinal else 'CREDIT'}\n"
+                    f"<DTPOSTED>{t['data'].replace('-', '')}120000\n"
+                    f"<TRNAMT>{sinal}{t['centavos'] // 100}.{t['centavos'] % 100:02d}\n"
+                    f"<FITID>{semente}-{i}\n"
+                    f"<MEMO>{t['descricao']}\n"
+                    "</STMTTRN>\n")
+        f.write("</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n")
+    return path
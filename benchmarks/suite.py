@@ -0,0 +1,142 @@
+# benchmarks/suite.py — roda os cenários em bancos sintéticos e salva/compara resultados em JSON
+#
+# Uso (a partir da raiz do projeto, onde fica o pacote core/):
+#   python -m benchmarks.suite                               # 10k e 100k linhas
+#   python -m benchmarks.suite 10000 1000000 -o atual.json   # tamanhos escolhidos
+#   python -m benchmarks.suite -k search -k aggregate        # só cenários com esses trechos no nome
+#   python -m benchmarks.suite --comparar base.json atual.json [--tolerancia 0.2]
+#
+# Cada tamanho gera um banco temporário com a mesma semente (mesmos dados em
+# toda execução); o financeiro.db real não é tocado. A comparação usa o melhor
+# tempo de cada cenário e sai com código 1 se algum ficou mais lento que a
+# tolerância — dá para usar como verificação antes de um merge.
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from . import gerador
+
+TAMANHOS_PADRAO = (10_000, 100_000)
+FORMATO = 1
+# diferenças abaixo disso são ruído de medição, mesmo que a razão seja grande
+_PISO_S = 0.002
+
+def _medir(cenario, ctx) -> dict:
+    if cenario.max_linhas is not None and ctx.linhas > cenario.max_linhas:
+        return {"pulado": f"acima de {cenario.max_linhas:,} linhas"}
+    tempos = []
+    for rep in range(cenario.repeticoes):
+        fn = cenario.preparar(ctx, rep)
+        t0 = time.perf_counter()
+        fn()
+        tempos.append(time.perf_counter() - t0)
+    return {
+        "melhor": min(tempos),
+        "mediana": statistics.median(tempos),
+        "repeticoes": len(tempos),
+        "operacoes": cenario.operacoes,
+    }
+
+def rodar(tamanhos, filtros=(), semente=42, saida=print) -> dict:
+    from .cenarios import CENARIOS, Contexto
+    escolhidos = [c for c in CENARIOS if not filtros or any(f in c.nome for f in filtros)]
+    resultado = {
+        "formato": FORMATO,
+        "meta": {
+            "inicio": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "plataforma": platform.platform(),
+            "semente": semente,
+        },
+        "tamanhos": {},
+    }
+    for linhas in tamanhos:
+        with tempfile.TemporaryDirectory() as pasta:
+            gerador.usar_banco(os.path.join(pasta, "bench.db"))
+            t0 = time.perf_counter()
+            gerador.gerar_banco(linhas, semente)
+            saida(f"== {linhas:,} linhas (banco gerado em {time.perf_counter() - t0:.1f}s)")
+            ctx = Contexto(pasta, linhas, semente)
+            cwd = os.getcwd()
+            os.chdir(pasta)           # exportações gravam no diretório atual
+            try:
+                medidas = {}
+                for c in escolhidos:
+                    m = medidas[c.nome] = _medir(c, ctx)
+                    if "pulado" in m:
+                        saida(f"   {c.nome:<45} pulado ({m['pulado']})")
+                    else:
+                        por_op = m["melhor"] / m["operacoes"]
+                        saida(f"   {c.nome:<45} {m['melhor']:9.4f}s" +
+                              (f"  ({por_op * 1000:.3f} ms/chamada)" if m["operacoes"] > 1 else ""))
+            finally:
+                os.chdir(cwd)
+                from core import database
+                database.close_all()
+            resultado["tamanhos"][str(linhas)] = medidas
+    return resultado
+
+def comparar(base: dict, atual: dict, tolerancia: float = 0.2, saida=print) -> list:
+    """Compara o melhor tempo de cada cenário presente nos dois resultados.
+       Retorna a lista de regressões (tamanho, cenário, razão)."""
+    regressoes = []
+    for tam, medidas in atual.get("tamanhos", {}).items():
+        anteriores = base.get("tamanhos", {}).get(tam)
+        if not anteriores:
+            continue
+        saida(f"== {int(tam):,} linhas")
+        for nome, m in medidas.items():
+            a = anteriores.get(nome)
+            if not a or "melhor" not in a or "melhor" not in m:
+                continue
+            razao = m["melhor"] / a["melhor"] if a["melhor"] else float("inf")
+            regrediu = razao > 1 + tolerancia and m["melhor"] - a["melhor"] > _PISO_S
+            marca = "  << REGRESSÃO" if regrediu else ""
+            saida(f"   {nome:<45} {a['melhor']:9.4f}s -> {m['melhor']:9.4f}s  ({razao:5.2f}x){marca}")
+            if regrediu:
+                regressoes.append((tam, nome, razao))
+    return regressoes
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite",
+                                     description="Benchmarks do financeiro em bancos sintéticos.")
+    parser.add_argument("tamanhos", nargs="*", type=int,
+                        help=f"linhas por banco (padrão: {' '.join(map(str, TAMANHOS_PADRAO))}; "
+                             f"o gerador foi pensado para {', '.join(f'{t:,}' for t in gerador.TAMANHOS)})")
+    parser.add_argument("-o", "--saida", help="grava os resultados neste arquivo JSON")
+    parser.add_argument("-k", dest="filtros", action="append", default=[],
+                        help="roda só cenários cujo nome contém o trecho (pode repetir)")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--comparar", nargs=2, metavar=("BASE", "ATUAL"),
+                        help="compara dois JSON de resultados em vez de rodar")
+    parser.add_argument("--tolerancia", type=float, default=0.2,
+                        help="quanto mais lento (fração) ainda não conta como regressão (padrão 0.2)")
+    args = parser.parse_args(argv)
+
+    if args.comparar:
+        with open(args.comparar[0], encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.comparar[1], encoding="utf-8") as f:
+            atual = json.load(f)
+        regressoes = comparar(base, atual, args.tolerancia)
+        print(f"{len(regressoes)} regressão(ões) acima de {args.tolerancia:.0%}.")
+        return 1 if regressoes else 0
+
+    resultado = rodar(args.tamanhos or TAMANHOS_PADRAO, args.filtros, args.semente)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f"Resultados gravados em {args.saida}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
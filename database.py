@@ -1,118 +1,628 @@
-# core/database.py — conexão SQLite + criação e migração de schema
-
-import os
-import sqlite3
-
-DB_PATH = os.environ.get("FINANCEIRO_DB", "financeiro.db")
-
-def conn(db_path: str = DB_PATH) -> sqlite3.Connection:
-    c = sqlite3.connect(db_path)
-    c.row_factory = sqlite3.Row
-    c.execute("PRAGMA foreign_keys = ON")
-    return c
-
-def _column_exists(cur, table: str, col: str) -> bool:
-    cur.execute(f"PRAGMA table_info({table})")
-    return any(row["name"] == col for row in cur.fetchall())
-
-def _safe_add_column(cur, table: str, col: str, coltype: str):
-    if not _column_exists(cur, table, col):
-        cur.execute(f"ALTER TABLE {table} ADD COLUMN {col} {coltype}")
-
-def init_schema():
-    con = conn()
-    cur = con.cursor()
-
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS contas_financeiras (
-            id   INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome TEXT NOT NULL UNIQUE
-        )
-    """)
-
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS categorias (
-            id   INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome TEXT NOT NULL UNIQUE
-        )
-    """)
-
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS contas_a_pagar (
-            id         INTEGER PRIMARY KEY AUTOINCREMENT,
-            descricao  TEXT,
-            valor      REAL,
-            data       TEXT,
-            conta_id   INTEGER NOT NULL,
-            categoria  TEXT,
-            pago       INTEGER DEFAULT 0,
-            fitid      TEXT,
-            FOREIGN KEY(conta_id) REFERENCES contas_financeiras(id) ON DELETE RESTRICT
-        )
-    """)
-
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS contas_a_receber (
-            id         INTEGER PRIMARY KEY AUTOINCREMENT,
-            descricao  TEXT,
-            valor      REAL,
-            data       TEXT,
-            conta_id   INTEGER NOT NULL,
-            categoria  TEXT,
-            recebido   INTEGER DEFAULT 0,
-            fitid      TEXT,
-            FOREIGN KEY(conta_id) REFERENCES contas_financeiras(id) ON DELETE RESTRICT
-        )
-    """)
-
-    con.commit()
-    con.close()
-
-def migrate_schema_if_needed():
-    """Migra bancos antigos sem apagar nada:
-       - adiciona colunas data/pago/recebido/fitid se faltarem;
-       - copia 'vencimento' -> 'data' se existir (bancos antigos);
-       - cria índices únicos condicionais para FITID (dedupe OFX)."""
-    con = conn()
-    cur = con.cursor()
-
-    # contas_a_pagar
-    _safe_add_column(cur, "contas_a_pagar", "data", "TEXT")
-    _safe_add_column(cur, "contas_a_pagar", "pago", "INTEGER DEFAULT 0")
-    _safe_add_column(cur, "contas_a_pagar", "fitid", "TEXT")
-    cur.execute("PRAGMA table_info(contas_a_pagar)")
-    cols_pagar = [r["name"] for r in cur.fetchall()]
-    if "vencimento" in cols_pagar:
-        cur.execute("""
-            UPDATE contas_a_pagar
-               SET data = COALESCE(NULLIF(data, ''), vencimento)
-             WHERE (data IS NULL OR data = '')
-        """)
-
-    # contas_a_receber
-    _safe_add_column(cur, "contas_a_receber", "data", "TEXT")
-    _safe_add_column(cur, "contas_a_receber", "recebido", "INTEGER DEFAULT 0")
-    _safe_add_column(cur, "contas_a_receber", "fitid", "TEXT")
-    cur.execute("PRAGMA table_info(contas_a_receber)")
-    cols_receber = [r["name"] for r in cur.fetchall()]
-    if "vencimento" in cols_receber:
-        cur.execute("""
-            UPDATE contas_a_receber
-               SET data = COALESCE(NULLIF(data, ''), vencimento)
-             WHERE (data IS NULL OR data = '')
-        """)
-
-    # Índices únicos condicionais por (conta_id, fitid)
-    cur.execute("""
-        CREATE UNIQUE INDEX IF NOT EXISTS ux_pagar_conta_fitid
-        ON contas_a_pagar (conta_id, fitid)
-        WHERE fitid IS NOT NULL
-    """)
-    cur.execute("""
-        CREATE UNIQUE INDEX IF NOT EXISTS ux_receber_conta_fitid
-        ON contas_a_receber (conta_id, fitid)
-        WHERE fitid IS NOT NULL
-    """)
-
-    con.commit()
-    con.close()
+# core/database.py — conexão SQLite + criação e migração de schema
+# Variáveis de ambiente:
+#   FINANCEIRO_DB          caminho do arquivo (padrão: financeiro.db)
+#   FINANCEIRO_DB_PROFILE  perfil de armazenamento: safe | balanced | bulk-import
+#   FINANCEIRO_INSTRUMENTAR  mede SQL e chamadas do core (ver instrumentacao.py)
+
+import os
+import atexit
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from . import instrumentacao
+from .search_index import normalizar
+
+DB_PATH = os.environ.get("FINANCEIRO_DB", "financeiro.db")
+
+# ----------------- Perfis de armazenamento -----------------
+# Todos usam WAL (leitores não bloqueiam o escritor); mudam durabilidade e memória.
+#   safe        — fsync a cada commit (synchronous=FULL), cache modesto
+#   balanced    — padrão; em WAL o NORMAL só faz fsync no checkpoint
+#   bulk-import — cache grande e sem checkpoint automático durante a carga
+PERFIS = {
+    "safe": {
+        "synchronous": "FULL", "cache_size": -8_000, "mmap_size": 0,
+        "temp_store": "DEFAULT", "wal_autocheckpoint": 1000,
+    },
+    "balanced": {
+        "synchronous": "NORMAL", "cache_size": -32_000, "mmap_size": 128 * 1024 * 1024,
+        "temp_store": "MEMORY", "wal_autocheckpoint": 1000,
+    },
+    "bulk-import": {
+        "synchronous": "OFF", "cache_size": -256_000, "mmap_size": 512 * 1024 * 1024,
+        "temp_store": "MEMORY", "wal_autocheckpoint": 0,
+    },
+}
+PERFIL = os.environ.get("FINANCEIRO_DB_PROFILE", "balanced")
+if PERFIL not in PERFIS:
+    PERFIL = "balanced"
+
+def _aplicar_perfil(c: sqlite3.Connection, nome: str):
+    """Aplica os PRAGMAs do perfil na conexão. 'synchronous' não pode mudar
+    dentro de uma transação; nesse caso só o restante é ajustado."""
+    for pragma, valor in PERFIS[nome].items():
+        if pragma == "synchronous" and c.in_transaction:
+            continue
+        c.execute(f"PRAGMA {pragma} = {valor}")
+
+def conn(db_path: str = DB_PATH, check_same_thread: bool = True) -> sqlite3.Connection:
+    extra = {"factory": instrumentacao.ConexaoInstrumentada} if instrumentacao.ATIVO else {}
+    c = sqlite3.connect(db_path, check_same_thread=check_same_thread, **extra)
+    c.row_factory = sqlite3.Row
+    # mesma normalização dos filtros da GUI (minúsculas, sem acentos): busca
+    # por descrição sem FTS (ver _build_where_and_params em models)
+    c.create_function("sem_acento", 1, normalizar, deterministic=True)
+    c.execute("PRAGMA foreign_keys = ON")
+    c.execute("PRAGMA journal_mode = WAL")
+    _aplicar_perfil(c, PERFIL)
+    return c
+
+# ----------------- Conexão persistente por thread -----------------
+# Cada thread mantém uma conexão aberta enquanto o processo viver; assim o
+# arquivo não é reaberto, os PRAGMAs não são refeitos e o cache de páginas
+# do SQLite é aproveitado entre chamadas.
+_local = threading.local()
+_abertas = []                 # todas as conexões do pool, para fechar no shutdown
+_abertas_lock = threading.Lock()
+_geracao = 0                  # incrementa a cada close_all(); invalida conexões antigas
+
+def get_conn() -> sqlite3.Connection:
+    """Conexão de longa duração da thread atual (criada sob demanda)."""
+    c = getattr(_local, "con", None)
+    if c is None or _local.geracao != _geracao:
+        # check_same_thread=False só para permitir o close_all() no shutdown;
+        # a conexão continua sendo usada apenas pela thread dona.
+        c = conn(DB_PATH, check_same_thread=False)
+        _local.con = c
+        _local.depth = 0
+        _local.commits = 0        # commits feitos por esta conexão (ver ChangeWatcher)
+        _local.geracao = _geracao
+        with _abertas_lock:
+            _abertas.append(c)
+    return c
+
+class Cancelado(Exception):
+    """Operação longa interrompida porque o cancelado() do chamador devolveu True.
+       Dentro de transaction() desfaz o que foi gravado."""
+
+@contextmanager
+def transaction():
+    """Unidade de trabalho sobre a conexão da thread.
+       - commit ao sair do bloco mais externo; rollback se houver exceção;
+       - blocos aninhados participam da mesma transação."""
+    c = get_conn()
+    depth = _local.depth
+    _local.depth = depth + 1
+    try:
+        yield c
+        if depth == 0:
+            c.commit()
+            _local.commits += 1
+    except BaseException:
+        if depth == 0:
+            c.rollback()
+        raise
+    finally:
+        _local.depth = depth
+
+@contextmanager
+def storage_profile(nome: str):
+    """Troca temporariamente o perfil da conexão da thread (ex.: 'bulk-import').
+       Ao sair, volta ao perfil configurado e faz o checkpoint do WAL acumulado."""
+    c = get_conn()
+    _aplicar_perfil(c, nome)
+    try:
+        yield c
+    finally:
+        _aplicar_perfil(c, PERFIL)
+        if PERFIS[nome]["wal_autocheckpoint"] == 0 and not c.in_transaction:
+            c.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+def close_thread_conn():
+    """Fecha a conexão da thread atual (útil ao encerrar threads de trabalho)."""
+    c = getattr(_local, "con", None)
+    if c is None:
+        return
+    _local.con = None
+    with _abertas_lock:
+        if c in _abertas:
+            _abertas.remove(c)
+    c.close()
+
+def close_all():
+    """Fecha todas as conexões do pool. Registrado no atexit."""
+    global _geracao
+    with _abertas_lock:
+        pendentes = list(_abertas)
+        _abertas.clear()
+        _geracao += 1
+    for c in pendentes:
+        try:
+            c.close()
+        except Exception:
+            pass
+
+atexit.register(close_all)
+
+def _column_exists(cur, table: str, col: str) -> bool:
+    cur.execute(f"PRAGMA table_info({table})")
+    return any(row["name"] == col for row in cur.fetchall())
+
+def _safe_add_column(cur, table: str, col: str, coltype: str):
+    if not _column_exists(cur, table, col):
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN {col} {coltype}")
+
+# ----------------- Versão do schema -----------------
+# PRAGMA user_version guarda no cabeçalho do arquivo a versão do schema. Com
+# o banco em dia, abrir o programa custa essa leitura e nada mais; as
+# migrações só rodam quando a versão gravada é menor que SCHEMA_VERSAO.
+# Bancos de antes deste controle têm user_version 0 e passam pela migração 1,
+# que leva qualquer schema anterior (ou nenhum) ao atual e é idempotente.
+# Mudança nova de schema = nova função em _MIGRACOES com o número seguinte.
+def _versao_schema(cur) -> int:
+    cur.execute("PRAGMA user_version")
+    return cur.fetchone()[0]
+
+def _criar_tabelas(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS contas_financeiras (
+            id   INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL UNIQUE
+        )
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS categorias (
+            id   INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL UNIQUE
+        )
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS contas_a_pagar (
+            id         INTEGER PRIMARY KEY AUTOINCREMENT,
+            descricao  TEXT,
+            valor      REAL,
+            valor_centavos INTEGER,
+            data       TEXT,
+            conta_id   INTEGER NOT NULL,
+            categoria  TEXT,
+            pago       INTEGER DEFAULT 0,
+            fitid      TEXT,
+            FOREIGN KEY(conta_id) REFERENCES contas_financeiras(id) ON DELETE RESTRICT
+        )
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS contas_a_receber (
+            id         INTEGER PRIMARY KEY AUTOINCREMENT,
+            descricao  TEXT,
+            valor      REAL,
+            valor_centavos INTEGER,
+            data       TEXT,
+            conta_id   INTEGER NOT NULL,
+            categoria  TEXT,
+            recebido   INTEGER DEFAULT 0,
+            fitid      TEXT,
+            FOREIGN KEY(conta_id) REFERENCES contas_financeiras(id) ON DELETE RESTRICT
+        )
+    """)
+
+def init_schema():
+    """Cria as tabelas que faltarem (sem migrar; ver migrate_schema_if_needed)."""
+    con = get_conn()
+    _criar_tabelas(con.cursor())
+    con.commit()
+
+def _migracao_1(cur):
+    """Schema completo a partir de qualquer banco anterior ao user_version:
+       - cria as tabelas que faltarem;
+       - adiciona colunas data/pago/recebido/fitid/valor_centavos se faltarem;
+       - copia 'vencimento' -> 'data' se existir (bancos antigos) e troca data NULL por '';
+       - preenche valor_centavos a partir de 'valor' (ver _sync_centavos);
+       - cria índices únicos condicionais para FITID (dedupe OFX);
+       - cria índices por data, (conta, data, valor_centavos) e (categoria, data);
+       - cria/atualiza os índices FTS5 de descrição, se o SQLite suportar;
+       - cria os contadores de alteração por tabela (ver ChangeWatcher);
+       - cria o resumo mensal materializado (ver _sync_resumo)."""
+    _criar_tabelas(cur)
+
+    # contas_a_pagar
+    _safe_add_column(cur, "contas_a_pagar", "data", "TEXT")
+    _safe_add_column(cur, "contas_a_pagar", "pago", "INTEGER DEFAULT 0")
+    _safe_add_column(cur, "contas_a_pagar", "fitid", "TEXT")
+    cur.execute("PRAGMA table_info(contas_a_pagar)")
+    cols_pagar = [r["name"] for r in cur.fetchall()]
+    if "vencimento" in cols_pagar:
+        cur.execute("""
+            UPDATE contas_a_pagar
+               SET data = COALESCE(NULLIF(data, ''), vencimento)
+             WHERE (data IS NULL OR data = '')
+        """)
+
+    # contas_a_receber
+    _safe_add_column(cur, "contas_a_receber", "data", "TEXT")
+    _safe_add_column(cur, "contas_a_receber", "recebido", "INTEGER DEFAULT 0")
+    _safe_add_column(cur, "contas_a_receber", "fitid", "TEXT")
+    cur.execute("PRAGMA table_info(contas_a_receber)")
+    cols_receber = [r["name"] for r in cur.fetchall()]
+    if "vencimento" in cols_receber:
+        cur.execute("""
+            UPDATE contas_a_receber
+               SET data = COALESCE(NULLIF(data, ''), vencimento)
+             WHERE (data IS NULL OR data = '')
+        """)
+
+    # Índices únicos condicionais por (conta_id, fitid)
+    cur.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_pagar_conta_fitid
+        ON contas_a_pagar (conta_id, fitid)
+        WHERE fitid IS NOT NULL
+    """)
+    cur.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_receber_conta_fitid
+        ON contas_a_receber (conta_id, fitid)
+        WHERE fitid IS NOT NULL
+    """)
+
+    _sync_centavos(cur)
+
+    # Índices para filtros por período/conta/categoria (predicados de intervalo em 'data').
+    # (conta, data, valor_centavos) atende o dedupe por igualdade e cobre o antigo (conta, data).
+    for prefixo, tabela in (("pagar", "contas_a_pagar"), ("receber", "contas_a_receber")):
+        # data vazia é '' (como o sistema grava): a paginação compara (data, id)
+        # e NULL não casa com nenhuma comparação
+        cur.execute(f"UPDATE {tabela} SET data = '' WHERE data IS NULL")
+        cur.execute(f"CREATE INDEX IF NOT EXISTS ix_{prefixo}_data_id ON {tabela} (data, id)")
+        cur.execute(f"DROP INDEX IF EXISTS ix_{prefixo}_conta_data")
+        cur.execute(f"CREATE INDEX IF NOT EXISTS ix_{prefixo}_conta_data_valor "
+                    f"ON {tabela} (conta_id, data, valor_centavos)")
+        cur.execute(f"CREATE INDEX IF NOT EXISTS ix_{prefixo}_categoria_data ON {tabela} (categoria, data)")
+
+    _sync_fts(cur)
+    _sync_contadores(cur)
+    _sync_resumo(cur)
+
+def _migracao_2(cur):
+    """FTS de descrição: unicode61 (palavras, por prefixo) -> trigram (substring),
+       para a busca no banco casar como os filtros da GUI ("gua" acha "Água")."""
+    _sync_fts(cur)
+
+def _refazer_triggers_resumo(cur):
+    for tipo, _, _ in _RESUMO_TABELAS:
+        for evento in ("ai", "ad", "au"):
+            cur.execute(f"DROP TRIGGER IF EXISTS trg_resumo_{tipo}_{evento}")
+    _sync_resumo(cur)           # sem os triggers, reconstrói o resumo
+
+def _migracao_3(cur):
+    """Triggers do resumo mensal refeitos: a chave com data NULL violava o NOT NULL."""
+    _refazer_triggers_resumo(cur)
+
+def _migracao_4(cur):
+    """Centavos com o mesmo arredondamento de _centavos (meio centavo para cima):
+       triggers refeitos e linhas gravadas só em 'valor' (por versões antigas)
+       recalculadas. Quem grava valor_centavos (este programa) já estava certo."""
+    for prefixo, tabela in (("pagar", "contas_a_pagar"), ("receber", "contas_a_receber")):
+        cur.execute(f"DROP TRIGGER IF EXISTS trg_{prefixo}_centavos_ai")
+        cur.execute(f"DROP TRIGGER IF EXISTS trg_{prefixo}_centavos_au")
+        cur.execute(f"""
+            UPDATE {tabela} SET valor_centavos = CAST(ROUND(ROUND(valor, 2) * 100) AS INTEGER)
+             WHERE valor IS NOT NULL AND valor_centavos = CAST(ROUND(valor * 100) AS INTEGER)
+               AND valor_centavos <> CAST(ROUND(ROUND(valor, 2) * 100) AS INTEGER)
+        """)
+    _sync_centavos(cur)
+    # o SQLite dispara primeiro o trigger criado por último: os do resumo têm de
+    # vir depois dos de centavos, senão o INSERT só com 'valor' entra no resumo
+    # duas vezes (pelo trg_*_centavos_ai -> trg_resumo_*_au e pelo trg_resumo_*_ai)
+    _refazer_triggers_resumo(cur)
+
+_MIGRACOES = (
+    (1, _migracao_1),
+    (2, _migracao_2),
+    (3, _migracao_3),
+    (4, _migracao_4),
+)
+SCHEMA_VERSAO = _MIGRACOES[-1][0]
+
+def migrate_schema_if_needed(forcar: bool = False) -> int:
+    """Leva o banco a SCHEMA_VERSAO rodando as migrações pendentes, numa única
+       transação (BEGIN IMMEDIATE: duas instâncias abrindo juntas não migram
+       em dobro). Banco em dia: só lê a versão e confere o FTS.
+       forcar=True roda todas de novo (são idempotentes), ex.: depois de uma
+       carga com os triggers desligados. Retorna quantas migrações rodaram."""
+    con = get_conn()
+    cur = con.cursor()
+    if not forcar and _versao_schema(cur) >= SCHEMA_VERSAO:
+        _conferir_fts(cur)
+        return 0
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        # outra instância pode ter migrado enquanto esperávamos o lock
+        versao = 0 if forcar else _versao_schema(cur)
+        pendentes = [migrar for v, migrar in _MIGRACOES if v > versao]
+        for migrar in pendentes:
+            migrar(cur)
+        if pendentes:
+            cur.execute(f"PRAGMA user_version = {SCHEMA_VERSAO}")
+        con.commit()
+    except BaseException:
+        con.rollback()
+        raise
+    if not pendentes:
+        _conferir_fts(cur)
+    return len(pendentes)
+
+# ----------------- Valores em centavos -----------------
+# 'valor_centavos' (INTEGER) é o valor de referência: somas exatas e dedupe
+# por igualdade, usando índice. 'valor' (REAL) continua sendo gravado junto,
+# para versões antigas do programa abertas no mesmo banco; o que elas gravarem
+# só em 'valor' é convertido pelos triggers abaixo. ROUND(valor, 2) antes de
+# multiplicar: o ROUND do SQLite arredonda o texto decimal do valor (meio
+# centavo para cima, como _centavos), já valor*100 sai do float binário
+# (0.285*100 = 28.4999...).
+def _sync_centavos(cur):
+    for prefixo, tabela in (("pagar", "contas_a_pagar"), ("receber", "contas_a_receber")):
+        _safe_add_column(cur, tabela, "valor_centavos", "INTEGER")
+        cur.execute(f"""
+            UPDATE {tabela} SET valor_centavos = CAST(ROUND(ROUND(COALESCE(valor, 0), 2) * 100) AS INTEGER)
+             WHERE valor_centavos IS NULL
+        """)
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{prefixo}_centavos_ai AFTER INSERT ON {tabela}
+            WHEN new.valor_centavos IS NULL BEGIN
+                UPDATE {tabela} SET valor_centavos = CAST(ROUND(ROUND(COALESCE(new.valor, 0), 2) * 100) AS INTEGER)
+                 WHERE id = new.id;
+            END
+        """)
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{prefixo}_centavos_au AFTER UPDATE OF valor ON {tabela}
+            WHEN new.valor IS NOT old.valor AND new.valor_centavos IS old.valor_centavos BEGIN
+                UPDATE {tabela} SET valor_centavos = CAST(ROUND(ROUND(COALESCE(new.valor, 0), 2) * 100) AS INTEGER)
+                 WHERE id = new.id;
+            END
+        """)
+
+# ----------------- Busca textual (FTS5) -----------------
+# fts_pagar/fts_receber indexam 'descricao' (tabelas de conteúdo externo, sem
+# duplicar o texto). O tokenizer trigram responde busca por SUBSTRING, como os
+# filtros da GUI ("gua" acha "Água de coco"); com remove_diacritics, sem
+# diferenciar acentos nem caixa. Triggers mantêm o índice em dia.
+# remove_diacritics no trigram só existe a partir do SQLite 3.45: antes disso
+# (ou sem FTS5) não há índice e a busca é LIKE sobre sem_acento(descricao) —
+# varre a tabela, mas casa exatamente como a GUI.
+_fts_ativo = False
+_TOKENIZER_FTS = "trigram remove_diacritics 1"
+
+def _fts5_compilado(cur) -> bool:
+    cur.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+    return bool(cur.fetchone()[0])
+
+def _fts_suportado(cur) -> bool:
+    return sqlite3.sqlite_version_info >= (3, 45, 0) and _fts5_compilado(cur)
+
+def _sync_fts(cur):
+    """Cria (ou desliga) os índices FTS5 conforme o SQLite disponível.
+       Sem suporte os triggers são removidos — senão todo INSERT/UPDATE/DELETE
+       falharia ao tocar a tabela virtual — e as buscas voltam ao LIKE.
+       Índice com outro tokenizer (o unicode61 de antes) é refeito."""
+    global _fts_ativo
+    _fts_ativo = _fts_suportado(cur)
+    for prefixo, tabela in (("pagar", "contas_a_pagar"), ("receber", "contas_a_receber")):
+        fts = f"fts_{prefixo}"
+        cur.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (fts,))
+        linha = cur.fetchone()
+        antigo = linha is not None and _TOKENIZER_FTS not in linha[0]
+        if not _fts_ativo or antigo:
+            for evento in ("ai", "ad", "au"):
+                cur.execute(f"DROP TRIGGER IF EXISTS trg_{fts}_{evento}")
+            if linha is not None:
+                try:
+                    cur.execute(f"DROP TABLE {fts}")
+                except sqlite3.OperationalError:
+                    pass      # criado por um SQLite mais novo: fica sem uso, sem triggers
+        if not _fts_ativo:
+            continue
+
+        cur.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='trigger' AND name LIKE ?",
+                    (f"trg_{fts}_%",))
+        triggers_ok = cur.fetchone()[0] == 3
+
+        cur.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts}
+            USING fts5(descricao, content='{tabela}', content_rowid='id',
+                       tokenize='{_TOKENIZER_FTS}')
+        """)
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_ai AFTER INSERT ON {tabela} BEGIN
+                INSERT INTO {fts}(rowid, descricao) VALUES (new.id, new.descricao);
+            END
+        """)
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_ad AFTER DELETE ON {tabela} BEGIN
+                INSERT INTO {fts}({fts}, rowid, descricao) VALUES ('delete', old.id, old.descricao);
+            END
+        """)
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_au AFTER UPDATE OF descricao ON {tabela} BEGIN
+                INSERT INTO {fts}({fts}, rowid, descricao) VALUES ('delete', old.id, old.descricao);
+                INSERT INTO {fts}(rowid, descricao) VALUES (new.id, new.descricao);
+            END
+        """)
+        # Índice novo, ou que ficou sem triggers por um tempo: reconstrói do zero
+        if not triggers_ok:
+            cur.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+def _conferir_fts(cur):
+    """Banco em dia: decide se o FTS está ativo sem migrar. Se o arquivo veio
+       de um SQLite com suporte diferente (triggers do FTS sem FTS5, ou FTS5
+       sem os índices), refaz só essa parte."""
+    global _fts_ativo
+    cur.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='trigger' AND name LIKE 'trg_fts_%'")
+    completo = cur.fetchone()[0] == 6
+    if completo == _fts_suportado(cur):
+        _fts_ativo = completo
+        return
+    with transaction():
+        _sync_fts(cur)
+
+def fts_ativo() -> bool:
+    """True se as buscas por descrição podem usar os índices FTS5."""
+    return _fts_ativo
+
+# ----------------- Detecção de alterações -----------------
+# Para ver o que outras instâncias (outros processos/máquinas usando o mesmo
+# FINANCEIRO_DB) gravaram sem reler tudo:
+#   - PRAGMA data_version muda quando OUTRA conexão faz commit no arquivo;
+#     é uma leitura em memória, barata o bastante para sondar a cada segundo;
+#   - a tabela 'alteracoes' guarda um contador por tabela, incrementado por
+#     triggers, que diz QUAIS tabelas mudaram.
+TABELAS_MONITORADAS = ("contas_a_pagar", "contas_a_receber", "contas_financeiras", "categorias")
+
+def _sync_contadores(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS alteracoes (
+            tabela TEXT PRIMARY KEY,
+            versao INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    for tabela in TABELAS_MONITORADAS:
+        cur.execute("INSERT OR IGNORE INTO alteracoes (tabela) VALUES (?)", (tabela,))
+        for sufixo, evento in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE")):
+            cur.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_alt_{tabela}_{sufixo} AFTER {evento} ON {tabela} BEGIN
+                    UPDATE alteracoes SET versao = versao + 1 WHERE tabela = '{tabela}';
+                END
+            """)
+
+# ----------------- Resumo mensal materializado -----------------
+# 'resumo_mensal' guarda quantidade e total (centavos) por
+# (ano, mes, conta_id, categoria, tipo, status), mantidos por triggers a cada
+# INSERT/UPDATE/DELETE. Totais de um período viram uma busca pela chave
+# primária em poucas centenas de linhas, em vez de varrer os lançamentos.
+# Data vazia fica como ano 0 / mês 0. Se o resumo ficar inconsistente (ex.:
+# banco alterado com os triggers desligados), rebuild_resumo_mensal() o
+# refaz: python -m core.manutencao resumo
+_RESUMO_TABELAS = (
+    # tipo, tabela, coluna de status
+    ("pagar", "contas_a_pagar", "pago"),
+    ("receber", "contas_a_receber", "recebido"),
+)
+
+def _chave_resumo(linha: str, tipo: str, status_col: str) -> str:
+    """Valores da chave do resumo para a linha 'new'/'old' de um trigger (ou a tabela)."""
+    # data NULL (versões antigas gravam só 'vencimento') cai em ano 0 / mês 0, como a vazia
+    return (f"COALESCE(CAST(substr({linha}.data, 1, 4) AS INTEGER), 0), "
+            f"COALESCE(CAST(substr({linha}.data, 6, 2) AS INTEGER), 0), "
+            f"{linha}.conta_id, COALESCE({linha}.categoria, ''), '{tipo}', COALESCE({linha}.{status_col}, 0)")
+
+_COLUNAS_CHAVE_RESUMO = "ano, mes, conta_id, categoria, tipo, status"
+
+def _sync_resumo(cur):
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='resumo_mensal'")
+    existia = cur.fetchone() is not None
+    cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS resumo_mensal (
+            ano       INTEGER NOT NULL,
+            mes       INTEGER NOT NULL,
+            conta_id  INTEGER NOT NULL,
+            categoria TEXT    NOT NULL,
+            tipo      TEXT    NOT NULL,
+            status    INTEGER NOT NULL,
+            qtd       INTEGER NOT NULL,
+            centavos  INTEGER NOT NULL,
+            PRIMARY KEY ({_COLUNAS_CHAVE_RESUMO})
+        ) WITHOUT ROWID
+    """)
+    cur.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='trigger' AND name LIKE 'trg_resumo_%'")
+    triggers_ok = cur.fetchone()[0] == 3 * len(_RESUMO_TABELAS)
+
+    for tipo, tabela, status_col in _RESUMO_TABELAS:
+        somar = f"""
+            INSERT INTO resumo_mensal ({_COLUNAS_CHAVE_RESUMO}, qtd, centavos)
+            VALUES ({_chave_resumo("new", tipo, status_col)}, 1, COALESCE(new.valor_centavos, 0))
+            ON CONFLICT ({_COLUNAS_CHAVE_RESUMO}) DO UPDATE
+               SET qtd = qtd + 1, centavos = centavos + excluded.centavos;
+        """
+        chave_old = f"({_COLUNAS_CHAVE_RESUMO}) = ({_chave_resumo('old', tipo, status_col)})"
+        subtrair = f"""
+            UPDATE resumo_mensal SET qtd = qtd - 1, centavos = centavos - COALESCE(old.valor_centavos, 0)
+             WHERE {chave_old};
+            DELETE FROM resumo_mensal WHERE {chave_old} AND qtd = 0;
+        """
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_resumo_{tipo}_ai AFTER INSERT ON {tabela} BEGIN
+                {somar}
+            END
+        """)
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_resumo_{tipo}_ad AFTER DELETE ON {tabela} BEGIN
+                {subtrair}
+            END
+        """)
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_resumo_{tipo}_au
+            AFTER UPDATE OF data, conta_id, categoria, {status_col}, valor_centavos ON {tabela} BEGIN
+                {subtrair}
+                {somar}
+            END
+        """)
+
+    # Resumo novo, ou que ficou sem triggers por um tempo: refaz do zero
+    if not existia or not triggers_ok:
+        _reconstruir_resumo(cur)
+
+def _reconstruir_resumo(cur):
+    cur.execute("DELETE FROM resumo_mensal")
+    for tipo, tabela, status_col in _RESUMO_TABELAS:
+        cur.execute(f"""
+            INSERT INTO resumo_mensal ({_COLUNAS_CHAVE_RESUMO}, qtd, centavos)
+            SELECT {_chave_resumo(tabela, tipo, status_col)}, COUNT(*), COALESCE(SUM(valor_centavos), 0)
+              FROM {tabela}
+             GROUP BY 1, 2, 3, 4, 5, 6
+        """)
+
+def rebuild_resumo_mensal() -> int:
+    """Refaz o resumo mensal a partir dos lançamentos. Retorna o nº de linhas do resumo."""
+    with transaction() as con:
+        cur = con.cursor()
+        _reconstruir_resumo(cur)
+        cur.execute("SELECT COUNT(*) FROM resumo_mensal")
+        return cur.fetchone()[0]
+
+class ChangeWatcher:
+    """Sonda o banco e informa quais tabelas foram alteradas desde a última vez.
+
+    Usa a conexão do pool da thread que chama poll() (na GUI, a thread do Tk).
+    O que essa mesma conexão gravou não é reportado: quem gravou já atualizou
+    a própria tela.
+
+        watcher = ChangeWatcher()
+        ...
+        mudou = watcher.poll()     # ex.: {"contas_a_pagar"}; vazio se nada mudou
+    """
+
+    def __init__(self):
+        self._data_version = None
+        self._versoes = {}
+        self._commits = 0
+        self.poll()
+
+    def _ler_versoes(self, con) -> dict:
+        return {r["tabela"]: r["versao"] for r in con.execute("SELECT tabela, versao FROM alteracoes")}
+
+    def poll(self) -> set:
+        con = get_conn()
+        dv = con.execute("PRAGMA data_version").fetchone()[0]
+        if dv == self._data_version:
+            if self._commits != _local.commits:
+                # só commits desta conexão: absorve os contadores sem reportar
+                self._commits = _local.commits
+                self._versoes = self._ler_versoes(con)
+            return set()
+        self._data_version = dv
+        self._commits = _local.commits
+        versoes = self._ler_versoes(con)
+        mudou = {t for t, v in versoes.items() if self._versoes.get(t) != v}
+        self._versoes = versoes
+        return mudou
@@ -0,0 +1,234 @@
+# core/entry_store.py — lançamentos em colunas (arrays) no lugar de lista de dicts
+#
+# Um dict de oito chaves por linha custa centenas de bytes. Aqui cada campo é
+# uma coluna compacta:
+#   id          -> array('q')
+#   valor       -> centavos inteiros em array('q') (somas exatas, sem deriva)
+#   data        -> AAAAMMDD em array('l') (0 = vazia ou fora do padrão ISO)
+#   conta       -> conta_id em array('q'); o nome fica numa tabela id -> nome
+#   categoria   -> id do texto internado, array('l')
+#   descrição   -> lista de str (textos repetidos compartilham o mesmo objeto)
+#   pago/recebido -> bytearray
+#
+# EntryStore se comporta como uma lista de lançamentos (len, índice, insert,
+# del, bisect...) e store[i] devolve uma EntryRow, que se lê como o dict de
+# antes: row["valor"], row.get("pago"), dict(row). As colunas são públicas
+# para somas e máscaras vetorizadas (ex.: store.soma(posicoes)).
+
+from array import array
+from collections.abc import Mapping, MutableSequence
+from decimal import Decimal, ROUND_HALF_UP
+from itertools import compress
+
+_STATUS = {"pagar": "pago", "receber": "recebido"}
+_SEM_CONTA = -1
+
+def _empacotar_data(s: str) -> int:
+    if len(s) == 10 and s[4] == "-" and s[7] == "-":
+        n = s[:4] + s[5:7] + s[8:]
+        if n.isdigit():
+            return int(n)
+    return 0
+
+def _desempacotar_data(n: int) -> str:
+    return f"{n // 10000:04d}-{n // 100 % 100:02d}-{n % 100:02d}"
+
+def _centavos(valor) -> int:
+    """Valor em reais (float, int, Decimal ou texto '1234.56') -> centavos inteiros.
+       Meio centavo arredonda para cima, como os triggers de
+       'valor_centavos' no banco (ROUND(ROUND(valor, 2) * 100), ver database._sync_centavos).
+       É o conversor de todo o core (models o reexporta)."""
+    return int((Decimal(str(valor or 0)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+class EntryRow(Mapping):
+    """Uma linha do EntryStore, lida direto das colunas (nada é copiado).
+       É uma visão posicional: vale enquanto a linha não mudar de posição."""
+    __slots__ = ("_store", "_pos")
+
+    def __init__(self, store, pos: int):
+        self._store = store
+        self._pos = pos
+
+    def __getitem__(self, chave):
+        return self._store._campo(self._pos, chave)
+
+    def __iter__(self):
+        return iter(self._store.chaves)
+
+    def __len__(self):
+        return len(self._store.chaves)
+
+    def __repr__(self):
+        return f"EntryRow({dict(self)!r})"
+
+class EntryStore(MutableSequence):
+    """Lançamentos de um tipo ('pagar' ou 'receber') em colunas.
+
+    com_tipo: inclui a chave "tipo" nas linhas (como nas buscas de models).
+    """
+
+    def __init__(self, tipo: str, linhas=(), com_tipo: bool = False):
+        self.tipo = tipo
+        self.status_col = _STATUS[tipo]
+        self.chaves = (("id", "tipo") if com_tipo else ("id",)) + (
+            "descricao", "valor", "vencimento", "conta_id", "conta_nome", "categoria", self.status_col)
+        self.ids = array("q")
+        self.centavos = array("q")
+        self.datas = array("l")
+        self.contas = array("q")
+        self.categorias = array("l")
+        self.descricoes = []
+        self.status = bytearray()
+        self.nomes_conta = {}           # conta_id -> nome
+        self._textos = []               # categorias internadas: id -> texto
+        self._id_texto = {}
+        self._descs = {}                # internação das descrições
+        self._datas_livres = {}         # id do lançamento -> data fora do padrão
+        for d in linhas:
+            self.append(d)
+
+    @classmethod
+    def from_rows(cls, tipo: str, cursor):
+        """Monta a partir de linhas do SQLite (id, descricao, valor_centavos, data,
+           conta_id, categoria, pago/recebido, conta_nome)."""
+        store = cls(tipo)
+        status_col = store.status_col
+        for r in cursor:
+            store._anexar(r["id"], r["descricao"], r["valor_centavos"] or 0, r["data"], r["conta_id"],
+                          r["conta_nome"], r["categoria"], r[status_col])
+        return store
+
+    # ---- conversão de/para as colunas ----
+    def _texto_id(self, texto: str) -> int:
+        i = self._id_texto.get(texto)
+        if i is None:
+            i = self._id_texto[texto] = len(self._textos)
+            self._textos.append(texto)
+        return i
+
+    def _valores(self, item_id, descricao, centavos, data, conta_id, conta_nome, categoria, status):
+        descricao = descricao or ""
+        descricao = self._descs.setdefault(descricao, descricao)
+        data = data or ""
+        data_n = _empacotar_data(data)
+        if not data_n and data:
+            self._datas_livres[item_id] = data
+        if conta_id is None:
+            conta_id = _SEM_CONTA
+        elif conta_nome is not None:
+            self.nomes_conta[conta_id] = conta_nome
+        return (item_id, centavos, data_n, conta_id,
+                self._texto_id(categoria or ""), descricao, 1 if status else 0)
+
+    def _de_dict(self, d):
+        return self._valores(d.get("id"), d.get("descricao"), _centavos(d.get("valor")), d.get("vencimento"),
+                             d.get("conta_id"), d.get("conta_nome"), d.get("categoria"),
+                             d.get(self.status_col))
+
+    def _colunas(self):
+        return (self.ids, self.centavos, self.datas, self.contas,
+                self.categorias, self.descricoes, self.status)
+
+    def _anexar(self, *campos):
+        for col, v in zip(self._colunas(), self._valores(*campos)):
+            col.append(v)
+
+    def _campo(self, pos: int, chave):
+        if chave == "id":
+            return self.ids[pos]
+        if chave == "descricao":
+            return self.descricoes[pos]
+        if chave == "valor":
+            return self.centavos[pos] / 100
+        if chave == "vencimento":
+            n = self.datas[pos]
+            return _desempacotar_data(n) if n else self._datas_livres.get(self.ids[pos], "")
+        if chave == "conta_id":
+            c = self.contas[pos]
+            return None if c == _SEM_CONTA else c
+        if chave == "conta_nome":
+            return self.nomes_conta.get(self.contas[pos], "")
+        if chave == "categoria":
+            return self._textos[self.categorias[pos]]
+        if chave == self.status_col:
+            return bool(self.status[pos])
+        if chave == "tipo" and "tipo" in self.chaves:
+            return self.tipo
+        raise KeyError(chave)
+
+    # ---- protocolo de sequência ----
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return [EntryRow(self, i) for i in range(*pos.indices(len(self)))]
+        if pos < 0:
+            pos += len(self)
+        if not 0 <= pos < len(self):
+            raise IndexError("posição fora do EntryStore")
+        return EntryRow(self, pos)
+
+    def __iter__(self):
+        return (EntryRow(self, i) for i in range(len(self)))
+
+    def __setitem__(self, pos: int, d):
+        if not isinstance(pos, int):
+            raise TypeError("EntryStore só aceita atribuição por posição")
+        self._esquecer(pos)
+        for col, v in zip(self._colunas(), self._de_dict(d)):
+            col[pos] = v
+
+    def __delitem__(self, pos: int):
+        if not isinstance(pos, int):
+            raise TypeError("EntryStore só aceita exclusão por posição")
+        self._esquecer(pos)
+        for col in self._colunas():
+            del col[pos]
+
+    def insert(self, pos: int, d):
+        for col, v in zip(self._colunas(), self._de_dict(d)):
+            col.insert(pos, v)
+
+    def _esquecer(self, pos: int):
+        if not self.datas[pos]:
+            self._datas_livres.pop(self.ids[pos], None)
+
+    def __eq__(self, outro):
+        if not isinstance(outro, (EntryStore, list, tuple)):
+            return NotImplemented
+        return len(self) == len(outro) and all(a == b for a, b in zip(self, outro))
+
+    def __repr__(self):
+        return f"EntryStore({self.tipo!r}, {len(self)} linhas)"
+
+    # ---- operações em colunas ----
+    def soma(self, posicoes=None) -> float:
+        """Soma exata (em centavos) dos valores; todas as linhas se posicoes=None."""
+        if posicoes is None:
+            return sum(self.centavos) / 100
+        return sum(map(self.centavos.__getitem__, posicoes)) / 100
+
+    def posicoes_com_status(self, marcado: bool = True) -> list:
+        """Posições pagas/recebidas (ou pendentes, se marcado=False)."""
+        mascara = self.status if marcado else self.status.translate(bytes([1, 0]) + bytes(254))
+        return list(compress(range(len(self)), mascara))
+
+    def renomear_conta(self, conta_id: int, nome: str):
+        """Todas as linhas da conta passam a mostrar o novo nome (O(1))."""
+        self.nomes_conta[conta_id] = nome
+
+    def colunas_busca(self):
+        """(descrições, datas ISO, centavos) por linha — montagem rápida do SearchIndex.
+           Listas novas: seguem válidas se o store mudar depois."""
+        cache = {}
+        datas = []
+        for pos, n in enumerate(self.datas):
+            if n:
+                s = cache.get(n)
+                if s is None:
+                    s = cache[n] = _desempacotar_data(n)
+            else:
+                s = self._datas_livres.get(self.ids[pos], "")
+            datas.append(s)
+        return list(self.descricoes), datas, self.centavos.tolist()
@@ -1,106 +1,225 @@
-# core/export_excel.py — Exportação Excel com data BR + Relatório Mensal por Categoria
-from datetime import datetime
-from pathlib import Path
-from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Alignment, Font, numbers
-
-from . import models
-
-def _formatar_data_br(data_str: str) -> str:
-    try:
-        return datetime.strptime(data_str, "%Y-%m-%d").strftime("%d/%m/%Y")
-    except Exception:
-        return data_str or ""
-
-def _autoajustar_colunas(ws):
-    for col in ws.columns:
-        max_len = 0
-        col_letter = get_column_letter(col[0].column)
-        for cell in col:
-            val = "" if cell.value is None else str(cell.value)
-            max_len = max(max_len, len(val))
-        ws.column_dimensions[col_letter].width = min(max_len + 2, 50)
-
-def _preencher_sheet(ws, linhas, tipo: str):
-    """
-    linhas: lista de dicts (pagar/receber) com chaves:
-      descricao, valor, vencimento(YYYY-MM-DD), conta_nome, categoria, pago/recebido
-    tipo: "pagar" ou "receber" (define o texto do status)
-    """
-    ws.append(["Descrição", "Valor", "Data", "Conta", "Categoria", "Status"])
-    header = ws[1]
-    for c in header:
-        c.font = Font(bold=True)
-        c.alignment = Alignment(horizontal="center")
-
-    for it in linhas:
-        status_txt = (
-            "Pago" if (tipo == "pagar" and it.get("pago")) else
-            "Recebido" if (tipo == "receber" and it.get("recebido")) else
-            "Pendente"
-        )
-        data_br = _formatar_data_br(it.get("vencimento", ""))
-        ws.append([
-            it.get("descricao", ""),
-            float(it.get("valor", 0.0)),
-            data_br,
-            it.get("conta_nome", ""),
-            it.get("categoria", ""),
-            status_txt
-        ])
-
-    # Formatar coluna Valor como moeda (R$)
-    # Coluna 2: Valor, Coluna 3: Data (texto BR)
-    for row in ws.iter_rows(min_row=2, min_col=2, max_col=2):
-        for cell in row:
-            cell.number_format = u'R$ #,##0.00'
-
-    _autoajustar_colunas(ws)
-
-def export_to_excel(contas_a_pagar: list, contas_a_receber: list):
-    """
-    Exporta as listas já carregadas da GUI (mantido por compatibilidade).
-    Datas saem em BR.
-    """
-    try:
-        wb = Workbook()
-        ws_pg = wb.active
-        ws_pg.title = "Pagar"
-        _preencher_sheet(ws_pg, contas_a_pagar, "pagar")
-
-        ws_rc = wb.create_sheet("Receber")
-        _preencher_sheet(ws_rc, contas_a_receber, "receber")
-
-        out = Path.cwd() / "export_financeiro.xlsx"
-        wb.save(out)
-        return True, f"Arquivo gerado: {out}"
-    except Exception as e:
-        return False, f"Falha ao exportar: {e}"
-
-def export_monthly_report(mes: int, ano: int, categoria: str | None = None):
-    """
-    Gera um relatório mensal (mês/ano) filtrado por categoria (ou todas) em Excel.
-    Busca direto do banco via models.search_pagar/search_receber.
-    """
-    try:
-        cat = None if (not categoria or categoria.lower() == "todas") else categoria
-
-        pagar = models.search_pagar(mes=mes, ano=ano, categoria=cat)
-        receber = models.search_receber(mes=mes, ano=ano, categoria=cat)
-
-        wb = Workbook()
-        ws_pg = wb.active
-        ws_pg.title = "Pagar"
-        _preencher_sheet(ws_pg, pagar, "pagar")
-
-        ws_rc = wb.create_sheet("Receber")
-        _preencher_sheet(ws_rc, receber, "receber")
-
-        cat_slug = "Todas" if cat is None else cat.replace(" ", "_")
-        out_name = f"Relatorio_{ano}-{int(mes):02d}_{cat_slug}.xlsx"
-        out = Path.cwd() / out_name
-        wb.save(out)
-        return True, f"Relatório gerado: {out}"
-    except Exception as e:
-        return False, f"Falha ao gerar relatório: {e}"
+# core/export_excel.py — Exportação Excel com data BR + Relatório Mensal por Categoria
+# Totais e resumo do relatório vêm de models.aggregate (COUNT/SUM no SQLite).
+# As planilhas são gravadas em modo write-only (streaming): cada linha vai
+# direto para o arquivo, então a memória não cresce com o volume exportado.
+import os
+import threading
+from datetime import datetime
+from itertools import chain, islice
+from pathlib import Path
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+from openpyxl.styles import Alignment, Font
+
+from . import models
+from .database import Cancelado
+
+_CABECALHO = ["Descrição", "Valor", "Data", "Conta", "Categoria", "Status"]
+_CABECALHO_RESUMO = ["Tipo", "Categoria", "Status", "Quantidade", "Valor"]
+_FORMATO_MOEDA = u'R$ #,##0.00'
+# Em write-only as larguras precisam ser definidas antes da primeira linha;
+# elas são medidas nas primeiras linhas, que ficam num buffer limitado.
+_AMOSTRA_LARGURAS = 2000
+# a cada quantas linhas gravadas avisa o progresso / verifica cancelamento
+_AVISO_LINHAS = 1000
+
+def _formatar_data_br(data_str: str) -> str:
+    d = data_str or ""
+    # caminho rápido para AAAA-MM-DD (formato gravado pelo sistema)
+    if len(d) == 10 and d[4] == "-" and d[7] == "-":
+        return f"{d[8:10]}/{d[5:7]}/{d[0:4]}"
+    try:
+        return datetime.strptime(d, "%Y-%m-%d").strftime("%d/%m/%Y")
+    except Exception:
+        return d
+
+def _valores_linha(it, tipo: str) -> list:
+    status_txt = (
+        "Pago" if (tipo == "pagar" and it.get("pago")) else
+        "Recebido" if (tipo == "receber" and it.get("recebido")) else
+        "Pendente"
+    )
+    return [
+        it.get("descricao", ""),
+        float(it.get("valor", 0.0)),
+        _formatar_data_br(it.get("vencimento", "")),
+        it.get("conta_nome", ""),
+        it.get("categoria", ""),
+        status_txt,
+    ]
+
+def _ajustar_larguras(ws, linhas_amostra):
+    larguras = [len(h) for h in _CABECALHO]
+    for valores in linhas_amostra:
+        for i, v in enumerate(valores):
+            n = len(f"{v:.2f}") if isinstance(v, float) else len(str(v))
+            if n > larguras[i]:
+                larguras[i] = n
+    for i, n in enumerate(larguras, start=1):
+        ws.column_dimensions[get_column_letter(i)].width = min(n + 2, 50)
+
+def _cabecalho(ws, textos):
+    header = []
+    for txt in textos:
+        c = WriteOnlyCell(ws, value=txt)
+        c.font = Font(bold=True)
+        c.alignment = Alignment(horizontal="center")
+        header.append(c)
+    ws.append(header)
+
+def _celula_moeda(ws, valor: float, negrito: bool = False):
+    c = WriteOnlyCell(ws, value=valor)
+    c.number_format = _FORMATO_MOEDA
+    if negrito:
+        c.font = Font(bold=True)
+    return c
+
+def _aviso(progresso, cancelado, total: int | None):
+    """aviso(n) para _preencher_sheet: soma as linhas das abas, lança Cancelado
+       se cancelado() e repassa progresso(feito, total, texto). None se nenhum dos dois."""
+    if progresso is None and cancelado is None:
+        return None
+    gravadas = 0
+    def aviso(n):
+        nonlocal gravadas
+        gravadas += n
+        if cancelado is not None and cancelado():
+            raise Cancelado()
+        if progresso is not None:
+            progresso(gravadas, total, f"{gravadas} de {total} linhas gravadas" if total
+                      else f"{gravadas} linhas gravadas")
+    return aviso
+
+def _preencher_sheet(ws, linhas, tipo: str, total: dict | None = None, aviso=None):
+    """
+    ws: worksheet de um Workbook(write_only=True)
+    linhas: iterável de dicts (lista ou gerador lendo do banco) com chaves:
+      descricao, valor, vencimento(YYYY-MM-DD), conta_nome, categoria, pago/recebido
+    tipo: "pagar" ou "receber" (define o texto do status)
+    total: linha de models.aggregate; se dada, vira a última linha da planilha
+    aviso: aviso(n) chamado a cada _AVISO_LINHAS linhas (ver _aviso)
+    """
+    valores = (_valores_linha(it, tipo) for it in linhas)
+    amostra = list(islice(valores, _AMOSTRA_LARGURAS))
+    _ajustar_larguras(ws, amostra)
+    _cabecalho(ws, _CABECALHO)
+
+    # Coluna 2: Valor (moeda R$), Coluna 3: Data (texto BR)
+    n = 0
+    for v in chain(amostra, valores):
+        v[1] = _celula_moeda(ws, v[1])
+        ws.append(v)
+        n += 1
+        if aviso is not None and n % _AVISO_LINHAS == 0:
+            aviso(_AVISO_LINHAS)
+    if aviso is not None and n % _AVISO_LINHAS:
+        aviso(n % _AVISO_LINHAS)
+
+    if total is not None:
+        rotulo = WriteOnlyCell(ws, value=f"Total ({total['qtd']} itens)")
+        rotulo.font = Font(bold=True)
+        ws.append([rotulo, _celula_moeda(ws, total["valor"], negrito=True)])
+
+def _preencher_resumo(ws, grupos):
+    """grupos: linhas de models.aggregate(por=("categoria", "status"))."""
+    for i, n in enumerate((10, 30, 12, 12, 16), start=1):
+        ws.column_dimensions[get_column_letter(i)].width = n
+    _cabecalho(ws, _CABECALHO_RESUMO)
+    for g in grupos:
+        ws.append(["Pagar" if g["tipo"] == "pagar" else "Receber", g["categoria"] or "(sem categoria)",
+                   g["status"].capitalize(), g["qtd"], _celula_moeda(ws, g["valor"])])
+
+def _gravar_planilhas(out: Path, pagar, receber, totais: dict | None = None, resumo=None, aviso=None):
+    """totais: {tipo: linha de models.aggregate}; resumo: grupos para a aba 'Resumo'.
+       O livro é salvo num temporário na pasta de `out` e só no fim substitui
+       `out` (os.replace): se aviso lançar Cancelado, ou der qualquer erro, o
+       `out` anterior fica intacto e o temporário é apagado."""
+    totais = totais or {}
+    wb = Workbook(write_only=True)
+    # nome único por processo e thread; criado pelo save, com as permissões de sempre
+    temp = out.with_name(f".{out.stem}.{os.getpid()}-{threading.get_ident()}.xlsx")
+    salvo = False
+    try:
+        _preencher_sheet(wb.create_sheet("Pagar"), pagar, "pagar", totais.get("pagar"), aviso)
+        _preencher_sheet(wb.create_sheet("Receber"), receber, "receber", totais.get("receber"), aviso)
+        if resumo is not None:
+            _preencher_resumo(wb.create_sheet("Resumo"), resumo)
+        wb.save(temp)
+        salvo = True
+        os.replace(temp, out)
+    finally:
+        if not salvo:
+            _descartar(wb)
+        if os.path.exists(temp):
+            os.remove(temp)
+
+def _descartar(wb):
+    """Fecha as abas write-only de um livro que não será salvo (o openpyxl
+       apaga os rascunhos delas ao sair do programa)."""
+    for ws in wb.worksheets:
+        try:
+            ws.close()
+        except Exception:
+            pass            # aba que o save já tinha fechado
+
+def _texto_total(total: dict) -> str:
+    return f"{total['qtd']} itens • " + f"R$ {total['valor']:.2f}".replace(".", ",")
+
+def export_to_excel(contas_a_pagar: list, contas_a_receber: list):
+    """
+    Exporta as listas já carregadas da GUI (mantido por compatibilidade).
+    Datas saem em BR.
+    """
+    try:
+        out = Path.cwd() / "export_financeiro.xlsx"
+        _gravar_planilhas(out, contas_a_pagar, contas_a_receber)
+        return True, f"Arquivo gerado: {out}"
+    except Exception as e:
+        return False, f"Falha ao exportar: {e}"
+
+def export_database_to_excel(out: str | Path | None = None, progresso=None, cancelado=None):
+    """
+    Exporta todos os lançamentos direto do banco, lendo do cursor em
+    streaming (adequado para milhões de linhas). Datas saem em BR.
+    progresso(feito, total, texto) e cancelado() são opcionais (tarefa em segundo plano).
+    """
+    try:
+        out = Path(out) if out else Path.cwd() / "export_financeiro.xlsx"
+        total = sum(t["qtd"] for t in models.aggregate()) if progresso is not None else None
+        _gravar_planilhas(out, models.iter_entries("pagar"), models.iter_entries("receber"),
+                          aviso=_aviso(progresso, cancelado, total))
+        return True, f"Arquivo gerado: {out}"
+    except Cancelado:
+        return False, "Exportação cancelada."
+    except Exception as e:
+        return False, f"Falha ao exportar: {e}"
+
+def export_monthly_report(mes: int, ano: int, categoria: str | None = None,
+                          progresso=None, cancelado=None):
+    """
+    Gera um relatório mensal (mês/ano) filtrado por categoria (ou todas) em Excel.
+    Lê direto do banco via models.iter_entries, sem montar listas; os totais
+    de cada aba e a aba 'Resumo' (por categoria e status) vêm de models.aggregate.
+    progresso(feito, total, texto) e cancelado() são opcionais (tarefa em segundo plano).
+    """
+    try:
+        cat = None if (not categoria or categoria.lower() == "todas") else categoria
+
+        pagar = models.iter_entries("pagar", mes=mes, ano=ano, categoria=cat)
+        receber = models.iter_entries("receber", mes=mes, ano=ano, categoria=cat)
+        totais = {t["tipo"]: t for t in models.aggregate(mes=mes, ano=ano, categoria=cat)}
+        resumo = models.aggregate(por=("categoria", "status"), mes=mes, ano=ano, categoria=cat)
+
+        cat_slug = "Todas" if cat is None else cat.replace(" ", "_")
+        out_name = f"Relatorio_{ano}-{int(mes):02d}_{cat_slug}.xlsx"
+        out = Path.cwd() / out_name
+        total = totais["pagar"]["qtd"] + totais["receber"]["qtd"]
+        _gravar_planilhas(out, pagar, receber, totais, resumo, _aviso(progresso, cancelado, total))
+        return True, (f"Relatório gerado: {out}\n"
+                      f"A pagar: {_texto_total(totais['pagar'])}\n"
+                      f"A receber: {_texto_total(totais['receber'])}")
+    except Cancelado:
+        return False, "Relatório cancelado."
+    except Exception as e:
+        return False, f"Falha ao gerar relatório: {e}"
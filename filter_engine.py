@@ -0,0 +1,120 @@
+# core/filter_engine.py — motor dos filtros ao digitar (abas Pagar e Receber)
+#
+# Não depende do Tk nem do tipo de lançamento: recebe a lista exibida (dicts
+# de models ou EntryStore, na ordem da grid), aplica as mutações dela junto
+# com as do índice e, a partir do texto dos campos, devolve as posições que
+# casam e o total filtrado.
+# Regras, iguais para as duas abas:
+#   - Valor: número -> valor exato (±0,01); senão substring do valor exibido "R$ X,XX"
+#   - Descrição: substring, sem diferenciar maiúsculas nem acentos
+#   - Data: substring da data ISO (AAAA-MM-DD)
+#   - Busca geral: substring da descrição, da data BR ou do valor exibido
+
+import threading
+
+from .search_index import SearchIndex
+
+def parse_valor(s: str) -> float:
+    """Aceita '1.234,56' ou '1234.56'. Lança ValueError se não for número."""
+    s = (s or "").strip().replace("R$", "").replace(" ", "")
+    if not s:
+        raise ValueError("vazio")
+    if "," in s and "." in s:
+        s = s.replace(".", "").replace(",", ".")
+    else:
+        s = s.replace(",", ".")
+    return float(s)
+
+def criterios(valor: str = "", descricao: str = "", data: str = "", busca: str = "") -> dict | None:
+    """Texto dos campos -> argumentos de SearchIndex.filtrar (None = nenhum filtro)."""
+    valor = (valor or "").strip()
+    descricao = (descricao or "").strip().lower()
+    data = (data or "").strip().lower()
+    busca = (busca or "").strip().lower()
+    if not (valor or descricao or data or busca):
+        return None
+    crit = {"descricao": descricao, "data": data, "busca": busca}
+    if valor:
+        try:
+            crit["valor"] = parse_valor(valor)
+        except ValueError:
+            crit["valor_texto"] = valor   # não numérico: casa com o valor exibido
+    return crit
+
+class FilterEngine:
+    """Filtro de uma lista de lançamentos, com índice de busca sob demanda.
+
+    O índice (SearchIndex) é montado no primeiro filtro — normalmente na thread
+    de trabalho — e depois só acompanha inserir/substituir/remover. A lista é
+    mutada só por esses métodos, sob o mesmo lock em que a montagem tira a
+    cópia das colunas; a montagem em si roda fora do lock, sobre a cópia. Se
+    a lista mudar durante a montagem, o índice montado é descartado.
+    """
+
+    def __init__(self, lista=None):
+        self._lock = threading.Lock()
+        self._lista = lista if lista is not None else []
+        self._indice = None
+        self._versao = 0
+
+    # ---- acompanhamento da lista ----
+    def carregar(self, lista):
+        """Nova lista (recarga do banco): o índice antigo é descartado."""
+        with self._lock:
+            self._lista = lista
+            self._indice = None
+            self._versao += 1
+
+    def _mutar(self, mutacao, operacao, *args):
+        # lista e índice mudam juntos: a cópia para a montagem nunca vê só um
+        with self._lock:
+            mutacao()
+            self._versao += 1
+            if self._indice is not None:
+                getattr(self._indice, operacao)(*args)
+
+    def inserir(self, pos: int, item):
+        self._mutar(lambda: self._lista.insert(pos, item), "inserir", pos, item)
+
+    def substituir(self, pos: int, item):
+        self._mutar(lambda: self._lista.__setitem__(pos, item), "substituir", pos, item)
+
+    def remover(self, pos: int):
+        self._mutar(lambda: self._lista.__delitem__(pos), "remover", pos)
+
+    def _copia(self) -> dict:
+        """Argumentos do SearchIndex a partir de uma cópia da lista (sob o lock)."""
+        if hasattr(self._lista, "colunas_busca"):
+            return {"colunas": self._lista.colunas_busca()}
+        return {"linhas": list(self._lista)}
+
+    def indice(self) -> SearchIndex:
+        with self._lock:
+            if self._indice is not None:
+                return self._indice
+            copia, versao = self._copia(), self._versao
+        indice = SearchIndex(**copia)
+        with self._lock:
+            if self._versao == versao:
+                self._indice = indice
+        return indice
+
+    # ---- consulta ----
+    def filtrar(self, crit: dict, cancelado=lambda: False):
+        """(posições, soma dos valores) das linhas que atendem `crit`
+           (ver criterios()); None se cancelado no meio."""
+        indice = self.indice()
+        if cancelado():
+            return None
+        posicoes = indice.filtrar(cancelado=cancelado, **crit)
+        if posicoes is None:
+            return None
+        return posicoes, indice.soma(posicoes)
+
+    def preparar(self, **campos):
+        """Lê os campos agora e devolve fn(cancelado) para rodar em outra
+           thread — ou None se todos estiverem vazios."""
+        crit = criterios(**campos)
+        if crit is None:
+            return None
+        return lambda cancelado: self.filtrar(crit, cancelado)
@@ -1,810 +1,1363 @@
-# gui/finance_gui.py — Tkinter GUI com:
-# - datas BR (DD/MM/AAAA) na grid
-# - filtros ao digitar (Descrição, Valor, Data) + busca geral
-# - totais dinâmicos (quantidade e soma) conforme os filtros (Pagar)
-# - clique na coluna "Status" (toggle Pago/Recebido)
-# - importação OFX, exportação Excel
-# - relatório mensal por categoria
-# - multiseleção e exclusão em massa nas abas Pagar/Receber
-
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-from datetime import datetime
-
-from core import models
-from core import ofx_importer
-from core import export_excel
-
-# --------------- Estado em memória (listas e índices) --------------- #
-contas_a_pagar, contas_a_receber, contas_financeiras, categorias = [], [], [], []
-conta_pagar_idx = None
-conta_receber_idx = None
-conta_financeira_idx = None
-categoria_idx = None
-
-# --------------- Utilidades --------------- #
-def formatar_data_br(data_str: str) -> str:
-    """Converte 'YYYY-MM-DD' -> 'DD/MM/YYYY' (se falhar, retorna original)."""
-    try:
-        return datetime.strptime(data_str, "%Y-%m-%d").strftime("%d/%m/%Y")
-    except Exception:
-        return data_str or ""
-
-def _parse_valor_local(s: str) -> float:
-    """Aceita '1.234,56' ou '1234.56'. Lança ValueError se não for número."""
-    s = (s or "").strip().replace("R$", "").replace(" ", "")
-    if not s:
-        raise ValueError("vazio")
-    if "," in s and "." in s:
-        s = s.replace(".", "").replace(",", ".")
-    else:
-        s = s.replace(",", ".")
-    return float(s)
-
-def _format_money(v: float) -> str:
-    return f"R$ {float(v):.2f}".replace(".", ",")
-
-# --------------- Totais helpers (Pagar/Receber) --------------- #
-def _set_pg_total_by_indices(indices, pg_total_var):
-    total = 0.0
-    for i in indices:
-        try:
-            total += float(contas_a_pagar[i].get("valor", 0.0))
-        except Exception:
-            pass
-    pg_total_var.set(f"Total: {len(indices)} itens • {_format_money(total)}")
-
-def _set_rc_total_all(rc_total_var):
-    total = sum(float(x.get("valor", 0.0)) for x in contas_a_receber)
-    rc_total_var.set(f"Total: {len(contas_a_receber)} itens • {_format_money(total)}")
-
-# --------------- Recarregar tela --------------- #
-def _refresh_all(tree_pagar, tree_receber, tree_cats, tree_contas,
-                 combo_conta_pagar, combo_conta_receber, combo_import,
-                 combo_cat_pagar, combo_cat_receber,
-                 pg_total_var, rc_total_var):
-    """Recarrega dados do banco e repovoa grids/combos/totais."""
-    global contas_a_pagar, contas_a_receber, contas_financeiras, categorias
-    contas_a_pagar, contas_a_receber, contas_financeiras, categorias = models.load_all()
-
-    # Pagar
-    for r in tree_pagar.get_children():
-        tree_pagar.delete(r)
-    for i, c in enumerate(contas_a_pagar):
-        status = "☑ Pago" if c.get("pago") else "☐ Pendente"
-        tree_pagar.insert("", "end", iid=str(i),
-            values=(c.get("descricao",""),
-                    f"R$ {float(c.get('valor',0)):.2f}",
-                    formatar_data_br(c.get("vencimento","")),
-                    c.get("conta_nome",""),
-                    c.get("categoria",""),
-                    status))
-    _set_pg_total_by_indices(list(range(len(contas_a_pagar))), pg_total_var)
-
-    # Receber
-    for r in tree_receber.get_children():
-        tree_receber.delete(r)
-    for i, c in enumerate(contas_a_receber):
-        status = "☑ Recebido" if c.get("recebido") else "☐ Pendente"
-        tree_receber.insert("", "end", iid=str(i),
-            values=(c.get("descricao",""),
-                    f"R$ {float(c.get('valor',0)):.2f}",
-                    formatar_data_br(c.get("vencimento","")),
-                    c.get("conta_nome",""),
-                    c.get("categoria",""),
-                    status))
-    _set_rc_total_all(rc_total_var)
-
-    # Categorias
-    for r in tree_cats.get_children():
-        tree_cats.delete(r)
-    for i, nome in enumerate(categorias):
-        tree_cats.insert("", "end", iid=str(i), values=(nome,))
-
-    # Contas financeiras
-    for r in tree_contas.get_children():
-        tree_contas.delete(r)
-    for i, cf in enumerate(contas_financeiras):
-        tree_contas.insert("", "end", iid=str(i), values=(cf["nome"],))
-
-    # Combos
-    nomes_contas = [c["nome"] for c in contas_financeiras]
-    combo_conta_pagar["values"] = nomes_contas
-    combo_conta_receber["values"] = nomes_contas
-    combo_import["values"] = nomes_contas
-    combo_cat_pagar["values"] = categorias
-    combo_cat_receber["values"] = categorias
-
-# --------------- Janela principal --------------- #
-def main_window():
-    global conta_pagar_idx, conta_receber_idx, conta_financeira_idx, categoria_idx
-
-    root = tk.Tk()
-    root.title("Sistema de Controle Financeiro")
-
-    # Vars de totais DEVEM ser criadas após o root
-    pg_total_var = tk.StringVar(root, value="Total: 0 itens • R$ 0,00")
-    rc_total_var = tk.StringVar(root, value="Total: 0 itens • R$ 0,00")
-
-    nb = ttk.Notebook(root); nb.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-
-    aba_pagar = ttk.Frame(nb)
-    aba_receber = ttk.Frame(nb)
-    aba_cats = ttk.Frame(nb)
-    aba_contas = ttk.Frame(nb)
-
-    nb.add(aba_pagar, text="Contas a Pagar")
-    nb.add(aba_receber, text="Contas a Receber")
-    nb.add(aba_cats, text="Categorias")
-    nb.add(aba_contas, text="Contas Financeiras")
-
-    # -------- Contas a Pagar -------- #
-    f_pg = ttk.LabelFrame(aba_pagar, text="Detalhes da Conta a Pagar"); f_pg.pack(fill="x", padx=10, pady=5)
-    ttk.Label(f_pg, text="Descrição:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=2)
-    e_pg_desc = ttk.Entry(f_pg); e_pg_desc.grid(row=0, column=1, sticky=tk.EW, padx=5, pady=2)
-
-    ttk.Label(f_pg, text="Valor:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=2)
-    e_pg_valor = ttk.Entry(f_pg); e_pg_valor.grid(row=1, column=1, sticky=tk.EW, padx=5, pady=2)
-
-    ttk.Label(f_pg, text="Vencimento (AAAA-MM-DD):").grid(row=2, column=0, sticky=tk.W, padx=5, pady=2)
-    e_pg_data = ttk.Entry(f_pg); e_pg_data.grid(row=2, column=1, sticky=tk.EW, padx=5, pady=2)
-
-    ttk.Label(f_pg, text="Conta Financeira:").grid(row=3, column=0, sticky=tk.W, padx=5, pady=2)
-    cb_pg_conta = ttk.Combobox(f_pg, state="readonly"); cb_pg_conta.grid(row=3, column=1, sticky=tk.EW, padx=5, pady=2)
-
-    ttk.Label(f_pg, text="Categoria:").grid(row=4, column=0, sticky=tk.W, padx=5, pady=2)
-    cb_pg_cat = ttk.Combobox(f_pg, state="readonly"); cb_pg_cat.grid(row=4, column=1, sticky=tk.EW, padx=5, pady=2)
-
-    pago_var = tk.BooleanVar(root, value=False)
-    ttk.Checkbutton(f_pg, text="Pago", variable=pago_var).grid(row=5, column=1, sticky=tk.W, padx=5, pady=2)
-
-    f_pg.columnconfigure(1, weight=1)
-
-    # Barra de busca geral
-    fb_busca = ttk.Frame(aba_pagar); fb_busca.pack(fill="x", padx=10, pady=0)
-    ttk.Label(fb_busca, text="Buscar (Descrição/Valor/Data):").pack(side=tk.LEFT, padx=5)
-    e_pg_busca = ttk.Entry(fb_busca, width=40); e_pg_busca.pack(side=tk.LEFT, padx=5, fill="x", expand=True)
-    btn_limpar_filtros = ttk.Button(fb_busca, text="Limpar filtros")
-    btn_limpar_filtros.pack(side=tk.LEFT, padx=5)
-
-    tv_pg = ttk.Treeview(
-        aba_pagar,
-        columns=("Descricao","Valor","Vencimento","Conta","Categoria","Status"),
-        show="headings",
-        selectmode="extended"  # multiseleção
-    )
-    for col, txt in [("Descricao","Descrição"),("Valor","Valor"),("Vencimento","Vencimento"),
-                     ("Conta","Conta"),("Categoria","Categoria"),("Status","Status")]:
-        tv_pg.heading(col, text=txt)
-    tv_pg.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-
-    # Total Pagar (dinâmico)
-    lbl_pg_total = ttk.Label(aba_pagar, textvariable=pg_total_var, anchor="e")
-    lbl_pg_total.pack(fill="x", padx=12, pady=(0,8))
-
-    # -------- Contas a Receber -------- #
-    f_rc = ttk.LabelFrame(aba_receber, text="Detalhes da Conta a Receber"); f_rc.pack(fill="x", padx=10, pady=5)
-    ttk.Label(f_rc, text="Descrição:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=2)
-    e_rc_desc = ttk.Entry(f_rc); e_rc_desc.grid(row=0, column=1, sticky=tk.EW, padx=5, pady=2)
-
-    ttk.Label(f_rc, text="Valor:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=2)
-    e_rc_valor = ttk.Entry(f_rc); e_rc_valor.grid(row=1, column=1, sticky=tk.EW, padx=5, pady=2)
-
-    ttk.Label(f_rc, text="Vencimento (AAAA-MM-DD):").grid(row=2, column=0, sticky=tk.W, padx=5, pady=2)
-    e_rc_data = ttk.Entry(f_rc); e_rc_data.grid(row=2, column=1, sticky=tk.EW, padx=5, pady=2)
-
-    ttk.Label(f_rc, text="Conta Financeira:").grid(row=3, column=0, sticky=tk.W, padx=5, pady=2)
-    cb_rc_conta = ttk.Combobox(f_rc, state="readonly"); cb_rc_conta.grid(row=3, column=1, sticky=tk.EW, padx=5, pady=2)
-
-    ttk.Label(f_rc, text="Categoria:").grid(row=4, column=0, sticky=tk.W, padx=5, pady=2)
-    cb_rc_cat = ttk.Combobox(f_rc, state="readonly"); cb_rc_cat.grid(row=4, column=1, sticky=tk.EW, padx=5, pady=2)
-
-    recebido_var = tk.BooleanVar(root, value=False)
-    ttk.Checkbutton(f_rc, text="Recebido", variable=recebido_var).grid(row=5, column=1, sticky=tk.W, padx=5, pady=2)
-
-    f_rc.columnconfigure(1, weight=1)
-
-    tv_rc = ttk.Treeview(
-        aba_receber,
-        columns=("Descricao","Valor","Vencimento","Conta","Categoria","Status"),
-        show="headings",
-        selectmode="extended"  # multiseleção
-    )
-    for col, txt in [("Descricao","Descrição"),("Valor","Valor"),("Vencimento","Vencimento"),
-                     ("Conta","Conta"),("Categoria","Categoria"),("Status","Status")]:
-        tv_rc.heading(col, text=txt)
-    tv_rc.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-
-    # Total Receber (geral)
-    lbl_rc_total = ttk.Label(aba_receber, textvariable=rc_total_var, anchor="e")
-    lbl_rc_total.pack(fill="x", padx=12, pady=(0,8))
-
-    # -------- Categorias -------- #
-    f_cat = ttk.LabelFrame(aba_cats, text="Gerenciar Categorias"); f_cat.pack(fill="x", padx=10, pady=5)
-    ttk.Label(f_cat, text="Nome:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=2)
-    e_cat_nome = ttk.Entry(f_cat); e_cat_nome.grid(row=0, column=1, sticky=tk.EW, padx=5, pady=2)
-    f_cat.columnconfigure(1, weight=1)
-    tv_cat = ttk.Treeview(aba_cats, columns=("Nome",), show="headings")
-    tv_cat.heading("Nome", text="Nome da Categoria")
-    tv_cat.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-
-    # -------- Contas Financeiras -------- #
-    f_cf = ttk.LabelFrame(aba_contas, text="Gerenciar Contas"); f_cf.pack(fill="x", padx=10, pady=5)
-    ttk.Label(f_cf, text="Nome:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=2)
-    e_cf_nome = ttk.Entry(f_cf); e_cf_nome.grid(row=0, column=1, sticky=tk.EW, padx=5, pady=2)
-    f_cf.columnconfigure(1, weight=1)
-    tv_cf = ttk.Treeview(aba_contas, columns=("Nome",), show="headings")
-    tv_cf.heading("Nome", text="Nome da Conta")
-    tv_cf.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-
-    f_ofx = ttk.LabelFrame(aba_contas, text="Importar OFX"); f_ofx.pack(fill="x", padx=10, pady=5)
-    ttk.Label(f_ofx, text="Conta:").pack(side=tk.LEFT, padx=5, pady=5)
-    cb_import_conta = ttk.Combobox(f_ofx, state="readonly")
-    cb_import_conta.pack(side=tk.LEFT, padx=5, pady=5, expand=True, fill="x")
-    btn_import_ofx = ttk.Button(f_ofx, text="Importar OFX")
-    btn_import_ofx.pack(side=tk.LEFT, padx=5, pady=5)
-
-    btn_export = ttk.Button(root, text="Exportar para Excel")
-    btn_export.pack(pady=6)
-
-    btn_relatorio = ttk.Button(root, text="Relatório Mensal")
-    btn_relatorio.pack(pady=0)
-
-    # ------- Helpers preenchimento de campos ------- #
-    def fill_pg_fields(idx):
-        c = contas_a_pagar[idx]
-        e_pg_desc.delete(0, tk.END); e_pg_desc.insert(0, c["descricao"])
-        e_pg_valor.delete(0, tk.END); e_pg_valor.insert(0, str(c["valor"]))
-        e_pg_data.delete(0, tk.END); e_pg_data.insert(0, c["vencimento"])  # entrada segue AAAA-MM-DD
-        cb_pg_conta.set(c["conta_nome"]); cb_pg_cat.set(c["categoria"])
-        pago_var.set(bool(c.get("pago", False)))
-
-    def fill_rc_fields(idx):
-        c = contas_a_receber[idx]
-        e_rc_desc.delete(0, tk.END); e_rc_desc.insert(0, c["descricao"])
-        e_rc_valor.delete(0, tk.END); e_rc_valor.insert(0, str(c["valor"]))
-        e_rc_data.delete(0, tk.END); e_rc_data.insert(0, c["vencimento"])
-        cb_rc_conta.set(c["conta_nome"]); cb_rc_cat.set(c["categoria"])
-        recebido_var.set(bool(c.get("recebido", False)))
-
-    def fill_cat_fields(idx):
-        e_cat_nome.delete(0, tk.END); e_cat_nome.insert(0, categorias[idx])
-
-    def fill_cf_fields(idx):
-        e_cf_nome.delete(0, tk.END); e_cf_nome.insert(0, contas_financeiras[idx]["nome"])
-
-    # ------- Binds de seleção ------- #
-    def on_select_pg(event):
-        global conta_pagar_idx
-        item_id = tv_pg.focus()
-        if not item_id: conta_pagar_idx = None; return
-        conta_pagar_idx = int(item_id); fill_pg_fields(conta_pagar_idx)
-
-    def on_select_rc(event):
-        global conta_receber_idx
-        item_id = tv_rc.focus()
-        if not item_id: conta_receber_idx = None; return
-        conta_receber_idx = int(item_id); fill_rc_fields(conta_receber_idx)
-
-    def on_select_cat(event):
-        global categoria_idx
-        item_id = tv_cat.focus()
-        if not item_id: categoria_idx = None; return
-        categoria_idx = int(item_id); fill_cat_fields(categoria_idx)
-
-    def on_select_cf(event):
-        global conta_financeira_idx
-        item_id = tv_cf.focus()
-        if not item_id: conta_financeira_idx = None; return
-        conta_financeira_idx = int(item_id); fill_cf_fields(conta_financeira_idx)
-
-    tv_pg.bind("<<TreeviewSelect>>", on_select_pg)
-    tv_rc.bind("<<TreeviewSelect>>", on_select_rc)
-    tv_cat.bind("<<TreeviewSelect>>", on_select_cat)
-    tv_cf.bind("<<TreeviewSelect>>", on_select_cf)
-
-    # ------- Clique na coluna Status (simula checkbox) ------- #
-    def on_click_pg(event):
-        region = tv_pg.identify("region", event.x, event.y)
-        if region != "cell": return
-        if tv_pg.identify_column(event.x) != '#6': return
-        item_id = tv_pg.identify_row(event.y)
-        if not item_id: return
-        try:
-            idx = int(item_id)
-        except Exception:
-            return
-        item = contas_a_pagar[idx]
-        models.set_paid(item["id"], not bool(item.get("pago")))
-        _refresh_all(tv_pg, tv_rc, tv_cat, tv_cf, cb_pg_conta, cb_rc_conta,
-                     cb_import_conta, cb_pg_cat, cb_rc_cat, pg_total_var, rc_total_var)
-        try:
-            tv_pg.selection_set(item_id); tv_pg.focus(item_id); fill_pg_fields(idx)
-        except Exception:
-            pass
-        return "break"
-
-    def on_click_rc(event):
-        region = tv_rc.identify("region", event.x, event.y)
-        if region != "cell": return
-        if tv_rc.identify_column(event.x) != '#6': return
-        item_id = tv_rc.identify_row(event.y)
-        if not item_id: return
-        try:
-            idx = int(item_id)
-        except Exception:
-            return
-        item = contas_a_receber[idx]
-        models.set_received(item["id"], not bool(item.get("recebido")))
-        _refresh_all(tv_pg, tv_rc, tv_cat, tv_cf, cb_pg_conta, cb_rc_conta,
-                     cb_import_conta, cb_pg_cat, cb_rc_cat, pg_total_var, rc_total_var)
-        try:
-            tv_rc.selection_set(item_id); tv_rc.focus(item_id); fill_rc_fields(idx)
-        except Exception:
-            pass
-        return "break"
-
-    tv_pg.bind("<Button-1>", on_click_pg)
-    tv_rc.bind("<Button-1>", on_click_rc)
-
-    # ------- Limpar campos ------- #
-    def limpar_pg():
-        global conta_pagar_idx
-        e_pg_desc.delete(0, tk.END); e_pg_valor.delete(0, tk.END); e_pg_data.delete(0, tk.END)
-        e_pg_busca.delete(0, tk.END)
-        cb_pg_conta.set(""); cb_pg_cat.set(""); pago_var.set(False); conta_pagar_idx = None
-        _refresh_all(tv_pg, tv_rc, tv_cat, tv_cf, cb_pg_conta, cb_rc_conta,
-                     cb_import_conta, cb_pg_cat, cb_rc_cat, pg_total_var, rc_total_var)
-
-    def limpar_rc():
-        global conta_receber_idx
-        e_rc_desc.delete(0, tk.END); e_rc_valor.delete(0, tk.END); e_rc_data.delete(0, tk.END)
-        cb_rc_conta.set(""); cb_rc_cat.set(""); recebido_var.set(False); conta_receber_idx = None
-
-    def limpar_cat():
-        global categoria_idx
-        e_cat_nome.delete(0, tk.END); categoria_idx = None
-
-    def limpar_cf():
-        global conta_financeira_idx
-        e_cf_nome.delete(0, tk.END); conta_financeira_idx = None
-
-    btn_limpar_filtros.configure(command=limpar_pg)
-
-    # ------- CRUD Contas Financeiras ------- #
-    def add_cf():
-        nome = e_cf_nome.get().strip()
-        res = models.add_financial_account(nome)
-        if res is True:
-            limpar_cf()
-            _refresh_all(tv_pg, tv_rc, tv_cat, tv_cf, cb_pg_conta, cb_rc_conta,
-                         cb_import_conta, cb_pg_cat, cb_rc_cat, pg_total_var, rc_total_var)
-            messagebox.showinfo("Sucesso", "Conta financeira adicionada.")
-        else:
-            messagebox.showwarning("Erro", res)
-
-    def edit_cf():
-        if conta_financeira_idx is None:
-            messagebox.showwarning("Atenção", "Selecione uma conta."); return
-        acc = contas_financeiras[conta_financeira_idx]
-        novo = e_cf_nome.get().strip()
-        res = models.edit_financial_account(acc["id"], novo)
-        if res is True:
-            limpar_cf()
-            _refresh_all(tv_pg, tv_rc, tv_cat, tv_cf, cb_pg_conta, cb_rc_conta,
-                         cb_import_conta, cb_pg_cat, cb_rc_cat, pg_total_var, rc_total_var)
-            messagebox.showinfo("Sucesso", "Conta editada.")
-        else:
-            messagebox.showwarning("Erro", res)
-
-    def del_cf():
-        if conta_financeira_idx is None:
-            messagebox.showwarning("Atenção", "Selecione uma conta."); return
-        acc = contas_financeiras[conta_financeira_idx]
-        if models.account_has_entries(acc["id"]):
-            messagebox.showwarning("Atenção", "Não é possível excluir: há lançamentos associados."); return
-        if not messagebox.askyesno("Confirmar", f"Excluir conta '{acc['nome']}'?"): return
-        models.delete_financial_account_by_id(acc["id"])
-        limpar_cf()
-        _refresh_all(tv_pg, tv_rc, tv_cat, tv_cf, cb_pg_conta, cb_rc_conta,
-                     cb_import_conta, cb_pg_cat, cb_rc_cat, pg_total_var, rc_total_var)
-        messagebox.showinfo("Sucesso", "Conta excluída.")
-
-    # ------- CRUD Categorias ------- #
-    def add_cat():
-        nome = e_cat_nome.get().strip()
-        if not nome:
-            messagebox.showwarning("Atenção", "Nome da categoria vazio."); return
-        try:
-            models.add_category(nome)
-            limpar_cat()
-            _refresh_all(tv_pg, tv_rc, tv_cat, tv_cf, cb_pg_conta, cb_rc_conta,
-                         cb_import_conta, cb_pg_cat, cb_rc_cat, pg_total_var, rc_total_var)
-            messagebox.showinfo("Sucesso", "Categoria adicionada.")
-        except Exception as e:
-            messagebox.showerror("Erro", f"Falha ao adicionar: {e}")
-
-    def edit_cat():
-        if categoria_idx is None:
-            messagebox.showwarning("Atenção", "Selecione uma categoria."); return
-        atual = categorias[categoria_idx]
-        novo = e_cat_nome.get().strip()
-        if not novo:
-            messagebox.showwarning("Atenção", "Nome não pode ser vazio."); return
-        if novo in categorias and novo != atual:
-            messagebox.showwarning("Atenção", "Categoria já existe."); return
-        models.edit_category(atual, novo)
-        limpar_cat()
-        _refresh_all(tv_pg, tv_rc, tv_cat, tv_cf, cb_pg_conta, cb_rc_conta,
-                     cb_import_conta, cb_pg_cat, cb_rc_cat, pg_total_var, rc_total_var)
-        messagebox.showinfo("Sucesso", "Categoria editada.")
-
-    def del_cat():
-        if categoria_idx is None:
-            messagebox.showwarning("Atenção", "Selecione uma categoria."); return
-        nome = categorias[categoria_idx]
-        if not messagebox.askyesno("Confirmar", f"Excluir categoria '{nome}'?"): return
-        models.delete_category(nome)
-        limpar_cat()
-        _refresh_all(tv_pg, tv_rc, tv_cat, tv_cf, cb_pg_conta, cb_rc_conta,
-                     cb_import_conta, cb_pg_cat, cb_rc_cat, pg_total_var, rc_total_var)
-        messagebox.showinfo("Sucesso", "Categoria excluída.")
-
-    # ------- CRUD Pagar ------- #
-    def add_pg():
-        desc = e_pg_desc.get().strip(); val = e_pg_valor.get().strip()
-        data = e_pg_data.get().strip(); conta_nome = cb_pg_conta.get().strip(); cat = cb_pg_cat.get().strip()
-        res = models.add_entry("pagar", desc, val, data, None, conta_nome, cat)
-        if res is True:
-            limpar_pg()
-            messagebox.showinfo("Sucesso", "Conta a pagar adicionada.")
-        else:
-            messagebox.showwarning("Erro", res)
-
-    def edit_pg():
-        if conta_pagar_idx is None:
-            messagebox.showwarning("Atenção", "Selecione um item."); return
-        item = contas_a_pagar[conta_pagar_idx]
-        desc = e_pg_desc.get().strip(); val = e_pg_valor.get().strip()
-        data = e_pg_data.get().strip(); conta_nome = cb_pg_conta.get().strip(); cat = cb_pg_cat.get().strip()
-        res = models.edit_entry("pagar", item["id"], desc, val, data, item.get("conta_id"), conta_nome, cat)
-        if res is True:
-            limpar_pg()
-            messagebox.showinfo("Sucesso", "Conta a pagar editada.")
-        else:
-            messagebox.showwarning("Erro", res)
-
-    def del_pg():
-        # multiseleção
-        sel = tv_pg.selection()
-        if not sel:
-            messagebox.showwarning("Atenção", "Selecione uma ou mais contas a pagar.")
-            return
-        if not messagebox.askyesno("Confirmar", f"Excluir {len(sel)} conta(s) a pagar selecionada(s)?"):
-            return
-
-        ok = 0
-        falhas = []
-        for iid in sel:
-            try:
-                idx = int(iid)
-                it = contas_a_pagar[idx]
-            except Exception:
-                continue
-
-            res = models.delete_entry(
-                "pagar",
-                item_id=it.get("id"),
-                descricao=it.get("descricao"),
-                valor=float(it.get("valor", 0.0)),
-                data_str=it.get("vencimento"),
-                conta_id=it.get("conta_id"),
-                conta_nome=it.get("conta_nome"),
-            )
-            if res is True:
-                ok += 1
-            else:
-                falhas.append(it.get("descricao","(sem descrição)"))
-
-        _refresh_all(
-            tv_pg, tv_rc, tv_cat, tv_cf,
-            cb_pg_conta, cb_rc_conta, cb_import_conta,
-            cb_pg_cat, cb_rc_cat,
-            pg_total_var, rc_total_var
-        )
-
-        if ok and not falhas:
-            messagebox.showinfo("Sucesso", f"{ok} conta(s) a pagar excluída(s).")
-        elif ok and falhas:
-            messagebox.showwarning("Parcial",
-                f"{ok} excluída(s), {len(falhas)} falhou(aram):\n- " + "\n- ".join(falhas))
-        else:
-            messagebox.showerror("Erro", "Não foi possível excluir os itens selecionados.")
-
-    # ------- CRUD Receber ------- #
-    def add_rc():
-        desc = e_rc_desc.get().strip(); val = e_rc_valor.get().strip()
-        data = e_rc_data.get().strip(); conta_nome = cb_rc_conta.get().strip(); cat = cb_rc_cat.get().strip()
-        res = models.add_entry("receber", desc, val, data, None, conta_nome, cat)
-        if res is True:
-            limpar_rc()
-            _refresh_all(tv_pg, tv_rc, tv_cat, tv_cf, cb_pg_conta, cb_rc_conta,
-                         cb_import_conta, cb_pg_cat, cb_rc_cat, pg_total_var, rc_total_var)
-            messagebox.showinfo("Sucesso", "Conta a receber adicionada.")
-        else:
-            messagebox.showwarning("Erro", res)
-
-    def edit_rc():
-        if conta_receber_idx is None:
-            messagebox.showwarning("Atenção", "Selecione um item."); return
-        item = contas_a_receber[conta_receber_idx]
-        desc = e_rc_desc.get().strip(); val = e_rc_valor.get().strip()
-        data = e_rc_data.get().strip(); conta_nome = cb_rc_conta.get().strip(); cat = cb_rc_cat.get().strip()
-        res = models.edit_entry("receber", item["id"], desc, val, data, item.get("conta_id"), conta_nome, cat)
-        if res is True:
-            limpar_rc()
-            _refresh_all(tv_pg, tv_rc, tv_cat, tv_cf, cb_pg_conta, cb_rc_conta,
-                         cb_import_conta, cb_pg_cat, cb_rc_cat, pg_total_var, rc_total_var)
-            messagebox.showinfo("Sucesso", "Conta a receber editada.")
-        else:
-            messagebox.showwarning("Erro", res)
-
-    def del_rc():
-        # multiseleção
-        sel = tv_rc.selection()
-        if not sel:
-            messagebox.showwarning("Atenção", "Selecione uma ou mais contas a receber.")
-            return
-        if not messagebox.askyesno("Confirmar", f"Excluir {len(sel)} conta(s) a receber selecionada(s)?"):
-            return
-
-        ok = 0
-        falhas = []
-        for iid in sel:
-            try:
-                idx = int(iid)
-                it = contas_a_receber[idx]
-            except Exception:
-                continue
-
-            res = models.delete_entry(
-                "receber",
-                item_id=it.get("id"),
-                descricao=it.get("descricao"),
-                valor=float(it.get("valor", 0.0)),
-                data_str=it.get("vencimento"),
-                conta_id=it.get("conta_id"),
-                conta_nome=it.get("conta_nome"),
-            )
-            if res is True:
-                ok += 1
-            else:
-                falhas.append(it.get("descricao","(sem descrição)"))
-
-        _refresh_all(
-            tv_pg, tv_rc, tv_cat, tv_cf,
-            cb_pg_conta, cb_rc_conta, cb_import_conta,
-            cb_pg_cat, cb_rc_cat,
-            pg_total_var, rc_total_var
-        )
-
-        if ok and not falhas:
-            messagebox.showinfo("Sucesso", f"{ok} conta(s) a receber excluída(s).")
-        elif ok and falhas:
-            messagebox.showwarning("Parcial",
-                f"{ok} excluída(s), {len(falhas)} falhou(aram):\n- " + "\n- ".join(falhas))
-        else:
-            messagebox.showerror("Erro", "Não foi possível excluir os itens selecionados.")
-
-    # ------- Importar OFX / Exportar / Relatório Mensal ------- #
-    def importar_ofx():
-        path = filedialog.askopenfilename(defaultextension=".ofx",
-                                          filetypes=[("OFX","*.ofx"),("Todos","*.*")])
-        if not path: return
-        conta_nome = cb_import_conta.get().strip()
-        if not conta_nome:
-            messagebox.showwarning("Atenção", "Selecione uma conta para importar."); return
-        conta = next((c for c in contas_financeiras if c["nome"] == conta_nome), None)
-        if not conta:
-            messagebox.showerror("Erro", "Conta selecionada não encontrada."); return
-        trans, err = ofx_importer.process_ofx(path, conta["id"], conta["nome"])
-        if err:
-            messagebox.showerror("Erro", err); return
-        qtd = ofx_importer.add_imported_transactions(trans)
-        _refresh_all(tv_pg, tv_rc, tv_cat, tv_cf, cb_pg_conta, cb_rc_conta,
-                     cb_import_conta, cb_pg_cat, cb_rc_cat, pg_total_var, rc_total_var)
-        if qtd: messagebox.showinfo("Sucesso", f"{qtd} transações importadas.")
-        else:   messagebox.showinfo("Informação", "Nenhuma nova transação encontrada.")
-
-    def exportar():
-        ok, msg = export_excel.export_to_excel(contas_a_pagar, contas_a_receber)
-        (messagebox.showinfo if ok else messagebox.showerror)("Exportar", msg)
-
-    def abrir_relatorio_mensal():
-        # popup para escolher mês/ano/categoria
-        win = tk.Toplevel(root)
-        win.title("Relatório Mensal")
-
-        ttk.Label(win, text="Mês (1-12):").grid(row=0, column=0, padx=5, pady=5, sticky=tk.W)
-        cb_mes = ttk.Combobox(win, state="readonly", values=[str(i) for i in range(1,13)], width=10)
-        cb_mes.grid(row=0, column=1, padx=5, pady=5, sticky=tk.EW)
-
-        ttk.Label(win, text="Ano (YYYY):").grid(row=1, column=0, padx=5, pady=5, sticky=tk.W)
-        e_ano = ttk.Entry(win, width=12)
-        e_ano.insert(0, str(datetime.now().year))
-        e_ano.grid(row=1, column=1, padx=5, pady=5, sticky=tk.EW)
-
-        ttk.Label(win, text="Categoria:").grid(row=2, column=0, padx=5, pady=5, sticky=tk.W)
-        cb_cat = ttk.Combobox(win, state="readonly", values=["Todas"] + categorias)
-        cb_cat.set("Todas")
-        cb_cat.grid(row=2, column=1, padx=5, pady=5, sticky=tk.EW)
-
-        def _gerar():
-            m = cb_mes.get().strip()
-            a = e_ano.get().strip()
-            if not m or not a:
-                messagebox.showwarning("Atenção", "Informe mês e ano.")
-                return
-            try:
-                mes = int(m); ano = int(a)
-                if mes < 1 or mes > 12 or ano < 1900:
-                    raise ValueError()
-            except Exception:
-                messagebox.showwarning("Atenção", "Mês/Ano inválidos.")
-                return
-
-            cat = cb_cat.get().strip()
-            cat = None if (not cat or cat.lower()=="todas") else cat
-
-            ok, msg = export_excel.export_monthly_report(mes, ano, cat)
-            (messagebox.showinfo if ok else messagebox.showerror)("Relatório Mensal", msg)
-            if ok:
-                try: win.destroy()
-                except: pass
-
-        ttk.Button(win, text="Gerar", command=_gerar).grid(row=3, column=0, columnspan=2, padx=5, pady=10)
-        win.columnconfigure(1, weight=1)
-
-    btn_import_ofx.configure(command=importar_ofx)
-    btn_export.configure(command=exportar)
-    btn_relatorio.configure(command=abrir_relatorio_mensal)
-
-    # ------- FILTROS ao digitar (Pagar) ------- #
-    def _rebuild_tv_pagar_from_indices(indices):
-        for r in tv_pg.get_children():
-            tv_pg.delete(r)
-        for i in indices:
-            c = contas_a_pagar[i]
-            status = "☑ Pago" if c.get("pago") else "☐ Pendente"
-            tv_pg.insert("", "end", iid=str(i),
-                values=(c.get("descricao",""),
-                        f"R$ {float(c.get('valor',0)):.2f}",
-                        formatar_data_br(c.get("vencimento","")),
-                        c.get("conta_nome",""),
-                        c.get("categoria",""),
-                        status))
-        _set_pg_total_by_indices(indices, pg_total_var)
-
-    def _apply_filters_pagar():
-        """
-        Filtros na aba Pagar:
-        - Valor: exato (numérico) OU substring do valor mostrado "R$ X,XX"
-        - Descrição: substring case-insensitive
-        - Data (campo): substring do ISO (AAAA-MM-DD) — a grid exibe BR
-        - Busca geral: em descrição, data BR e valor mostrado
-        """
-        texto_valor = e_pg_valor.get().strip()
-        texto_desc  = e_pg_desc.get().strip().lower()
-        texto_data  = e_pg_data.get().strip().lower()
-        texto_busca = e_pg_busca.get().strip().lower()
-
-        if not (texto_valor or texto_desc or texto_data or texto_busca):
-            _refresh_all(tv_pg, tv_rc, tv_cat, tv_cf, cb_pg_conta, cb_rc_conta,
-                         cb_import_conta, cb_pg_cat, cb_rc_cat, pg_total_var, rc_total_var)
-            return
-
-        indices = []
-        valor_num = None
-        valor_is_number = False
-        if texto_valor:
-            try:
-                valor_num = _parse_valor_local(texto_valor)
-                valor_is_number = True
-            except Exception:
-                valor_is_number = False
-
-        for i, c in enumerate(contas_a_pagar):
-            desc = (c.get("descricao","") or "").lower()
-            data_iso = (c.get("vencimento","") or "").lower()
-            data_br = formatar_data_br(c.get("vencimento","")).lower()
-            shown_val = f"R$ {float(c.get('valor',0)):.2f}".replace(".", ",").replace(" ", "").lower()
-
-            ok = True
-            if texto_valor:
-                if valor_is_number:
-                    if abs(float(c.get("valor",0.0)) - valor_num) >= 0.01:
-                        ok = False
-                else:
-                    if texto_valor.replace(".", ",").replace(" ", "").lower() not in shown_val:
-                        ok = False
-            if ok and texto_desc and (texto_desc not in desc):
-                ok = False
-            if ok and texto_data and (texto_data not in data_iso):
-                ok = False
-            if ok and texto_busca:
-                if (texto_busca not in desc) and (texto_busca not in data_br) and (texto_busca not in shown_val):
-                    ok = False
-            if ok:
-                indices.append(i)
-
-        _rebuild_tv_pagar_from_indices(indices)
-
-    def on_valor_key(event=None): _apply_filters_pagar()
-    def on_desc_key(event=None):  _apply_filters_pagar()
-    def on_data_key(event=None):  _apply_filters_pagar()
-    def on_busca_key(event=None): _apply_filters_pagar()
-
-    e_pg_valor.bind("<KeyRelease>", on_valor_key)
-    e_pg_desc.bind("<KeyRelease>", on_desc_key)
-    e_pg_data.bind("<KeyRelease>", on_data_key)
-    e_pg_busca.bind("<KeyRelease>", on_busca_key)
-
-    # ------- Botões ------- #
-    fb_pg = ttk.Frame(aba_pagar); fb_pg.pack(fill="x", padx=10, pady=5)
-    ttk.Button(fb_pg, text="Adicionar", command=add_pg).pack(side=tk.LEFT, padx=5)
-    ttk.Button(fb_pg, text="Editar",   command=edit_pg).pack(side=tk.LEFT, padx=5)
-    ttk.Button(fb_pg, text="Excluir selecionadas",  command=del_pg).pack(side=tk.LEFT, padx=5)
-    ttk.Button(fb_pg, text="Limpar",   command=limpar_pg).pack(side=tk.LEFT, padx=5)
-    # Dica: para marcar como Pago/Não pago, clique na coluna "Status" da tabela.
-
-    fb_rc = ttk.Frame(aba_receber); fb_rc.pack(fill="x", padx=10, pady=5)
-    ttk.Button(fb_rc, text="Adicionar", command=add_rc).pack(side=tk.LEFT, padx=5)
-    ttk.Button(fb_rc, text="Editar",    command=edit_rc).pack(side=tk.LEFT, padx=5)
-    ttk.Button(fb_rc, text="Excluir selecionadas",   command=del_rc).pack(side=tk.LEFT, padx=5)
-    ttk.Button(fb_rc, text="Limpar",    command=limpar_rc).pack(side=tk.LEFT, padx=5)
-
-    fb_cat = ttk.Frame(aba_cats); fb_cat.pack(fill="x", padx=10, pady=5)
-    ttk.Button(fb_cat, text="Adicionar", command=add_cat).pack(side=tk.LEFT, padx=5)
-    ttk.Button(fb_cat, text="Editar",    command=edit_cat).pack(side=tk.LEFT, padx=5)
-    ttk.Button(fb_cat, text="Excluir",   command=del_cat).pack(side=tk.LEFT, padx=5)
-    ttk.Button(fb_cat, text="Limpar",    command=limpar_cat).pack(side=tk.LEFT, padx=5)
-
-    fb_cf = ttk.Frame(aba_contas); fb_cf.pack(fill="x", padx=10, pady=5)
-    ttk.Button(fb_cf, text="Adicionar", command=add_cf).pack(side=tk.LEFT, padx=5)
-    ttk.Button(fb_cf, text="Editar",    command=edit_cf).pack(side=tk.LEFT, padx=5)
-    ttk.Button(fb_cf, text="Excluir",   command=del_cf).pack(side=tk.LEFT, padx=5)
-    btn_import_ofx.configure(command=importar_ofx)
-
-    # ------- Atalhos de teclado ------- #
-    def _is_pagar_active():
-        return nb.select() == aba_pagar._w
-    def _is_receber_active():
-        return nb.select() == aba_receber._w
-
-    def _enter_add(event=None):
-        if _is_pagar_active(): add_pg()
-        elif _is_receber_active(): add_rc()
-
-    def _ctrl_e_edit(event=None):
-        if _is_pagar_active(): edit_pg()
-        elif _is_receber_active(): edit_rc()
-
-    def _del_delete(event=None):
-        if _is_pagar_active(): del_pg()
-        elif _is_receber_active(): del_rc()
-
-    root.bind("<Return>", _enter_add)
-    root.bind("<Control-e>", _ctrl_e_edit)
-    root.bind("<Delete>", _del_delete)
-
-    # Liga botões principais
-    btn_export.configure(command=exportar)
-    btn_relatorio.configure(command=abrir_relatorio_mensal)
-
-    # ------- Inicialização ------- #
-    _refresh_all(tv_pg, tv_rc, tv_cat, tv_cf, cb_pg_conta, cb_rc_conta,
-                 cb_import_conta, cb_pg_cat, cb_rc_cat, pg_total_var, rc_total_var)
-    root.mainloop()
-
-if __name__ == "__main__":
-    main_window()
+# gui/finance_gui.py — Tkinter GUI com:
+# - datas BR (DD/MM/AAAA) na grid
+# - filtros ao digitar (Descrição, Valor, Data) + busca geral nas abas Pagar/Receber
+# - totais dinâmicos (quantidade e soma) conforme os filtros
+# - clique na coluna "Status" (toggle Pago/Recebido)
+# - importação OFX, exportação Excel
+# - relatório mensal por categoria
+# - multiseleção e exclusão em massa nas abas Pagar/Receber
+# - atualização incremental das grids após cada alteração (sem reler o banco)
+# - alterações de outras instâncias no mesmo banco aparecem sozinhas
+# - FINANCEIRO_PERFIL_GUI liga o perfil de travamentos da interface (ver perfil_gui.py)
+
+import os
+import bisect
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from datetime import datetime
+
+from core import models
+from core import database
+from core.entry_store import EntryStore
+from core.filter_engine import FilterEngine
+from gui import perfil_gui
+
+# --------------- Estado em memória (listas e índices) --------------- #
+# lançamentos em EntryStore (colunas); cadastros em listas simples
+contas_a_pagar, contas_a_receber = EntryStore("pagar"), EntryStore("receber")
+contas_financeiras, categorias = [], []
+conta_pagar_idx = None
+conta_receber_idx = None
+conta_financeira_idx = None
+categoria_idx = None
+# intervalo da sondagem de alterações feitas por outras instâncias no mesmo banco
+_INTERVALO_SONDAGEM_MS = 2000
+# filtros ao digitar: espera esse tempo sem teclas antes de filtrar
+_ESPERA_FILTRO_MS = 200
+# motor de filtro de cada lista; acompanha as mutações feitas nela
+_motores = {"pagar": FilterEngine(), "receber": FilterEngine()}
+
+# --------------- Utilidades --------------- #
+# importação OFX e exportação Excel (openpyxl) só são carregadas no primeiro
+# uso, já na thread da tarefa: não pesam na abertura da janela
+def _ofx_importer():
+    from core import ofx_importer
+    return ofx_importer
+
+def _export_excel():
+    from core import export_excel
+    return export_excel
+
+def formatar_data_br(data_str: str) -> str:
+    """Converte 'YYYY-MM-DD' -> 'DD/MM/YYYY' (se falhar, retorna original)."""
+    d = data_str or ""
+    # caminho rápido (sem strptime) para o formato gravado pelo sistema
+    if (len(d) == 10 and d[4] == "-" and d[7] == "-" and d[:4].isdigit()
+            and "01" <= d[5:7] <= "12" and "01" <= d[8:10] <= "31"):
+        return f"{d[8:10]}/{d[5:7]}/{d[0:4]}"
+    try:
+        return datetime.strptime(data_str, "%Y-%m-%d").strftime("%d/%m/%Y")
+    except Exception:
+        return data_str or ""
+
+def _format_money(v: float) -> str:
+    return f"R$ {float(v):.2f}".replace(".", ",")
+
+def _valores_pagar(c) -> tuple:
+    status = "☑ Pago" if c.get("pago") else "☐ Pendente"
+    return (c.get("descricao",""),
+            f"R$ {float(c.get('valor',0)):.2f}",
+            formatar_data_br(c.get("vencimento","")),
+            c.get("conta_nome",""),
+            c.get("categoria",""),
+            status)
+
+def _valores_receber(c) -> tuple:
+    status = "☑ Recebido" if c.get("recebido") else "☐ Pendente"
+    return (c.get("descricao",""),
+            f"R$ {float(c.get('valor',0)):.2f}",
+            formatar_data_br(c.get("vencimento","")),
+            c.get("conta_nome",""),
+            c.get("categoria",""),
+            status)
+
+# --------------- Grid virtualizada (Pagar/Receber) --------------- #
+class VirtualTree:
+    """Treeview virtualizado: o widget só contém os itens da janela visível
+    mais uma folga acima/abaixo; a barra de rolagem representa o conjunto todo.
+
+    - indices: posições (na lista de fonte()) a exibir, na ordem; iid = str(posição)
+    - a seleção é guardada aqui, então sobrevive quando o item sai da janela
+    """
+    ALTURA_LINHA_PADRAO = 20
+    ALTURA_CABECALHO = 24
+
+    def __init__(self, tree, scrollbar, fonte, formatar, folga: int = 30):
+        self.tree = tree
+        self.sb = scrollbar
+        self.fonte = fonte            # callable -> lista de dicts atual
+        self.formatar = formatar      # dict -> tupla de valores das colunas
+        self.folga = folga
+        self.indices = []
+        self.topo = 0                 # primeira linha visível (posição em self.indices)
+        self._ini = self._fim = 0     # faixa de self.indices que existe no widget
+        self._selecionados = set()    # iids selecionados (inclusive fora da janela)
+        self._renderizando = False
+
+        scrollbar.configure(command=self._on_scrollbar)
+        tree.bind("<Configure>", lambda e: self._mostrar(self.topo, forcar=True), add="+")
+        tree.bind("<MouseWheel>", self._on_wheel, add="+")
+        tree.bind("<Button-4>", lambda e: self._rolar(-3), add="+")
+        tree.bind("<Button-5>", lambda e: self._rolar(3), add="+")
+        tree.bind("<ButtonPress-1>", self._on_nova_selecao, add="+")
+        tree.bind("<<TreeviewSelect>>", self._on_select, add="+")
+        for tecla in ("Up", "Down", "Prior", "Next", "Home", "End"):
+            tree.bind(f"<KeyPress-{tecla}>", self._on_nova_selecao, add="+")
+            tree.bind(f"<KeyRelease-{tecla}>", self._on_tecla, add="+")
+
+    # ---- dados ----
+    def set_indices(self, indices, manter_posicao: bool = True):
+        """Troca o conjunto exibido. Só a janela visível é (re)criada no widget."""
+        # range é mantido como está: exibir "tudo" não cria uma lista de n posições
+        self.indices = indices if isinstance(indices, range) else list(indices)
+        if self._selecionados:
+            validos = self.indices if isinstance(self.indices, range) else set(self.indices)
+            self._selecionados = {iid for iid in self._selecionados if int(iid) in validos}
+        self._mostrar(self.topo if manter_posicao else 0, forcar=True)
+
+    def atualizar_linha(self, idx: int):
+        """Redesenha um item, se ele estiver materializado na janela."""
+        iid = str(idx)
+        if self.tree.exists(iid):
+            self.tree.item(iid, values=self.formatar(self.fonte()[idx]))
+
+    def limpar_selecao(self):
+        """Descarta a seleção (as posições mudaram: inserção/exclusão na fonte)."""
+        self._selecionados.clear()
+        self.tree.selection_set(())
+
+    def selection(self) -> tuple:
+        """iids selecionados, na ordem de exibição (inclui os fora da janela)."""
+        return tuple(str(i) for i in self.indices if str(i) in self._selecionados)
+
+    def selecionar(self, idx: int):
+        """Seleciona, foca e traz para a tela a linha da posição idx."""
+        iid = str(idx)
+        self._selecionados = {iid}
+        try:
+            pos = self.indices.index(idx)
+        except ValueError:
+            return
+        if not (self.topo <= pos < self.topo + self._visiveis()):
+            self._mostrar(max(0, pos - self._visiveis() // 2))
+        if self.tree.exists(iid):
+            self.tree.selection_set(iid); self.tree.focus(iid)
+
+    # ---- janela ----
+    def _visiveis(self) -> int:
+        altura_linha = self.ALTURA_LINHA_PADRAO
+        try:
+            altura_linha = int(ttk.Style().lookup("Treeview", "rowheight") or altura_linha)
+        except Exception:
+            pass
+        altura = self.tree.winfo_height()
+        if altura <= 1:                               # ainda não desenhado
+            altura = int(self.tree.cget("height")) * altura_linha + self.ALTURA_CABECALHO
+        return max(1, (altura - self.ALTURA_CABECALHO) // altura_linha)
+
+    def _mostrar(self, topo: int, forcar: bool = False):
+        n = len(self.indices)
+        vis = self._visiveis()
+        topo = max(0, min(topo, max(0, n - vis)))
+        self.topo = topo
+        if forcar or topo < self._ini or topo + vis > self._fim:
+            self._renderizar(max(0, topo - self.folga), min(n, topo + vis + self.folga))
+        janela = self._fim - self._ini
+        if janela:
+            self.tree.yview_moveto((topo - self._ini) / janela)
+        if n:
+            self.sb.set(topo / n, min(1.0, (topo + vis) / n))
+        else:
+            self.sb.set(0.0, 1.0)
+
+    def _renderizar(self, ini: int, fim: int):
+        self._renderizando = True
+        try:
+            tree = self.tree
+            foco = tree.focus()
+            tree.delete(*tree.get_children())
+            dados = self.fonte()
+            for i in self.indices[ini:fim]:
+                tree.insert("", "end", iid=str(i), values=self.formatar(dados[i]))
+            visiveis = [iid for iid in map(str, self.indices[ini:fim]) if iid in self._selecionados]
+            tree.selection_set(visiveis)
+            if foco and tree.exists(foco):
+                tree.focus(foco)
+            self._ini, self._fim = ini, fim
+        finally:
+            # <<TreeviewSelect>> do selection_set acima chega depois; ignora-o
+            self.tree.after_idle(self._fim_render)
+
+    def _fim_render(self):
+        self._renderizando = False
+
+    # ---- eventos ----
+    def _on_scrollbar(self, *args):
+        n = len(self.indices)
+        if not n:
+            return
+        if args[0] == "moveto":
+            self._mostrar(int(float(args[1]) * n))
+        elif args[0] == "scroll":
+            passo = int(args[1])
+            if args[2] == "pages":
+                passo *= self._visiveis()
+            self._rolar(passo)
+
+    def _rolar(self, linhas: int):
+        self._mostrar(self.topo + linhas)
+        return "break"
+
+    def _on_wheel(self, event):
+        return self._rolar(-3 if event.delta > 0 else 3)
+
+    def _on_nova_selecao(self, event):
+        # clique/seta sem Ctrl/Shift recomeça a seleção
+        if not (event.state & 0x0005):
+            self._selecionados.clear()
+
+    def _on_select(self, event=None):
+        if self._renderizando:
+            return
+        materializados = set(map(str, self.indices[self._ini:self._fim]))
+        self._selecionados = (self._selecionados - materializados) | set(self.tree.selection())
+
+    def _on_tecla(self, event=None):
+        # o Treeview rola sozinho ao navegar pelo teclado; acompanha a posição
+        frac = self.tree.yview()[0]
+        self._mostrar(self._ini + round(frac * (self._fim - self._ini)))
+
+# --------------- Filtro ao digitar, fora da thread do Tk --------------- #
+class FiltroAssincrono:
+    """Debounce + execução em thread de trabalho para filtros ao digitar.
+
+    - agendar(): ligado às teclas; só dispara após `espera_ms` sem digitação;
+    - disparar(): chama preparar() na thread do Tk (lê os campos); ele devolve
+      uma função fn(cancelado) -> resultado, ou None se não há o que filtrar;
+    - cada disparo invalida o anterior: a busca antiga para no próximo
+      cancelado() e o resultado dela é descartado;
+    - o resultado volta por uma fila lida com after() e vai para aplicar();
+      se a busca lançar exceção, o erro volta pela mesma fila e é mostrado.
+    """
+    INTERVALO_FILA_MS = 20
+
+    def __init__(self, widget, preparar, aplicar, espera_ms: int = _ESPERA_FILTRO_MS):
+        self.widget = widget
+        self.preparar = preparar
+        self.aplicar = aplicar
+        self.espera_ms = espera_ms
+        self._geracao = 0
+        self._aguardando = None       # geração cujo resultado ainda não chegou
+        self._agendado = None         # id do after() do debounce
+        self._fila = queue.Queue()
+        self._lendo_fila = False
+
+    def agendar(self, event=None):
+        if self._agendado is not None:
+            self.widget.after_cancel(self._agendado)
+        self._agendado = self.widget.after(self.espera_ms, self.disparar)
+
+    def cancelar(self):
+        """Descarta o disparo pendente e o resultado de buscas em andamento."""
+        if self._agendado is not None:
+            self.widget.after_cancel(self._agendado)
+            self._agendado = None
+        self._geracao += 1
+        self._aguardando = None
+
+    def disparar(self):
+        self._agendado = None
+        self._geracao += 1
+        ger = self._geracao
+        trabalho = self.preparar()
+        if trabalho is None or ger != self._geracao:
+            return
+        self._aguardando = ger
+
+        def _rodar():
+            try:
+                self._fila.put((ger, "fim", trabalho(lambda: ger != self._geracao)))
+            except Exception as e:
+                self._fila.put((ger, "erro", e))
+
+        threading.Thread(target=_rodar, daemon=True).start()
+        if not self._lendo_fila:
+            self._lendo_fila = True
+            self.widget.after(self.INTERVALO_FILA_MS, self._ler_fila)
+
+    def _ler_fila(self):
+        while True:
+            try:
+                ger, tipo, dado = self._fila.get_nowait()
+            except queue.Empty:
+                break
+            if ger == self._aguardando == self._geracao:
+                self._aguardando = None
+                if tipo == "erro":
+                    messagebox.showerror("Filtro", f"Falha inesperada no filtro: {dado}")
+                elif dado is not None:
+                    self.aplicar(dado)
+        if self._aguardando is None:
+            self._lendo_fila = False
+        else:
+            self.widget.after(self.INTERVALO_FILA_MS, self._ler_fila)
+
+# --------------- Tarefas longas (importação, exportação, relatório) --------------- #
+class TarefaEmSegundoPlano:
+    """Roda um trabalho demorado numa thread de trabalho, com janela de progresso.
+
+    - trabalho(progresso, cancelado) roda fora da thread do Tk; chama
+      progresso(feito, total, texto) quando quiser (total=None: barra indeterminada)
+      e para quando cancelado() devolver True;
+    - os avisos voltam por uma fila lida com after() e atualizam a janela;
+    - "Cancelar" (ou fechar a janela) só liga o cancelado(): quem decide onde
+      parar e o que desfazer é o trabalho;
+    - ao terminar, na thread do Tk: ao_terminar() (sempre) e depois
+      concluir(resultado, cancelada); se o trabalho lançar exceção, mostra o
+      erro no lugar de concluir().
+    """
+    INTERVALO_FILA_MS = 50
+
+    def __init__(self, master, titulo, trabalho, concluir, ao_terminar=None):
+        self.master = master
+        self.titulo = titulo
+        self.trabalho = trabalho
+        self.concluir = concluir
+        self.ao_terminar = ao_terminar
+        self._fila = queue.Queue()
+        self._cancelar = threading.Event()
+
+    def iniciar(self):
+        win = self._janela = tk.Toplevel(self.master)
+        win.title(self.titulo)
+        win.transient(self.master)
+        win.resizable(False, False)
+        win.protocol("WM_DELETE_WINDOW", self.cancelar)
+        self._texto = tk.StringVar(win, value="Iniciando...")
+        ttk.Label(win, textvariable=self._texto, width=45).pack(padx=10, pady=(10, 4))
+        self._barra = ttk.Progressbar(win, length=320, mode="indeterminate")
+        self._barra.pack(padx=10, pady=4)
+        self._btn = ttk.Button(win, text="Cancelar", command=self.cancelar)
+        self._btn.pack(pady=(4, 10))
+        self._barra.start(15)
+        threading.Thread(target=self._rodar, daemon=True).start()
+        win.after(self.INTERVALO_FILA_MS, self._ler_fila)
+
+    def cancelar(self):
+        if not self._cancelar.is_set():
+            self._cancelar.set()
+            self._texto.set("Cancelando...")
+            self._btn.state(["disabled"])
+
+    def _progresso(self, feito, total, texto):
+        self._fila.put(("progresso", (feito, total, texto)))
+
+    def _rodar(self):
+        try:
+            res = self.trabalho(self._progresso, self._cancelar.is_set)
+            self._fila.put(("fim", res))
+        except Exception as e:
+            self._fila.put(("erro", e))
+        finally:
+            database.close_thread_conn()     # a thread acaba aqui; não deixa conexão no pool
+
+    def _ler_fila(self):
+        progresso = fim = None
+        while True:
+            try:
+                tipo, dado = self._fila.get_nowait()
+            except queue.Empty:
+                break
+            if tipo == "progresso":
+                progresso = dado      # só o mais recente interessa
+            else:
+                fim = (tipo, dado)
+        if progresso and not self._cancelar.is_set():
+            self._mostrar(*progresso)
+        if fim is None:
+            self._janela.after(self.INTERVALO_FILA_MS, self._ler_fila)
+            return
+        self._janela.destroy()
+        if self.ao_terminar is not None:
+            self.ao_terminar()
+        tipo, dado = fim
+        if tipo == "erro":
+            messagebox.showerror(self.titulo, f"Falha inesperada: {dado}")
+        else:
+            self.concluir(dado, self._cancelar.is_set())
+
+    def _mostrar(self, feito, total, texto):
+        if total:
+            if str(self._barra["mode"]) != "determinate":
+                self._barra.stop()
+                self._barra.configure(mode="determinate")
+            self._barra.configure(maximum=total, value=min(feito, total))
+        self._texto.set(texto)
+
+# --------------- Totais helpers (Pagar/Receber) --------------- #
+def _set_total(total_var, qtd, soma):
+    total_var.set(f"Total: {qtd} itens • {_format_money(soma)}")
+
+def _set_total_geral(tipo, total_var):
+    lista = _lista(tipo)
+    _set_total(total_var, len(lista), lista.soma())
+
+# --------------- Atualização incremental (sem reler o banco) --------------- #
+# As mutações de models devolvem a linha gravada; aqui ela é aplicada às listas
+# em memória mantendo a ordem do load_all (data, id). Quem chama só precisa
+# redesenhar o que mudou na grid.
+def _lista(tipo):
+    return contas_a_pagar if tipo == "pagar" else contas_a_receber
+
+def _chave_ordem(c):
+    return (c.get("vencimento", ""), c.get("id", 0))
+
+def _patch_inserir(tipo, novo) -> int:
+    lista = _lista(tipo)
+    pos = bisect.bisect_right(lista, _chave_ordem(novo), key=_chave_ordem)
+    _motores[tipo].inserir(pos, novo)         # insere na lista e no índice
+    return pos
+
+def _patch_substituir(tipo, idx, novo) -> int:
+    """Troca o item da posição idx; se a data mudou, ele é reposicionado."""
+    lista = _lista(tipo)
+    antigo = lista[idx]
+    if _chave_ordem(antigo) == _chave_ordem(novo):
+        _motores[tipo].substituir(idx, novo)
+        return idx
+    _motores[tipo].remover(idx)
+    pos = bisect.bisect_right(lista, _chave_ordem(novo), key=_chave_ordem)
+    _motores[tipo].inserir(pos, novo)
+    return pos
+
+def _patch_remover(tipo, posicoes):
+    for idx in sorted(posicoes, reverse=True):
+        _motores[tipo].remover(idx)
+
+def _patch_conta_renomeada(conta_id, novo_nome):
+    for lista in (contas_a_pagar, contas_a_receber):
+        lista.renomear_conta(conta_id, novo_nome)
+
+def _recarregar_lancamentos(tipo):
+    """Relê do banco só a lista de um tipo (alteração feita em outra instância)."""
+    global contas_a_pagar, contas_a_receber
+    lista = models.load_entries(tipo)
+    if tipo == "pagar":
+        contas_a_pagar = lista
+    else:
+        contas_a_receber = lista
+    _motores[tipo].carregar(lista)
+
+def _nova_posicao(lista_antiga, lista_nova, idx, chave="id"):
+    """Posição em lista_nova do item que estava em lista_antiga[idx] (ou None)."""
+    if idx is None or idx >= len(lista_antiga):
+        return None
+    alvo = lista_antiga[idx] if chave is None else lista_antiga[idx][chave]
+    if chave == "id" and isinstance(lista_nova, EntryStore):
+        try:
+            return lista_nova.ids.index(alvo)   # procura na coluna, em C
+        except ValueError:
+            return None
+    for i, it in enumerate(lista_nova):
+        if (it if chave is None else it[chave]) == alvo:
+            return i
+    return None
+
+def _cadastros_desatualizados(entrada) -> bool:
+    """add/edit_entry podem criar categoria ou conta novas no banco."""
+    cat = entrada.get("categoria")
+    if cat and cat not in categorias:
+        return True
+    return not any(cf["id"] == entrada.get("conta_id") for cf in contas_financeiras)
+
+# --------------- Recarregar tela --------------- #
+def _refresh_all(grid_pagar, grid_receber, tree_cats, tree_contas,
+                 combo_conta_pagar, combo_conta_receber, combo_import,
+                 combo_cat_pagar, combo_cat_receber,
+                 pg_total_var, rc_total_var):
+    """Recarrega dados do banco e repovoa grids/combos/totais.
+    grid_pagar/grid_receber são VirtualTree: só a janela visível é criada.
+    A lista relida vem reordenada: as posições antigas não valem mais, então
+    a seleção das grids é descartada e o item em edição é reposicionado pelo id."""
+    global contas_a_pagar, contas_a_receber, contas_financeiras, categorias
+    global conta_pagar_idx, conta_receber_idx
+    antes_pagar, antes_receber = contas_a_pagar, contas_a_receber
+    contas_a_pagar, contas_a_receber, contas_financeiras, categorias = models.load_all()
+    _motores["pagar"].carregar(contas_a_pagar)
+    _motores["receber"].carregar(contas_a_receber)
+    conta_pagar_idx = _nova_posicao(antes_pagar, contas_a_pagar, conta_pagar_idx)
+    conta_receber_idx = _nova_posicao(antes_receber, contas_a_receber, conta_receber_idx)
+
+    # Pagar
+    grid_pagar.limpar_selecao()
+    grid_pagar.set_indices(range(len(contas_a_pagar)))
+    _set_total_geral("pagar", pg_total_var)
+
+    # Receber
+    grid_receber.limpar_selecao()
+    grid_receber.set_indices(range(len(contas_a_receber)))
+    _set_total_geral("receber", rc_total_var)
+
+    _preencher_cadastros(tree_cats, tree_contas, combo_conta_pagar, combo_conta_receber,
+                         combo_import, combo_cat_pagar, combo_cat_receber)
+
+def _refresh_cadastros(tree_cats, tree_contas,
+                       combo_conta_pagar, combo_conta_receber, combo_import,
+                       combo_cat_pagar, combo_cat_receber):
+    """Relê só categorias e contas financeiras (os lançamentos ficam como estão)."""
+    global contas_financeiras, categorias
+    contas_financeiras = models.list_financial_accounts()
+    categorias = models.list_categories()
+    _preencher_cadastros(tree_cats, tree_contas, combo_conta_pagar, combo_conta_receber,
+                         combo_import, combo_cat_pagar, combo_cat_receber)
+
+def _preencher_cadastros(tree_cats, tree_contas,
+                         combo_conta_pagar, combo_conta_receber, combo_import,
+                         combo_cat_pagar, combo_cat_receber):
+    # Categorias
+    for r in tree_cats.get_children():
+        tree_cats.delete(r)
+    for i, nome in enumerate(categorias):
+        tree_cats.insert("", "end", iid=str(i), values=(nome,))
+
+    # Contas financeiras
+    for r in tree_contas.get_children():
+        tree_contas.delete(r)
+    for i, cf in enumerate(contas_financeiras):
+        tree_contas.insert("", "end", iid=str(i), values=(cf["nome"],))
+
+    # Combos
+    nomes_contas = [c["nome"] for c in contas_financeiras]
+    combo_conta_pagar["values"] = nomes_contas
+    combo_conta_receber["values"] = nomes_contas
+    combo_import["values"] = nomes_contas
+    combo_cat_pagar["values"] = categorias
+    combo_cat_receber["values"] = categorias
+
+# --------------- Janela principal --------------- #
+def main_window():
+    global conta_pagar_idx, conta_receber_idx, conta_financeira_idx, categoria_idx
+
+    if perfil_gui.ATIVO:
+        perfil_gui.ativar()      # antes de criar widgets: mede todos os callbacks
+    root = tk.Tk()
+    root.title("Sistema de Controle Financeiro")
+
+    # Vars de totais DEVEM ser criadas após o root
+    pg_total_var = tk.StringVar(root, value="Total: 0 itens • R$ 0,00")
+    rc_total_var = tk.StringVar(root, value="Total: 0 itens • R$ 0,00")
+
+    nb = ttk.Notebook(root); nb.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+    aba_pagar = ttk.Frame(nb)
+    aba_receber = ttk.Frame(nb)
+    aba_cats = ttk.Frame(nb)
+    aba_contas = ttk.Frame(nb)
+
+    nb.add(aba_pagar, text="Contas a Pagar")
+    nb.add(aba_receber, text="Contas a Receber")
+    nb.add(aba_cats, text="Categorias")
+    nb.add(aba_contas, text="Contas Financeiras")
+
+    # -------- Contas a Pagar -------- #
+    f_pg = ttk.LabelFrame(aba_pagar, text="Detalhes da Conta a Pagar"); f_pg.pack(fill="x", padx=10, pady=5)
+    ttk.Label(f_pg, text="Descrição:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=2)
+    e_pg_desc = ttk.Entry(f_pg); e_pg_desc.grid(row=0, column=1, sticky=tk.EW, padx=5, pady=2)
+
+    ttk.Label(f_pg, text="Valor:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=2)
+    e_pg_valor = ttk.Entry(f_pg); e_pg_valor.grid(row=1, column=1, sticky=tk.EW, padx=5, pady=2)
+
+    ttk.Label(f_pg, text="Vencimento (AAAA-MM-DD):").grid(row=2, column=0, sticky=tk.W, padx=5, pady=2)
+    e_pg_data = ttk.Entry(f_pg); e_pg_data.grid(row=2, column=1, sticky=tk.EW, padx=5, pady=2)
+
+    ttk.Label(f_pg, text="Conta Financeira:").grid(row=3, column=0, sticky=tk.W, padx=5, pady=2)
+    cb_pg_conta = ttk.Combobox(f_pg, state="readonly"); cb_pg_conta.grid(row=3, column=1, sticky=tk.EW, padx=5, pady=2)
+
+    ttk.Label(f_pg, text="Categoria:").grid(row=4, column=0, sticky=tk.W, padx=5, pady=2)
+    cb_pg_cat = ttk.Combobox(f_pg, state="readonly"); cb_pg_cat.grid(row=4, column=1, sticky=tk.EW, padx=5, pady=2)
+
+    pago_var = tk.BooleanVar(root, value=False)
+    ttk.Checkbutton(f_pg, text="Pago", variable=pago_var).grid(row=5, column=1, sticky=tk.W, padx=5, pady=2)
+
+    f_pg.columnconfigure(1, weight=1)
+
+    # Barra de busca geral
+    fb_busca = ttk.Frame(aba_pagar); fb_busca.pack(fill="x", padx=10, pady=0)
+    ttk.Label(fb_busca, text="Buscar (Descrição/Valor/Data):").pack(side=tk.LEFT, padx=5)
+    e_pg_busca = ttk.Entry(fb_busca, width=40); e_pg_busca.pack(side=tk.LEFT, padx=5, fill="x", expand=True)
+    btn_limpar_filtros = ttk.Button(fb_busca, text="Limpar filtros")
+    btn_limpar_filtros.pack(side=tk.LEFT, padx=5)
+
+    f_tv_pg = ttk.Frame(aba_pagar); f_tv_pg.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+    tv_pg = ttk.Treeview(
+        f_tv_pg,
+        columns=("Descricao","Valor","Vencimento","Conta","Categoria","Status"),
+        show="headings",
+        selectmode="extended"  # multiseleção
+    )
+    for col, txt in [("Descricao","Descrição"),("Valor","Valor"),("Vencimento","Vencimento"),
+                     ("Conta","Conta"),("Categoria","Categoria"),("Status","Status")]:
+        tv_pg.heading(col, text=txt)
+    sb_pg = ttk.Scrollbar(f_tv_pg, orient=tk.VERTICAL)
+    sb_pg.pack(side=tk.RIGHT, fill=tk.Y)
+    tv_pg.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    grid_pg = VirtualTree(tv_pg, sb_pg, lambda: contas_a_pagar, _valores_pagar)
+
+    # Total Pagar (dinâmico)
+    lbl_pg_total = ttk.Label(aba_pagar, textvariable=pg_total_var, anchor="e")
+    lbl_pg_total.pack(fill="x", padx=12, pady=(0,8))
+
+    # -------- Contas a Receber -------- #
+    f_rc = ttk.LabelFrame(aba_receber, text="Detalhes da Conta a Receber"); f_rc.pack(fill="x", padx=10, pady=5)
+    ttk.Label(f_rc, text="Descrição:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=2)
+    e_rc_desc = ttk.Entry(f_rc); e_rc_desc.grid(row=0, column=1, sticky=tk.EW, padx=5, pady=2)
+
+    ttk.Label(f_rc, text="Valor:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=2)
+    e_rc_valor = ttk.Entry(f_rc); e_rc_valor.grid(row=1, column=1, sticky=tk.EW, padx=5, pady=2)
+
+    ttk.Label(f_rc, text="Vencimento (AAAA-MM-DD):").grid(row=2, column=0, sticky=tk.W, padx=5, pady=2)
+    e_rc_data = ttk.Entry(f_rc); e_rc_data.grid(row=2, column=1, sticky=tk.EW, padx=5, pady=2)
+
+    ttk.Label(f_rc, text="Conta Financeira:").grid(row=3, column=0, sticky=tk.W, padx=5, pady=2)
+    cb_rc_conta = ttk.Combobox(f_rc, state="readonly"); cb_rc_conta.grid(row=3, column=1, sticky=tk.EW, padx=5, pady=2)
+
+    ttk.Label(f_rc, text="Categoria:").grid(row=4, column=0, sticky=tk.W, padx=5, pady=2)
+    cb_rc_cat = ttk.Combobox(f_rc, state="readonly"); cb_rc_cat.grid(row=4, column=1, sticky=tk.EW, padx=5, pady=2)
+
+    recebido_var = tk.BooleanVar(root, value=False)
+    ttk.Checkbutton(f_rc, text="Recebido", variable=recebido_var).grid(row=5, column=1, sticky=tk.W, padx=5, pady=2)
+
+    f_rc.columnconfigure(1, weight=1)
+
+    # Barra de busca geral
+    fb_busca_rc = ttk.Frame(aba_receber); fb_busca_rc.pack(fill="x", padx=10, pady=0)
+    ttk.Label(fb_busca_rc, text="Buscar (Descrição/Valor/Data):").pack(side=tk.LEFT, padx=5)
+    e_rc_busca = ttk.Entry(fb_busca_rc, width=40); e_rc_busca.pack(side=tk.LEFT, padx=5, fill="x", expand=True)
+    btn_limpar_filtros_rc = ttk.Button(fb_busca_rc, text="Limpar filtros")
+    btn_limpar_filtros_rc.pack(side=tk.LEFT, padx=5)
+
+    f_tv_rc = ttk.Frame(aba_receber); f_tv_rc.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+    tv_rc = ttk.Treeview(
+        f_tv_rc,
+        columns=("Descricao","Valor","Vencimento","Conta","Categoria","Status"),
+        show="headings",
+        selectmode="extended"  # multiseleção
+    )
+    for col, txt in [("Descricao","Descrição"),("Valor","Valor"),("Vencimento","Vencimento"),
+                     ("Conta","Conta"),("Categoria","Categoria"),("Status","Status")]:
+        tv_rc.heading(col, text=txt)
+    sb_rc = ttk.Scrollbar(f_tv_rc, orient=tk.VERTICAL)
+    sb_rc.pack(side=tk.RIGHT, fill=tk.Y)
+    tv_rc.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    grid_rc = VirtualTree(tv_rc, sb_rc, lambda: contas_a_receber, _valores_receber)
+
+    # Total Receber (dinâmico)
+    lbl_rc_total = ttk.Label(aba_receber, textvariable=rc_total_var, anchor="e")
+    lbl_rc_total.pack(fill="x", padx=12, pady=(0,8))
+
+    # -------- Categorias -------- #
+    f_cat = ttk.LabelFrame(aba_cats, text="Gerenciar Categorias"); f_cat.pack(fill="x", padx=10, pady=5)
+    ttk.Label(f_cat, text="Nome:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=2)
+    e_cat_nome = ttk.Entry(f_cat); e_cat_nome.grid(row=0, column=1, sticky=tk.EW, padx=5, pady=2)
+    f_cat.columnconfigure(1, weight=1)
+    tv_cat = ttk.Treeview(aba_cats, columns=("Nome",), show="headings")
+    tv_cat.heading("Nome", text="Nome da Categoria")
+    tv_cat.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+    # -------- Contas Financeiras -------- #
+    f_cf = ttk.LabelFrame(aba_contas, text="Gerenciar Contas"); f_cf.pack(fill="x", padx=10, pady=5)
+    ttk.Label(f_cf, text="Nome:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=2)
+    e_cf_nome = ttk.Entry(f_cf); e_cf_nome.grid(row=0, column=1, sticky=tk.EW, padx=5, pady=2)
+    f_cf.columnconfigure(1, weight=1)
+    tv_cf = ttk.Treeview(aba_contas, columns=("Nome",), show="headings")
+    tv_cf.heading("Nome", text="Nome da Conta")
+    tv_cf.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+    f_ofx = ttk.LabelFrame(aba_contas, text="Importar OFX"); f_ofx.pack(fill="x", padx=10, pady=5)
+    ttk.Label(f_ofx, text="Conta:").pack(side=tk.LEFT, padx=5, pady=5)
+    cb_import_conta = ttk.Combobox(f_ofx, state="readonly")
+    cb_import_conta.pack(side=tk.LEFT, padx=5, pady=5, expand=True, fill="x")
+    btn_import_ofx = ttk.Button(f_ofx, text="Importar OFX")
+    btn_import_ofx.pack(side=tk.LEFT, padx=5, pady=5)
+
+    btn_export = ttk.Button(root, text="Exportar para Excel")
+    btn_export.pack(pady=6)
+
+    btn_relatorio = ttk.Button(root, text="Relatório Mensal")
+    btn_relatorio.pack(pady=0)
+
+    # ------- Helpers preenchimento de campos ------- #
+    def fill_pg_fields(idx):
+        c = contas_a_pagar[idx]
+        e_pg_desc.delete(0, tk.END); e_pg_desc.insert(0, c["descricao"])
+        e_pg_valor.delete(0, tk.END); e_pg_valor.insert(0, str(c["valor"]))
+        e_pg_data.delete(0, tk.END); e_pg_data.insert(0, c["vencimento"])  # entrada segue AAAA-MM-DD
+        cb_pg_conta.set(c["conta_nome"]); cb_pg_cat.set(c["categoria"])
+        pago_var.set(bool(c.get("pago", False)))
+
+    def fill_rc_fields(idx):
+        c = contas_a_receber[idx]
+        e_rc_desc.delete(0, tk.END); e_rc_desc.insert(0, c["descricao"])
+        e_rc_valor.delete(0, tk.END); e_rc_valor.insert(0, str(c["valor"]))
+        e_rc_data.delete(0, tk.END); e_rc_data.insert(0, c["vencimento"])
+        cb_rc_conta.set(c["conta_nome"]); cb_rc_cat.set(c["categoria"])
+        recebido_var.set(bool(c.get("recebido", False)))
+
+    def fill_cat_fields(idx):
+        e_cat_nome.delete(0, tk.END); e_cat_nome.insert(0, categorias[idx])
+
+    def fill_cf_fields(idx):
+        e_cf_nome.delete(0, tk.END); e_cf_nome.insert(0, contas_financeiras[idx]["nome"])
+
+    # ------- Binds de seleção ------- #
+    def on_select_pg(event):
+        global conta_pagar_idx
+        item_id = tv_pg.focus()
+        if not item_id: conta_pagar_idx = None; return
+        conta_pagar_idx = int(item_id); fill_pg_fields(conta_pagar_idx)
+
+    def on_select_rc(event):
+        global conta_receber_idx
+        item_id = tv_rc.focus()
+        if not item_id: conta_receber_idx = None; return
+        conta_receber_idx = int(item_id); fill_rc_fields(conta_receber_idx)
+
+    def on_select_cat(event):
+        global categoria_idx
+        item_id = tv_cat.focus()
+        if not item_id: categoria_idx = None; return
+        categoria_idx = int(item_id); fill_cat_fields(categoria_idx)
+
+    def on_select_cf(event):
+        global conta_financeira_idx
+        item_id = tv_cf.focus()
+        if not item_id: conta_financeira_idx = None; return
+        conta_financeira_idx = int(item_id); fill_cf_fields(conta_financeira_idx)
+
+    tv_pg.bind("<<TreeviewSelect>>", on_select_pg, add="+")
+    tv_rc.bind("<<TreeviewSelect>>", on_select_rc, add="+")
+    tv_cat.bind("<<TreeviewSelect>>", on_select_cat)
+    tv_cf.bind("<<TreeviewSelect>>", on_select_cf)
+
+    # ------- Atualização incremental das grids ------- #
+    def _recarregar_cadastros():
+        _refresh_cadastros(tv_cat, tv_cf, cb_pg_conta, cb_rc_conta,
+                           cb_import_conta, cb_pg_cat, cb_rc_cat)
+
+    def _mostrar_tudo_pg():
+        filtro_pg.cancelar()
+        grid_pg.set_indices(range(len(contas_a_pagar)))
+        _set_total_geral("pagar", pg_total_var)
+
+    def _mostrar_tudo_rc():
+        filtro_rc.cancelar()
+        grid_rc.set_indices(range(len(contas_a_receber)))
+        _set_total_geral("receber", rc_total_var)
+
+    def _aplicar_gravado(tipo, idx, novo):
+        """Aplica o lançamento devolvido por add/edit_entry (idx None = novo) e
+           devolve a posição em que ele ficou na lista."""
+        if idx is None:
+            pos = _patch_inserir(tipo, novo)
+            (grid_pg if tipo == "pagar" else grid_rc).limpar_selecao()
+        else:
+            pos = _patch_substituir(tipo, idx, novo)
+        if _cadastros_desatualizados(novo):
+            _recarregar_cadastros()
+        return pos
+
+    # ------- Clique na coluna Status (simula checkbox) ------- #
+    def on_click_pg(event):
+        region = tv_pg.identify("region", event.x, event.y)
+        if region != "cell": return
+        if tv_pg.identify_column(event.x) != '#6': return
+        item_id = tv_pg.identify_row(event.y)
+        if not item_id: return
+        try:
+            idx = int(item_id)
+        except Exception:
+            return
+        item = contas_a_pagar[idx]
+        novo = models.set_paid(item["id"], not bool(item.get("pago")))
+        if novo is None:
+            # excluído por outra instância depois da última carga
+            limpar_pg()
+            _refresh_completo()
+            messagebox.showwarning("Atenção", "O registro não existe mais; a lista foi atualizada.")
+            return "break"
+        pos = _aplicar_gravado("pagar", idx, novo)
+        if pos == idx:
+            grid_pg.atualizar_linha(idx)
+        else:
+            # a data mudou em outra instância: a linha foi reposicionada
+            _mostrar_tudo_pg()
+        try:
+            grid_pg.selecionar(pos); fill_pg_fields(pos)
+        except Exception:
+            pass
+        return "break"
+
+    def on_click_rc(event):
+        region = tv_rc.identify("region", event.x, event.y)
+        if region != "cell": return
+        if tv_rc.identify_column(event.x) != '#6': return
+        item_id = tv_rc.identify_row(event.y)
+        if not item_id: return
+        try:
+            idx = int(item_id)
+        except Exception:
+            return
+        item = contas_a_receber[idx]
+        novo = models.set_received(item["id"], not bool(item.get("recebido")))
+        if novo is None:
+            # excluído por outra instância depois da última carga
+            limpar_rc()
+            _refresh_completo()
+            messagebox.showwarning("Atenção", "O registro não existe mais; a lista foi atualizada.")
+            return "break"
+        pos = _aplicar_gravado("receber", idx, novo)
+        if pos == idx:
+            grid_rc.atualizar_linha(idx)
+        else:
+            # a data mudou em outra instância: a linha foi reposicionada
+            _mostrar_tudo_rc()
+        try:
+            grid_rc.selecionar(pos); fill_rc_fields(pos)
+        except Exception:
+            pass
+        return "break"
+
+    tv_pg.bind("<Button-1>", on_click_pg, add="+")
+    tv_rc.bind("<Button-1>", on_click_rc, add="+")
+
+    # ------- Limpar campos ------- #
+    def limpar_pg():
+        global conta_pagar_idx
+        e_pg_desc.delete(0, tk.END); e_pg_valor.delete(0, tk.END); e_pg_data.delete(0, tk.END)
+        e_pg_busca.delete(0, tk.END)
+        cb_pg_conta.set(""); cb_pg_cat.set(""); pago_var.set(False); conta_pagar_idx = None
+        _mostrar_tudo_pg()
+
+    def limpar_rc():
+        global conta_receber_idx
+        e_rc_desc.delete(0, tk.END); e_rc_valor.delete(0, tk.END); e_rc_data.delete(0, tk.END)
+        e_rc_busca.delete(0, tk.END)
+        cb_rc_conta.set(""); cb_rc_cat.set(""); recebido_var.set(False); conta_receber_idx = None
+        _mostrar_tudo_rc()
+
+    def limpar_cat():
+        global categoria_idx
+        e_cat_nome.delete(0, tk.END); categoria_idx = None
+
+    def limpar_cf():
+        global conta_financeira_idx
+        e_cf_nome.delete(0, tk.END); conta_financeira_idx = None
+
+    btn_limpar_filtros.configure(command=limpar_pg)
+    btn_limpar_filtros_rc.configure(command=limpar_rc)
+
+    # ------- CRUD Contas Financeiras ------- #
+    def add_cf():
+        nome = e_cf_nome.get().strip()
+        res = models.add_financial_account(nome)
+        if res is True:
+            limpar_cf()
+            _recarregar_cadastros()
+            messagebox.showinfo("Sucesso", "Conta financeira adicionada.")
+        else:
+            messagebox.showwarning("Erro", res)
+
+    def edit_cf():
+        if conta_financeira_idx is None:
+            messagebox.showwarning("Atenção", "Selecione uma conta."); return
+        acc = contas_financeiras[conta_financeira_idx]
+        novo = e_cf_nome.get().strip()
+        res = models.edit_financial_account(acc["id"], novo)
+        if res is True:
+            limpar_cf()
+            _patch_conta_renomeada(acc["id"], novo)
+            _recarregar_cadastros()
+            grid_pg.set_indices(grid_pg.indices)
+            grid_rc.set_indices(grid_rc.indices)
+            messagebox.showinfo("Sucesso", "Conta editada.")
+        else:
+            messagebox.showwarning("Erro", res)
+
+    def del_cf():
+        if conta_financeira_idx is None:
+            messagebox.showwarning("Atenção", "Selecione uma conta."); return
+        acc = contas_financeiras[conta_financeira_idx]
+        if models.account_has_entries(acc["id"]):
+            messagebox.showwarning("Atenção", "Não é possível excluir: há lançamentos associados."); return
+        if not messagebox.askyesno("Confirmar", f"Excluir conta '{acc['nome']}'?"): return
+        models.delete_financial_account_by_id(acc["id"])
+        limpar_cf()
+        _recarregar_cadastros()
+        messagebox.showinfo("Sucesso", "Conta excluída.")
+
+    # ------- CRUD Categorias ------- #
+    def add_cat():
+        nome = e_cat_nome.get().strip()
+        if not nome:
+            messagebox.showwarning("Atenção", "Nome da categoria vazio."); return
+        try:
+            models.add_category(nome)
+            limpar_cat()
+            _recarregar_cadastros()
+            messagebox.showinfo("Sucesso", "Categoria adicionada.")
+        except Exception as e:
+            messagebox.showerror("Erro", f"Falha ao adicionar: {e}")
+
+    def edit_cat():
+        if categoria_idx is None:
+            messagebox.showwarning("Atenção", "Selecione uma categoria."); return
+        atual = categorias[categoria_idx]
+        novo = e_cat_nome.get().strip()
+        if not novo:
+            messagebox.showwarning("Atenção", "Nome não pode ser vazio."); return
+        if novo in categorias and novo != atual:
+            messagebox.showwarning("Atenção", "Categoria já existe."); return
+        models.edit_category(atual, novo)
+        limpar_cat()
+        _recarregar_cadastros()
+        messagebox.showinfo("Sucesso", "Categoria editada.")
+
+    def del_cat():
+        if categoria_idx is None:
+            messagebox.showwarning("Atenção", "Selecione uma categoria."); return
+        nome = categorias[categoria_idx]
+        if not messagebox.askyesno("Confirmar", f"Excluir categoria '{nome}'?"): return
+        models.delete_category(nome)
+        limpar_cat()
+        _recarregar_cadastros()
+        messagebox.showinfo("Sucesso", "Categoria excluída.")
+
+    # ------- CRUD Pagar ------- #
+    def add_pg():
+        desc = e_pg_desc.get().strip(); val = e_pg_valor.get().strip()
+        data = e_pg_data.get().strip(); conta_nome = cb_pg_conta.get().strip(); cat = cb_pg_cat.get().strip()
+        res = models.add_entry("pagar", desc, val, data, None, conta_nome, cat)
+        if not isinstance(res, str):
+            _aplicar_gravado("pagar", None, res)
+            limpar_pg()
+            messagebox.showinfo("Sucesso", "Conta a pagar adicionada.")
+        else:
+            messagebox.showwarning("Erro", res)
+
+    def edit_pg():
+        if conta_pagar_idx is None:
+            messagebox.showwarning("Atenção", "Selecione um item."); return
+        item = contas_a_pagar[conta_pagar_idx]
+        desc = e_pg_desc.get().strip(); val = e_pg_valor.get().strip()
+        data = e_pg_data.get().strip(); conta_nome = cb_pg_conta.get().strip(); cat = cb_pg_cat.get().strip()
+        res = models.edit_entry("pagar", item["id"], desc, val, data, item.get("conta_id"), conta_nome, cat)
+        if res is None:
+            # excluído por outra instância entre a seleção e a gravação
+            limpar_pg()
+            _refresh_completo()
+            messagebox.showwarning("Atenção", "O registro não existe mais; a lista foi atualizada.")
+        elif not isinstance(res, str):
+            _aplicar_gravado("pagar", conta_pagar_idx, res)
+            limpar_pg()
+            messagebox.showinfo("Sucesso", "Conta a pagar editada.")
+        else:
+            messagebox.showwarning("Erro", res)
+
+    def del_pg():
+        # multiseleção
+        sel = grid_pg.selection()
+        if not sel:
+            messagebox.showwarning("Atenção", "Selecione uma ou mais contas a pagar.")
+            return
+        if not messagebox.askyesno("Confirmar", f"Excluir {len(sel)} conta(s) a pagar selecionada(s)?"):
+            return
+
+        ok = 0
+        falhas = []
+        removidos = []
+        for iid in sel:
+            try:
+                idx = int(iid)
+                it = contas_a_pagar[idx]
+            except Exception:
+                continue
+
+            res = models.delete_entry(
+                "pagar",
+                item_id=it.get("id"),
+                descricao=it.get("descricao"),
+                valor=float(it.get("valor", 0.0)),
+                data_str=it.get("vencimento"),
+                conta_id=it.get("conta_id"),
+                conta_nome=it.get("conta_nome"),
+            )
+            if not isinstance(res, str):
+                ok += 1
+                removidos.append(idx)
+            else:
+                falhas.append(it.get("descricao","(sem descrição)"))
+
+        _patch_remover("pagar", removidos)
+        grid_pg.limpar_selecao()
+        _mostrar_tudo_pg()
+
+        if ok and not falhas:
+            messagebox.showinfo("Sucesso", f"{ok} conta(s) a pagar excluída(s).")
+        elif ok and falhas:
+            messagebox.showwarning("Parcial",
+                f"{ok} excluída(s), {len(falhas)} falhou(aram):\n- " + "\n- ".join(falhas))
+        else:
+            messagebox.showerror("Erro", "Não foi possível excluir os itens selecionados.")
+
+    # ------- CRUD Receber ------- #
+    def add_rc():
+        desc = e_rc_desc.get().strip(); val = e_rc_valor.get().strip()
+        data = e_rc_data.get().strip(); conta_nome = cb_rc_conta.get().strip(); cat = cb_rc_cat.get().strip()
+        res = models.add_entry("receber", desc, val, data, None, conta_nome, cat)
+        if not isinstance(res, str):
+            _aplicar_gravado("receber", None, res)
+            limpar_rc()
+            messagebox.showinfo("Sucesso", "Conta a receber adicionada.")
+        else:
+            messagebox.showwarning("Erro", res)
+
+    def edit_rc():
+        if conta_receber_idx is None:
+            messagebox.showwarning("Atenção", "Selecione um item."); return
+        item = contas_a_receber[conta_receber_idx]
+        desc = e_rc_desc.get().strip(); val = e_rc_valor.get().strip()
+        data = e_rc_data.get().strip(); conta_nome = cb_rc_conta.get().strip(); cat = cb_rc_cat.get().strip()
+        res = models.edit_entry("receber", item["id"], desc, val, data, item.get("conta_id"), conta_nome, cat)
+        if res is None:
+            # excluído por outra instância entre a seleção e a gravação
+            limpar_rc()
+            _refresh_completo()
+            messagebox.showwarning("Atenção", "O registro não existe mais; a lista foi atualizada.")
+        elif not isinstance(res, str):
+            _aplicar_gravado("receber", conta_receber_idx, res)
+            limpar_rc()
+            messagebox.showinfo("Sucesso", "Conta a receber editada.")
+        else:
+            messagebox.showwarning("Erro", res)
+
+    def del_rc():
+        # multiseleção
+        sel = grid_rc.selection()
+        if not sel:
+            messagebox.showwarning("Atenção", "Selecione uma ou mais contas a receber.")
+            return
+        if not messagebox.askyesno("Confirmar", f"Excluir {len(sel)} conta(s) a receber selecionada(s)?"):
+            return
+
+        ok = 0
+        falhas = []
+        removidos = []
+        for iid in sel:
+            try:
+                idx = int(iid)
+                it = contas_a_receber[idx]
+            except Exception:
+                continue
+
+            res = models.delete_entry(
+                "receber",
+                item_id=it.get("id"),
+                descricao=it.get("descricao"),
+                valor=float(it.get("valor", 0.0)),
+                data_str=it.get("vencimento"),
+                conta_id=it.get("conta_id"),
+                conta_nome=it.get("conta_nome"),
+            )
+            if not isinstance(res, str):
+                ok += 1
+                removidos.append(idx)
+            else:
+                falhas.append(it.get("descricao","(sem descrição)"))
+
+        _patch_remover("receber", removidos)
+        grid_rc.limpar_selecao()
+        _mostrar_tudo_rc()
+
+        if ok and not falhas:
+            messagebox.showinfo("Sucesso", f"{ok} conta(s) a receber excluída(s).")
+        elif ok and falhas:
+            messagebox.showwarning("Parcial",
+                f"{ok} excluída(s), {len(falhas)} falhou(aram):\n- " + "\n- ".join(falhas))
+        else:
+            messagebox.showerror("Erro", "Não foi possível excluir os itens selecionados.")
+
+    # ------- Importar OFX / Exportar / Relatório Mensal ------- #
+    # rodam numa TarefaEmSegundoPlano; uma por vez (os botões ficam desligados)
+    botoes_tarefa = (btn_import_ofx, btn_export, btn_relatorio)
+
+    def _rodar_tarefa(titulo, trabalho, concluir, ao_terminar=None):
+        def _fim():
+            for b in botoes_tarefa:
+                b.state(["!disabled"])
+            if ao_terminar is not None:
+                ao_terminar()
+        for b in botoes_tarefa:
+            b.state(["disabled"])
+        TarefaEmSegundoPlano(root, titulo, trabalho, concluir, _fim).iniciar()
+
+    def _refresh_completo():
+        watcher.poll()      # absorve o que foi gravado: a tela é refeita aqui mesmo
+        _refresh_all(grid_pg, grid_rc, tv_cat, tv_cf, cb_pg_conta, cb_rc_conta,
+                     cb_import_conta, cb_pg_cat, cb_rc_cat, pg_total_var, rc_total_var)
+
+    def importar_ofx():
+        paths = filedialog.askopenfilenames(defaultextension=".ofx",
+                                            filetypes=[("OFX","*.ofx"),("Todos","*.*")])
+        if not paths: return
+        conta_nome = cb_import_conta.get().strip()
+        if not conta_nome:
+            messagebox.showwarning("Atenção", "Selecione uma conta para importar."); return
+        conta = next((c for c in contas_financeiras if c["nome"] == conta_nome), None)
+        if not conta:
+            messagebox.showerror("Erro", "Conta selecionada não encontrada."); return
+        if len(paths) > 1:
+            _importar_varios(paths, conta); return
+
+        def _concluir(resultado, cancelada):
+            qtd, err = resultado
+            if err:
+                (messagebox.showinfo if cancelada else messagebox.showerror)("Importar OFX", err); return
+            _refresh_completo()
+            if qtd: messagebox.showinfo("Sucesso", f"{qtd} transações importadas.")
+            else:   messagebox.showinfo("Informação", "Nenhuma nova transação encontrada.")
+
+        _rodar_tarefa("Importando OFX",
+                      lambda progresso, cancelado: _ofx_importer().import_ofx(
+                          paths[0], conta["id"], conta["nome"], progresso, cancelado),
+                      _concluir)
+
+    def _importar_varios(paths, conta):
+        _rodar_tarefa("Importando OFX",
+                      lambda progresso, cancelado: _ofx_importer().import_ofx_batch(
+                          [(p, conta) for p in paths], progresso=progresso, cancelado=cancelado),
+                      _concluir_varios)
+
+    def _concluir_varios(resumo, cancelada):
+        # mesmo cancelado, os arquivos gravados antes do cancelamento ficam
+        _refresh_completo()
+        linhas = []
+        for r in resumo:
+            nome = os.path.basename(r["arquivo"])
+            if r["erros"]:
+                linhas.append(f"{nome}: {r['erro']}")
+            else:
+                linhas.append(f"{nome}: {r['inseridas']} nova(s), {r['duplicadas']} duplicada(s)")
+        total = sum(r["inseridas"] for r in resumo)
+        titulo = "Importação com erros" if any(r["erros"] for r in resumo) else "Importação concluída"
+        messagebox.showinfo(titulo, f"{total} transações importadas.\n\n" + "\n".join(linhas))
+
+    def exportar():
+        def _concluir(resultado, cancelada):
+            ok, msg = resultado
+            (messagebox.showinfo if ok or cancelada else messagebox.showerror)("Exportar", msg)
+
+        _rodar_tarefa("Exportando para Excel",
+                      lambda progresso, cancelado: _export_excel().export_database_to_excel(
+                          progresso=progresso, cancelado=cancelado),
+                      _concluir)
+
+    def abrir_relatorio_mensal():
+        # popup para escolher mês/ano/categoria
+        win = tk.Toplevel(root)
+        win.title("Relatório Mensal")
+
+        ttk.Label(win, text="Mês (1-12):").grid(row=0, column=0, padx=5, pady=5, sticky=tk.W)
+        cb_mes = ttk.Combobox(win, state="readonly", values=[str(i) for i in range(1,13)], width=10)
+        cb_mes.grid(row=0, column=1, padx=5, pady=5, sticky=tk.EW)
+
+        ttk.Label(win, text="Ano (YYYY):").grid(row=1, column=0, padx=5, pady=5, sticky=tk.W)
+        e_ano = ttk.Entry(win, width=12)
+        e_ano.insert(0, str(datetime.now().year))
+        e_ano.grid(row=1, column=1, padx=5, pady=5, sticky=tk.EW)
+
+        ttk.Label(win, text="Categoria:").grid(row=2, column=0, padx=5, pady=5, sticky=tk.W)
+        cb_cat = ttk.Combobox(win, state="readonly", values=["Todas"] + categorias)
+        cb_cat.set("Todas")
+        cb_cat.grid(row=2, column=1, padx=5, pady=5, sticky=tk.EW)
+
+        def _gerar():
+            m = cb_mes.get().strip()
+            a = e_ano.get().strip()
+            if not m or not a:
+                messagebox.showwarning("Atenção", "Informe mês e ano.")
+                return
+            try:
+                mes = int(m); ano = int(a)
+                if mes < 1 or mes > 12 or ano < 1900:
+                    raise ValueError()
+            except Exception:
+                messagebox.showwarning("Atenção", "Mês/Ano inválidos.")
+                return
+
+            cat = cb_cat.get().strip()
+            cat = None if (not cat or cat.lower()=="todas") else cat
+
+            def _concluir(resultado, cancelada):
+                ok, msg = resultado
+                (messagebox.showinfo if ok or cancelada else messagebox.showerror)("Relatório Mensal", msg)
+                if ok:
+                    try: win.destroy()
+                    except: pass
+
+            def _liberar_gerar():
+                if win.winfo_exists():
+                    btn_gerar.state(["!disabled"])
+
+            btn_gerar.state(["disabled"])
+            _rodar_tarefa("Gerando relatório",
+                          lambda progresso, cancelado: _export_excel().export_monthly_report(
+                              mes, ano, cat, progresso, cancelado),
+                          _concluir, _liberar_gerar)
+
+        btn_gerar = ttk.Button(win, text="Gerar", command=_gerar)
+        btn_gerar.grid(row=3, column=0, columnspan=2, padx=5, pady=10)
+        win.columnconfigure(1, weight=1)
+
+    btn_import_ofx.configure(command=importar_ofx)
+    btn_export.configure(command=exportar)
+    btn_relatorio.configure(command=abrir_relatorio_mensal)
+
+    # ------- FILTROS ao digitar (Pagar e Receber) ------- #
+    # Os campos do formulário (Valor, Descrição, Data) + a busca geral filtram a
+    # grid; as regras ficam em core.filter_engine, comuns às duas abas.
+    def _criar_filtro(tipo, grid, total_var, e_valor, e_desc, e_data, e_busca, mostrar_tudo):
+        motor = _motores[tipo]
+
+        def _preparar():
+            trabalho = motor.preparar(valor=e_valor.get(), descricao=e_desc.get(),
+                                      data=e_data.get(), busca=e_busca.get())
+            if trabalho is None:
+                # sem filtro: tudo o que já está em memória, sem ir ao banco
+                mostrar_tudo()
+            return trabalho
+
+        def _aplicar(resultado):
+            posicoes, soma = resultado
+            grid.set_indices(posicoes, manter_posicao=False)
+            _set_total(total_var, len(posicoes), soma)
+
+        filtro = FiltroAssincrono(root, _preparar, _aplicar)
+        for e in (e_valor, e_desc, e_data, e_busca):
+            e.bind("<KeyRelease>", filtro.agendar)
+        return filtro
+
+    filtro_pg = _criar_filtro("pagar", grid_pg, pg_total_var,
+                              e_pg_valor, e_pg_desc, e_pg_data, e_pg_busca, _mostrar_tudo_pg)
+    filtro_rc = _criar_filtro("receber", grid_rc, rc_total_var,
+                              e_rc_valor, e_rc_desc, e_rc_data, e_rc_busca, _mostrar_tudo_rc)
+
+    # ------- Botões ------- #
+    fb_pg = ttk.Frame(aba_pagar); fb_pg.pack(fill="x", padx=10, pady=5)
+    ttk.Button(fb_pg, text="Adicionar", command=add_pg).pack(side=tk.LEFT, padx=5)
+    ttk.Button(fb_pg, text="Editar",   command=edit_pg).pack(side=tk.LEFT, padx=5)
+    ttk.Button(fb_pg, text="Excluir selecionadas",  command=del_pg).pack(side=tk.LEFT, padx=5)
+    ttk.Button(fb_pg, text="Limpar",   command=limpar_pg).pack(side=tk.LEFT, padx=5)
+    # Dica: para marcar como Pago/Não pago, clique na coluna "Status" da tabela.
+
+    fb_rc = ttk.Frame(aba_receber); fb_rc.pack(fill="x", padx=10, pady=5)
+    ttk.Button(fb_rc, text="Adicionar", command=add_rc).pack(side=tk.LEFT, padx=5)
+    ttk.Button(fb_rc, text="Editar",    command=edit_rc).pack(side=tk.LEFT, padx=5)
+    ttk.Button(fb_rc, text="Excluir selecionadas",   command=del_rc).pack(side=tk.LEFT, padx=5)
+    ttk.Button(fb_rc, text="Limpar",    command=limpar_rc).pack(side=tk.LEFT, padx=5)
+
+    fb_cat = ttk.Frame(aba_cats); fb_cat.pack(fill="x", padx=10, pady=5)
+    ttk.Button(fb_cat, text="Adicionar", command=add_cat).pack(side=tk.LEFT, padx=5)
+    ttk.Button(fb_cat, text="Editar",    command=edit_cat).pack(side=tk.LEFT, padx=5)
+    ttk.Button(fb_cat, text="Excluir",   command=del_cat).pack(side=tk.LEFT, padx=5)
+    ttk.Button(fb_cat, text="Limpar",    command=limpar_cat).pack(side=tk.LEFT, padx=5)
+
+    fb_cf = ttk.Frame(aba_contas); fb_cf.pack(fill="x", padx=10, pady=5)
+    ttk.Button(fb_cf, text="Adicionar", command=add_cf).pack(side=tk.LEFT, padx=5)
+    ttk.Button(fb_cf, text="Editar",    command=edit_cf).pack(side=tk.LEFT, padx=5)
+    ttk.Button(fb_cf, text="Excluir",   command=del_cf).pack(side=tk.LEFT, padx=5)
+    btn_import_ofx.configure(command=importar_ofx)
+
+    # ------- Atalhos de teclado ------- #
+    def _is_pagar_active():
+        return nb.select() == aba_pagar._w
+    def _is_receber_active():
+        return nb.select() == aba_receber._w
+
+    def _enter_add(event=None):
+        if _is_pagar_active(): add_pg()
+        elif _is_receber_active(): add_rc()
+
+    def _ctrl_e_edit(event=None):
+        if _is_pagar_active(): edit_pg()
+        elif _is_receber_active(): edit_rc()
+
+    def _del_delete(event=None):
+        if _is_pagar_active(): del_pg()
+        elif _is_receber_active(): del_rc()
+
+    root.bind("<Return>", _enter_add)
+    root.bind("<Control-e>", _ctrl_e_edit)
+    root.bind("<Delete>", _del_delete)
+
+    # Liga botões principais
+    btn_export.configure(command=exportar)
+    btn_relatorio.configure(command=abrir_relatorio_mensal)
+
+    # ------- Alterações feitas por outras instâncias ------- #
+    watcher = database.ChangeWatcher()
+
+    def _aplicar_alteracoes_externas(mudou):
+        global conta_pagar_idx, conta_receber_idx, categoria_idx, conta_financeira_idx
+        # nomes de conta aparecem nas grids: renomear conta afeta os lançamentos
+        contas_mudaram = "contas_financeiras" in mudou
+        if contas_mudaram or "categorias" in mudou:
+            cats_antes, cfs_antes = categorias, contas_financeiras
+            _recarregar_cadastros()
+            categoria_idx = _nova_posicao(cats_antes, categorias, categoria_idx, chave=None)
+            conta_financeira_idx = _nova_posicao(cfs_antes, contas_financeiras, conta_financeira_idx)
+        if contas_mudaram or "contas_a_pagar" in mudou:
+            antes = contas_a_pagar
+            _recarregar_lancamentos("pagar")
+            conta_pagar_idx = _nova_posicao(antes, contas_a_pagar, conta_pagar_idx)
+            grid_pg.limpar_selecao()
+            # posições filtradas antigas não valem na lista nova: mostra tudo
+            # até o filtro (se houver) ser reaplicado em segundo plano
+            _mostrar_tudo_pg()
+            filtro_pg.disparar()
+        if contas_mudaram or "contas_a_receber" in mudou:
+            antes = contas_a_receber
+            _recarregar_lancamentos("receber")
+            conta_receber_idx = _nova_posicao(antes, contas_a_receber, conta_receber_idx)
+            grid_rc.limpar_selecao()
+            _mostrar_tudo_rc()
+            filtro_rc.disparar()
+
+    def _sondar_alteracoes():
+        try:
+            mudou = watcher.poll()
+        except Exception:
+            mudou = set()       # banco ocupado/indisponível: tenta de novo na próxima
+        if mudou:
+            _aplicar_alteracoes_externas(mudou)
+        root.after(_INTERVALO_SONDAGEM_MS, _sondar_alteracoes)
+
+    # ------- Inicialização ------- #
+    _refresh_all(grid_pg, grid_rc, tv_cat, tv_cf, cb_pg_conta, cb_rc_conta,
+                 cb_import_conta, cb_pg_cat, cb_rc_cat, pg_total_var, rc_total_var)
+    root.after(_INTERVALO_SONDAGEM_MS, _sondar_alteracoes)
+    root.mainloop()
+
+if __name__ == "__main__":
+    main_window()
@@ -0,0 +1,264 @@
+# core/instrumentacao.py — medição opcional de SQL e das chamadas do core
+#
+# Desligada por padrão (custo zero). Liga com a variável de ambiente:
+#   FINANCEIRO_INSTRUMENTAR=1                 relatório no stderr ao sair
+#   FINANCEIRO_INSTRUMENTAR=/tmp/perfil.txt   relatório nesse arquivo
+#
+# Ligada, ela registra:
+#   - cada comando SQL (pelo texto): execuções, tempo total e histograma de
+#     latência. O tempo inclui o execute e a leitura das linhas (fetch/iteração);
+#   - cada chamada das funções públicas de core.models, core.ofx_importer e
+#     core.export_excel (geradores contam só o tempo dentro do gerador);
+#   - possíveis N+1: o mesmo comando rodando muitas vezes (execute, não
+#     executemany) dentro de UMA chamada do core, ex.: um SELECT por linha.
+
+import atexit
+import os
+import sqlite3
+import sys
+import threading
+import time
+from bisect import bisect_right
+
+_DESTINO = os.environ.get("FINANCEIRO_INSTRUMENTAR", "").strip()
+ATIVO = _DESTINO not in ("", "0")
+
+# limites superiores (ms) das faixas do histograma; a última faixa é "acima"
+FAIXAS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+# execuções do mesmo comando numa única chamada do core a partir das quais é N+1
+LIMIAR_N_MAIS_1 = 50
+_MAX_SQL = 160               # tamanho do texto do SQL no relatório
+
+_lock = threading.Lock()
+_sql = {}                    # sql -> [execuções, linhas (executemany), tempo total, histograma]
+_chamadas = {}               # "modulo.funcao" -> [chamadas, tempo total, máximo]
+_suspeitas = {}              # (funcao, sql) -> [ocorrências, maior nº de execuções numa chamada]
+_local = threading.local()   # pilha de chamadas do core da thread (contagem de SQL por chamada)
+_inicio = time.perf_counter()
+
+def _normalizar(sql: str) -> str:
+    return " ".join(sql.split())
+
+# ----------------- SQL -----------------
+def _registrar_sql(sql: str, segundos: float, execucoes: int = 1, linhas: int = 0):
+    with _lock:
+        e = _sql.get(sql)
+        if e is None:
+            e = _sql[sql] = [0, 0, 0.0, [0] * (len(FAIXAS_MS) + 1)]
+        e[0] += execucoes
+        e[1] += linhas
+        e[2] += segundos
+        e[3][bisect_right(FAIXAS_MS, segundos * 1000)] += 1
+
+def _contar_na_chamada(sql: str):
+    """Conta a execução na chamada do core mais externa em andamento (para N+1)."""
+    pilha = getattr(_local, "pilha", None)
+    if pilha:
+        contagem = pilha[0][1]
+        contagem[sql] = contagem.get(sql, 0) + 1
+
+class CursorInstrumentado(sqlite3.Cursor):
+    """Cursor que mede execute/executemany e a leitura das linhas do comando atual."""
+    _comando = None
+    _tempo = 0.0
+
+    def _fechar_medicao(self):
+        if self._comando is not None:
+            _registrar_sql(self._comando, self._tempo)
+            self._comando = None
+
+    def execute(self, sql, parametros=()):
+        self._fechar_medicao()
+        t0 = time.perf_counter()
+        try:
+            return super().execute(sql, parametros)
+        finally:
+            self._comando, self._tempo = _normalizar(sql), time.perf_counter() - t0
+            _contar_na_chamada(self._comando)
+            if not self.description:     # sem linhas para ler: registra já
+                self._fechar_medicao()
+
+    def executemany(self, sql, seq):
+        self._fechar_medicao()
+        seq = seq if isinstance(seq, (list, tuple)) else list(seq)
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(sql, seq)
+        finally:
+            _registrar_sql(_normalizar(sql), time.perf_counter() - t0, linhas=len(seq))
+
+    def executescript(self, script):
+        self._fechar_medicao()
+        t0 = time.perf_counter()
+        try:
+            return super().executescript(script)
+        finally:
+            _registrar_sql(_normalizar(script), time.perf_counter() - t0)
+
+    def _ler(self, metodo, *args):
+        t0 = time.perf_counter()
+        try:
+            return metodo(*args)
+        finally:
+            self._tempo += time.perf_counter() - t0
+
+    def fetchone(self):
+        r = self._ler(super().fetchone)
+        if r is None:
+            self._fechar_medicao()
+        return r
+
+    def fetchmany(self, *args):
+        r = self._ler(super().fetchmany, *args)
+        if not r:
+            self._fechar_medicao()
+        return r
+
+    def fetchall(self):
+        r = self._ler(super().fetchall)
+        self._fechar_medicao()
+        return r
+
+    def __next__(self):
+        try:
+            return self._ler(super().__next__)
+        except StopIteration:
+            self._fechar_medicao()
+            raise
+
+    def close(self):
+        self._fechar_medicao()
+        super().close()
+
+    def __del__(self):
+        # cursor abandonado sem ler tudo (ex.: fetchone de uma linha só)
+        self._fechar_medicao()
+
+class ConexaoInstrumentada(sqlite3.Connection):
+    """sqlite3.Connection cujos cursores (inclusive os de con.execute) são medidos."""
+
+    def cursor(self, factory=CursorInstrumentado):
+        return super().cursor(factory)
+
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, seq):
+        return self.cursor().executemany(sql, seq)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+# ----------------- Chamadas do core -----------------
+def _pilha() -> list:
+    pilha = getattr(_local, "pilha", None)
+    if pilha is None:
+        pilha = _local.pilha = []
+    return pilha
+
+def _contabilizar(quadro, segundos: float):
+    nome, contagem = quadro
+    with _lock:
+        c = _chamadas.get(nome)
+        if c is None:
+            c = _chamadas[nome] = [0, 0.0, 0.0]
+        c[0] += 1
+        c[1] += segundos
+        c[2] = max(c[2], segundos)
+        for sql, n in contagem.items():
+            if n >= LIMIAR_N_MAIS_1:
+                s = _suspeitas.setdefault((nome, sql), [0, 0])
+                s[0] += 1
+                s[1] = max(s[1], n)
+
+def _medir_funcao(nome: str, fn):
+    import functools, inspect       # só com a instrumentação ligada: não pesam na abertura
+    if inspect.isgeneratorfunction(fn):
+        @functools.wraps(fn)
+        def gerador(*args, **kwargs):
+            # um gerador conta como uma chamada, com o tempo somado dos passos
+            quadro, total = (nome, {}), 0.0
+            it = fn(*args, **kwargs)
+            try:
+                while True:
+                    pilha = _pilha()
+                    pilha.append(quadro)
+                    t0 = time.perf_counter()
+                    try:
+                        item = next(it)
+                    except StopIteration:
+                        return
+                    finally:
+                        total += time.perf_counter() - t0
+                        pilha.pop()
+                    yield item
+            finally:
+                _contabilizar(quadro, total)
+        return gerador
+
+    @functools.wraps(fn)
+    def medida(*args, **kwargs):
+        quadro = (nome, {})
+        pilha = _pilha()
+        pilha.append(quadro)
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            dt = time.perf_counter() - t0
+            pilha.pop()
+            _contabilizar(quadro, dt)
+    return medida
+
+def instrumentar_modulo(modulo):
+    """Troca as funções públicas definidas no módulo por versões medidas.
+       Quem usa modulo.funcao (inclusive o próprio módulo) passa pela medição."""
+    import inspect
+    prefixo = modulo.__name__.rsplit(".", 1)[-1]
+    for nome, obj in list(vars(modulo).items()):
+        if (not nome.startswith("_") and inspect.isfunction(obj)
+                and obj.__module__ == modulo.__name__ and not hasattr(obj, "__wrapped__")):
+            setattr(modulo, nome, _medir_funcao(f"{prefixo}.{nome}", obj))
+
+# ----------------- Relatório -----------------
+def _histograma(h) -> str:
+    rotulos = [f"<{f:g}ms" for f in FAIXAS_MS] + [f">={FAIXAS_MS[-1]:g}ms"]
+    return " ".join(f"{r}:{n}" for r, n in zip(rotulos, h) if n)
+
+def relatorio() -> str:
+    """Texto do relatório com o que foi medido até agora."""
+    with _lock:
+        sql = sorted(_sql.items(), key=lambda kv: kv[1][2], reverse=True)
+        chamadas = sorted(_chamadas.items(), key=lambda kv: kv[1][1], reverse=True)
+        suspeitas = sorted(_suspeitas.items(), key=lambda kv: kv[1][1], reverse=True)
+    linhas = [f"== Instrumentação do financeiro — {time.perf_counter() - _inicio:.1f}s de execução",
+              "", "-- Chamadas do core (por tempo total)",
+              f"{'chamadas':>9} {'total(s)':>10} {'média(ms)':>10} {'máx(ms)':>10}  função"]
+    for nome, (n, total, maximo) in chamadas:
+        linhas.append(f"{n:>9} {total:>10.3f} {total / n * 1000:>10.2f} {maximo * 1000:>10.2f}  {nome}")
+    linhas += ["", "-- SQL (por tempo total; executemany conta 1 execução)",
+               f"{'execuções':>9} {'total(s)':>10} {'média(ms)':>10}  comando / histograma"]
+    for texto, (n, lote, total, hist) in sql:
+        extra = f" [{lote} linhas em lote]" if lote else ""
+        linhas.append(f"{n:>9} {total:>10.3f} {total / n * 1000:>10.3f}  {texto[:_MAX_SQL]}{extra}")
+        linhas.append(f"{'':>32}{_histograma(hist)}")
+    linhas += ["", f"-- Possíveis N+1 (mesmo comando >= {LIMIAR_N_MAIS_1}x numa chamada)"]
+    if not suspeitas:
+        linhas.append("   nenhum")
+    for (nome, texto), (vezes, maximo) in suspeitas:
+        linhas.append(f"   {nome}: até {maximo}x numa chamada ({vezes} chamada(s)) — {texto[:_MAX_SQL]}")
+    return "\n".join(linhas) + "\n"
+
+def _gravar_relatorio():
+    texto = relatorio()
+    if _DESTINO.lower() in ("1", "stderr", "sim", "true"):
+        sys.stderr.write(texto)
+        return
+    try:
+        with open(_DESTINO, "w", encoding="utf-8") as f:
+            f.write(texto)
+    except OSError as e:
+        sys.stderr.write(f"instrumentação: não foi possível gravar {_DESTINO}: {e}\n{texto}")
+
+if ATIVO:
+    atexit.register(_gravar_relatorio)
@@ -0,0 +1,26 @@
+# core/manutencao.py — comandos de manutenção do banco (FINANCEIRO_DB)
+#
+# Uso (a partir da raiz do projeto, onde fica o pacote core/):
+#   python -m core.manutencao resumo      # refaz o resumo mensal materializado
+
+import argparse
+import sys
+
+from . import database
+
+def _resumo(_args) -> int:
+    linhas = database.rebuild_resumo_mensal()
+    print(f"Resumo mensal refeito: {linhas} linhas.")
+    return 0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.manutencao",
+                                     description="Manutenção do banco do financeiro.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    sub.add_parser("resumo", help="refaz a tabela resumo_mensal a partir dos lançamentos"
+                   ).set_defaults(func=_resumo)
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
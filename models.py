@@ -1,460 +1,644 @@
-# core/models.py — CRUD completo + buscas + helpers + status
-
-from datetime import datetime
-from .database import conn
-import sqlite3
-
-# ----------------- Helpers -----------------
-def _parse_valor(valor_str: str) -> float:
-    if valor_str is None:
-        return 0.0
-    s = str(valor_str).strip().replace("R$", "").replace(" ", "")
-    if "," in s and "." in s:
-        s = s.replace(".", "").replace(",", ".")
-    else:
-        s = s.replace(",", ".")
-    return float(s or 0.0)
-
-def _to_date_yyyy_mm_dd(s: str) -> str:
-    s = (s or "").strip()
-    if not s:
-        return ""
-    for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%Y%m%d"):
-        try:
-            return datetime.strptime(s, fmt).strftime("%Y-%m-%d")
-        except Exception:
-            pass
-    return s  # mantém como veio para não quebrar
-
-def _get_conta_nome(cur, conta_id: int) -> str:
-    cur.execute("SELECT nome FROM contas_financeiras WHERE id=?", (conta_id,))
-    r = cur.fetchone()
-    return r["nome"] if r else ""
-
-def _row_to_dict(row, conta_nome) -> dict:
-    d = {
-        "id": row["id"],
-        "descricao": row["descricao"] or "",
-        "valor": float(row["valor"] or 0.0),
-        "vencimento": row["data"] or "",
-        "conta_id": row["conta_id"],
-        "conta_nome": conta_nome or "",
-        "categoria": row["categoria"] or "",
-    }
-    if "pago" in row.keys():
-        d["pago"] = bool(row["pago"])
-    if "recebido" in row.keys():
-        d["recebido"] = bool(row["recebido"])
-    return d
-
-# ----------------- Leitura -----------------
-def load_all():
-    """Retorna (contas_a_pagar, contas_a_receber, contas_financeiras, categorias)"""
-    con = conn(); cur = con.cursor()
-
-    cur.execute("SELECT id, nome FROM contas_financeiras ORDER BY nome")
-    contas_fin = [{"id": r["id"], "nome": r["nome"]} for r in cur.fetchall()]
-
-    cur.execute("SELECT nome FROM categorias ORDER BY nome")
-    categorias = [r["nome"] for r in cur.fetchall()]
-
-    cur.execute("SELECT * FROM contas_a_pagar ORDER BY date(data) ASC, id ASC")
-    pagar_rows = cur.fetchall()
-    contas_pagar = []
-    for r in pagar_rows:
-        nome = _get_conta_nome(cur, r["conta_id"])
-        contas_pagar.append(_row_to_dict(r, nome))
-
-    cur.execute("SELECT * FROM contas_a_receber ORDER BY date(data) ASC, id ASC")
-    receber_rows = cur.fetchall()
-    contas_receber = []
-    for r in receber_rows:
-        nome = _get_conta_nome(cur, r["conta_id"])
-        contas_receber.append(_row_to_dict(r, nome))
-
-    con.close()
-    return (contas_pagar, contas_receber, contas_fin, categorias)
-
-# ------------- Categorias CRUD -------------
-def add_category(name: str):
-    name = (name or "").strip()
-    if not name:
-        raise ValueError("Nome da categoria vazio.")
-    con = conn(); cur = con.cursor()
-    try:
-        cur.execute("INSERT INTO categorias (nome) VALUES (?)", (name,))
-        con.commit()
-    except sqlite3.IntegrityError:
-        pass
-    finally:
-        con.close()
-
-def edit_category(old: str, new: str):
-    old = (old or "").strip(); new = (new or "").strip()
-    if not old or not new:
-        raise ValueError("Nomes inválidos.")
-    con = conn(); cur = con.cursor()
-    cur.execute("UPDATE categorias SET nome=? WHERE nome=?", (new, old))
-    con.commit(); con.close()
-
-def delete_category(name: str):
-    name = (name or "").strip()
-    if not name:
-        raise ValueError("Nome inválido.")
-    con = conn(); cur = con.cursor()
-    cur.execute("DELETE FROM categorias WHERE nome=?", (name,))
-    con.commit(); con.close()
-
-# ------- Contas Financeiras CRUD -------
-def add_financial_account(name: str):
-    name = (name or "").strip()
-    if not name:
-        return "O nome da conta não pode ser vazio."
-    con = conn(); cur = con.cursor()
-    try:
-        cur.execute("INSERT INTO contas_financeiras (nome) VALUES (?)", (name,))
-        con.commit()
-        return True
-    except sqlite3.IntegrityError:
-        return f"Conta financeira '{name}' já existe."
-    finally:
-        con.close()
-
-def edit_financial_account(acc_id: int, new_name: str):
-    new_name = (new_name or "").strip()
-    if not new_name:
-        return "O nome da conta não pode ser vazio."
-    con = conn(); cur = con.cursor()
-    cur.execute("SELECT id FROM contas_financeiras WHERE nome=? AND id<>?", (new_name, acc_id))
-    if cur.fetchone():
-        con.close()
-        return f"Conta financeira '{new_name}' já existe."
-    cur.execute("UPDATE contas_financeiras SET nome=? WHERE id=?", (new_name, acc_id))
-    con.commit(); con.close()
-    return True
-
-def account_has_entries(acc_id: int) -> bool:
-    con = conn(); cur = con.cursor()
-    cur.execute("SELECT 1 FROM contas_a_pagar WHERE conta_id=? LIMIT 1", (acc_id,))
-    if cur.fetchone():
-        con.close(); return True
-    cur = con.cursor()
-    cur.execute("SELECT 1 FROM contas_a_receber WHERE conta_id=? LIMIT 1", (acc_id,))
-    r = cur.fetchone()
-    con.close()
-    return bool(r)
-
-def delete_financial_account_by_id(acc_id: int):
-    con = conn(); cur = con.cursor()
-    cur.execute("DELETE FROM contas_financeiras WHERE id=?", (acc_id,))
-    con.commit(); con.close()
-
-# --------- Pagar/Receber CRUD ----------
-def _resolve_conta_id(cur, conta_id, conta_nome) -> int | None:
-    if isinstance(conta_id, int):
-        return conta_id
-    try:
-        return int(conta_id)
-    except Exception:
-        pass
-    nome = (conta_nome or "").strip()
-    if nome:
-        cur.execute("SELECT id FROM contas_financeiras WHERE nome=?", (nome,))
-        r = cur.fetchone()
-        if r:
-            return r["id"]
-        cur.execute("INSERT INTO contas_financeiras (nome) VALUES (?)", (nome,))
-        return cur.lastrowid
-    cur.execute("SELECT id FROM contas_financeiras ORDER BY id LIMIT 1")
-    r = cur.fetchone()
-    if r:
-        return r["id"]
-    cur.execute("INSERT INTO contas_financeiras (nome) VALUES ('Conta Importada')")
-    return cur.lastrowid
-
-def add_entry(tipo: str, descricao: str, valor_str: str, data_str: str, conta_id, conta_nome: str, categoria: str):
-    if tipo not in ("pagar", "receber"):
-        return "Tipo inválido."
-    descricao = (descricao or "").strip()
-    if not descricao:
-        return "Descrição não pode ser vazia."
-    try:
-        valor = _parse_valor(valor_str)
-    except Exception:
-        return "Valor inválido."
-    data = _to_date_yyyy_mm_dd(data_str)
-
-    con = conn(); cur = con.cursor()
-    try:
-        cid = _resolve_conta_id(cur, conta_id, conta_nome)
-        tabela = "contas_a_pagar" if tipo == "pagar" else "contas_a_receber"
-        status_col = "pago" if tipo == "pagar" else "recebido"
-        cur.execute(
-            f"INSERT INTO {tabela} (descricao, valor, data, conta_id, categoria, {status_col}) VALUES (?, ?, ?, ?, ?, 0)",
-            (descricao, float(valor), data, int(cid), (categoria or "").strip())
-        )
-        con.commit()
-        if categoria:
-            try:
-                cur.execute("INSERT INTO categorias (nome) VALUES (?)", ((categoria or "").strip(),))
-                con.commit()
-            except sqlite3.IntegrityError:
-                pass
-        return True
-    finally:
-        con.close()
-
-def edit_entry(tipo: str, item_id: int, descricao: str, valor_str: str, data_str: str,
-               conta_id, conta_nome: str, categoria: str):
-    if tipo not in ("pagar", "receber"):
-        return "Tipo inválido."
-    try:
-        valor = _parse_valor(valor_str)
-    except Exception:
-        return "Valor inválido."
-    data = _to_date_yyyy_mm_dd(data_str)
-
-    con = conn(); cur = con.cursor()
-    try:
-        cid = _resolve_conta_id(cur, conta_id, conta_nome)
-        tabela = "contas_a_pagar" if tipo == "pagar" else "contas_a_receber"
-        cur.execute(
-            f"UPDATE {tabela} SET descricao=?, valor=?, data=?, conta_id=?, categoria=? WHERE id=?",
-            (descricao, float(valor), data, int(cid), (categoria or "").strip(), int(item_id))
-        )
-        con.commit()
-        if categoria:
-            try:
-                cur.execute("INSERT INTO categorias (nome) VALUES (?)", ((categoria or "").strip(),))
-                con.commit()
-            except sqlite3.IntegrityError:
-                pass
-        return True
-    finally:
-        con.close()
-
-def delete_entry(tipo: str, item_id: int | None = None, descricao: str | None = None,
-                 valor: float | None = None, data_str: str | None = None, conta_id=None, conta_nome: str | None = None):
-    """Exclui por ID; se faltar ID, tenta localizar por (descricao, valor, data[, conta_id])."""
-    if tipo not in ("pagar", "receber"):
-        return "Tipo inválido."
-    tabela = "contas_a_pagar" if tipo == "pagar" else "contas_a_receber"
-    con = conn(); cur = con.cursor()
-    try:
-        if item_id is not None:
-            cur.execute(f"DELETE FROM {tabela} WHERE id=?", (int(item_id),))
-            con.commit()
-            return True
-
-        if descricao is None or data_str is None or valor is None:
-            return "Registro sem ID e sem dados suficientes para excluir."
-        data = _to_date_yyyy_mm_dd(data_str)
-
-        cid = None
-        try:
-            cid = int(conta_id) if conta_id is not None else None
-        except Exception:
-            cid = _resolve_conta_id(cur, conta_id, conta_nome)
-
-        if isinstance(cid, int):
-            cur.execute(
-                f"""SELECT id FROM {tabela}
-                    WHERE descricao=? AND ABS(valor-?)<1e-6 AND data=? AND conta_id=?
-                    ORDER BY id DESC LIMIT 1""",
-                (descricao, float(valor), data, cid)
-            )
-        else:
-            cur.execute(
-                f"""SELECT id FROM {tabela}
-                    WHERE descricao=? AND ABS(valor-?)<1e-6 AND data=?
-                    ORDER BY id DESC LIMIT 1""",
-                (descricao, float(valor), data)
-            )
-
-        row = cur.fetchone()
-        if not row:
-            return "Registro sem ID. Não foi possível localizar no banco para excluir."
-
-        db_id = row["id"]
-        cur.execute(f"DELETE FROM {tabela} WHERE id=?", (int(db_id),))
-        con.commit()
-        return True
-    finally:
-        con.close()
-
-# ------------- Status (Pago/Recebido) -------------
-def set_paid(item_id: int, paid: bool) -> bool:
-    con = conn(); cur = con.cursor()
-    try:
-        cur.execute("UPDATE contas_a_pagar SET pago=? WHERE id=?", (1 if paid else 0, int(item_id)))
-        con.commit()
-        return True
-    finally:
-        con.close()
-
-def set_received(item_id: int, received: bool) -> bool:
-    con = conn(); cur = con.cursor()
-    try:
-        cur.execute("UPDATE contas_a_receber SET recebido=? WHERE id=?", (1 if received else 0, int(item_id)))
-        con.commit()
-        return True
-    finally:
-        con.close()
-
-# ================= BUSCAS FLEXÍVEIS =================
-def _build_where_and_params(alias: str, descricao=None, data_ini=None, data_fim=None,
-                            valor_min=None, valor_max=None, mes=None, ano=None,
-                            conta_id=None, categoria=None, status=None):
-    where = []
-    params = []
-
-    if descricao:
-        where.append(f"UPPER({alias}.descricao) LIKE UPPER(?)")
-        params.append(f"%{descricao}%")
-
-    if data_ini:
-        where.append(f"date({alias}.data) >= date(?)")
-        params.append(_to_date_yyyy_mm_dd(data_ini))
-    if data_fim:
-        where.append(f"date({alias}.data) <= date(?)")
-        params.append(_to_date_yyyy_mm_dd(data_fim))
-
-    if valor_min is not None and str(valor_min) != "":
-        try:
-            vmin = _parse_valor(valor_min)
-            where.append(f"{alias}.valor >= ?")
-            params.append(vmin)
-        except Exception:
-            pass
-    if valor_max is not None and str(valor_max) != "":
-        try:
-            vmax = _parse_valor(valor_max)
-            where.append(f"{alias}.valor <= ?")
-            params.append(vmax)
-        except Exception:
-            pass
-
-    if mes:
-        where.append(f"strftime('%m', {alias}.data) = ?")
-        params.append(f"{int(mes):02d}")
-    if ano:
-        where.append(f"strftime('%Y', {alias}.data) = ?")
-        params.append(str(ano))
-
-    if conta_id:
-        try:
-            cid = int(conta_id)
-            where.append(f"{alias}.conta_id = ?")
-            params.append(cid)
-        except Exception:
-            pass
-
-    if categoria:
-        where.append(f"{alias}.categoria = ?")
-        params.append(categoria)
-
-    if status in ("pendente", "pago", "recebido"):
-        where.append("__STATUS_PLACEHOLDER__")
-
-    return where, params
-
-def search_pagar(descricao=None, data_ini=None, data_fim=None,
-                 valor_min=None, valor_max=None, mes=None, ano=None,
-                 conta_id=None, categoria=None, status=None):
-    """Retorna lista de dicionários de contas a PAGAR conforme filtros."""
-    con = conn(); cur = con.cursor()
-    where, params = _build_where_and_params("p", descricao, data_ini, data_fim,
-                                            valor_min, valor_max, mes, ano,
-                                            conta_id, categoria, status)
-
-    sql_where = " AND ".join(w.replace("__STATUS_PLACEHOLDER__", "p.pago=0" if status == "pendente" else "p.pago=1") for w in where)
-    if sql_where:
-        sql_where = "WHERE " + sql_where
-
-    sql = f"""
-        SELECT p.*, cf.nome AS conta_nome
-          FROM contas_a_pagar p
-          JOIN contas_financeiras cf ON cf.id = p.conta_id
-        {sql_where}
-        ORDER BY date(p.data) ASC, p.id ASC
-    """
-    cur.execute(sql, params)
-    rows = cur.fetchall()
-    out = []
-    for r in rows:
-        out.append({
-            "id": r["id"],
-            "tipo": "pagar",
-            "descricao": r["descricao"] or "",
-            "valor": float(r["valor"] or 0.0),
-            "vencimento": r["data"] or "",
-            "conta_id": r["conta_id"],
-            "conta_nome": r["conta_nome"] or "",
-            "categoria": r["categoria"] or "",
-            "pago": bool(r["pago"]),
-        })
-    con.close()
-    return out
-
-def search_receber(descricao=None, data_ini=None, data_fim=None,
-                   valor_min=None, valor_max=None, mes=None, ano=None,
-                   conta_id=None, categoria=None, status=None):
-    """Retorna lista de dicionários de contas a RECEBER conforme filtros."""
-    con = conn(); cur = con.cursor()
-    where, params = _build_where_and_params("r", descricao, data_ini, data_fim,
-                                            valor_min, valor_max, mes, ano,
-                                            conta_id, categoria, status)
-
-    sql_where = " AND ".join(w.replace("__STATUS_PLACEHOLDER__", "r.recebido=0" if status == "pendente" else "r.recebido=1") for w in where)
-    if sql_where:
-        sql_where = "WHERE " + sql_where
-
-    sql = f"""
-        SELECT r.*, cf.nome AS conta_nome
-          FROM contas_a_receber r
-          JOIN contas_financeiras cf ON cf.id = r.conta_id
-        {sql_where}
-        ORDER BY date(r.data) ASC, r.id ASC
-    """
-    cur.execute(sql, params)
-    rows = cur.fetchall()
-    out = []
-    for r in rows:
-        out.append({
-            "id": r["id"],
-            "tipo": "receber",
-            "descricao": r["descricao"] or "",
-            "valor": float(r["valor"] or 0.0),
-            "vencimento": r["data"] or "",
-            "conta_id": r["conta_id"],
-            "conta_nome": r["conta_nome"] or "",
-            "categoria": r["categoria"] or "",
-            "recebido": bool(r["recebido"]),
-        })
-    con.close()
-    return out
-
-def search_combined(tipo=None, descricao=None, data_ini=None, data_fim=None,
-                    valor_min=None, valor_max=None, mes=None, ano=None,
-                    conta_id=None, categoria=None, status=None):
-    """
-    Busca combinada. 'tipo': None/'todos' | 'pagar' | 'receber'
-    'status': None | 'pendente' | 'pago' | 'recebido'
-    """
-    tipo = (tipo or "todos").lower()
-    if tipo == "pagar":
-        return search_pagar(descricao, data_ini, data_fim, valor_min, valor_max, mes, ano, conta_id, categoria,
-                            status if status in (None, "pendente", "pago") else None)
-    if tipo == "receber":
-        return search_receber(descricao, data_ini, data_fim, valor_min, valor_max, mes, ano, conta_id, categoria,
-                              status if status in (None, "pendente", "recebido") else None)
-
-    pagar = search_pagar(descricao, data_ini, data_fim, valor_min, valor_max, mes, ano, conta_id, categoria,
-                         status if status in (None, "pendente", "pago") else None)
-    receber = search_receber(descricao, data_ini, data_fim, valor_min, valor_max, mes, ano, conta_id, categoria,
-                             status if status in (None, "pendente", "recebido") else None)
-
-    def keyfun(x):
-        return (x.get("vencimento",""), x.get("id", 0))
-    return sorted(pagar + receber, key=keyfun)
-
+# core/models.py — CRUD completo + buscas + helpers + status
+
+from datetime import datetime
+from .database import get_conn, transaction, fts_ativo
+from .entry_store import EntryStore, _centavos
+from .search_index import normalizar
+import base64
+import json
+import sqlite3
+
+# ----------------- Helpers -----------------
+# _centavos (reais -> centavos inteiros) vem de entry_store, que não depende
+# de models: um conversor só para o banco e para as listas em memória.
+
+def _parse_centavos(valor_str: str) -> int:
+    """'1.234,56' ou '1234.56' -> 123456. Lança exceção se não for número."""
+    if valor_str is None:
+        return 0
+    s = str(valor_str).strip().replace("R$", "").replace(" ", "")
+    if "," in s and "." in s:
+        s = s.replace(".", "").replace(",", ".")
+    else:
+        s = s.replace(",", ".")
+    return _centavos(s or "0")
+
+def _to_date_yyyy_mm_dd(s: str) -> str:
+    s = (s or "").strip()
+    if not s:
+        return ""
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%Y%m%d"):
+        try:
+            return datetime.strptime(s, fmt).strftime("%Y-%m-%d")
+        except Exception:
+            pass
+    return s  # mantém como veio para não quebrar
+
+_TIPOS = {
+    # tipo: (tabela, alias, coluna de status, índice FTS)
+    "pagar":   ("contas_a_pagar", "p", "pago", "fts_pagar"),
+    "receber": ("contas_a_receber", "r", "recebido", "fts_receber"),
+}
+
+def _entry_to_dict(r, tipo: str, coluna_status: str | None = None) -> dict:
+    """coluna_status: nome da coluna de status na linha, se não for pago/recebido."""
+    status_col = _TIPOS[tipo][2]
+    return {
+        "id": r["id"],
+        "tipo": tipo,
+        "descricao": r["descricao"] or "",
+        "valor": (r["valor_centavos"] or 0) / 100,
+        "vencimento": r["data"] or "",
+        "conta_id": r["conta_id"],
+        "conta_nome": r["conta_nome"] or "",
+        "categoria": r["categoria"] or "",
+        status_col: bool(r[coluna_status or status_col]),
+    }
+
+# ----------------- Leitura -----------------
+def load_all():
+    """Retorna (contas_a_pagar, contas_a_receber, contas_financeiras, categorias).
+    Cada tabela vem numa única consulta, já com o nome da conta via JOIN;
+    os lançamentos vêm em EntryStore (colunas), não em lista de dicts."""
+    return (load_entries("pagar"), load_entries("receber"),
+            list_financial_accounts(), list_categories())
+
+def load_entries(tipo: str) -> EntryStore:
+    """Lançamentos de um só tipo, no formato e na ordem do load_all
+       (usado para recarregar apenas a tabela que mudou)."""
+    tabela, alias, status_col, _ = _TIPOS[tipo]
+    cur = get_conn().cursor()
+    cur.execute(f"""
+        SELECT {alias}.id, {alias}.descricao, {alias}.valor_centavos, {alias}.data,
+               {alias}.conta_id, {alias}.categoria, {alias}.{status_col},
+               cf.nome AS conta_nome
+          FROM {tabela} {alias}
+          LEFT JOIN contas_financeiras cf ON cf.id = {alias}.conta_id
+         ORDER BY {alias}.data ASC, {alias}.id ASC
+    """)
+    return EntryStore.from_rows(tipo, cur)
+
+def list_financial_accounts() -> list:
+    cur = get_conn().cursor()
+    cur.execute("SELECT id, nome FROM contas_financeiras ORDER BY nome")
+    return [{"id": r["id"], "nome": r["nome"]} for r in cur.fetchall()]
+
+def list_categories() -> list:
+    cur = get_conn().cursor()
+    cur.execute("SELECT nome FROM categorias ORDER BY nome")
+    return [r["nome"] for r in cur.fetchall()]
+
+def get_entry(tipo: str, item_id: int) -> dict | None:
+    """Um lançamento no mesmo formato das buscas (ou None se não existir)."""
+    tabela, alias, _, _ = _TIPOS[tipo]
+    cur = get_conn().cursor()
+    cur.execute(f"""
+        SELECT {alias}.*, cf.nome AS conta_nome
+          FROM {tabela} {alias}
+          LEFT JOIN contas_financeiras cf ON cf.id = {alias}.conta_id
+         WHERE {alias}.id = ?
+    """, (int(item_id),))
+    r = cur.fetchone()
+    return _entry_to_dict(r, tipo) if r else None
+
+# ------------- Categorias CRUD -------------
+def add_category(name: str):
+    name = (name or "").strip()
+    if not name:
+        raise ValueError("Nome da categoria vazio.")
+    with transaction() as con:
+        con.execute("INSERT OR IGNORE INTO categorias (nome) VALUES (?)", (name,))
+
+def edit_category(old: str, new: str):
+    old = (old or "").strip(); new = (new or "").strip()
+    if not old or not new:
+        raise ValueError("Nomes inválidos.")
+    with transaction() as con:
+        con.execute("UPDATE categorias SET nome=? WHERE nome=?", (new, old))
+
+def delete_category(name: str):
+    name = (name or "").strip()
+    if not name:
+        raise ValueError("Nome inválido.")
+    with transaction() as con:
+        con.execute("DELETE FROM categorias WHERE nome=?", (name,))
+
+# ------- Contas Financeiras CRUD -------
+def add_financial_account(name: str):
+    name = (name or "").strip()
+    if not name:
+        return "O nome da conta não pode ser vazio."
+    try:
+        with transaction() as con:
+            con.execute("INSERT INTO contas_financeiras (nome) VALUES (?)", (name,))
+        return True
+    except sqlite3.IntegrityError:
+        return f"Conta financeira '{name}' já existe."
+
+def edit_financial_account(acc_id: int, new_name: str):
+    new_name = (new_name or "").strip()
+    if not new_name:
+        return "O nome da conta não pode ser vazio."
+    with transaction() as con:
+        cur = con.cursor()
+        cur.execute("SELECT id FROM contas_financeiras WHERE nome=? AND id<>?", (new_name, acc_id))
+        if cur.fetchone():
+            return f"Conta financeira '{new_name}' já existe."
+        cur.execute("UPDATE contas_financeiras SET nome=? WHERE id=?", (new_name, acc_id))
+    return True
+
+def account_has_entries(acc_id: int) -> bool:
+    cur = get_conn().cursor()
+    cur.execute("SELECT 1 FROM contas_a_pagar WHERE conta_id=? LIMIT 1", (acc_id,))
+    if cur.fetchone():
+        return True
+    cur.execute("SELECT 1 FROM contas_a_receber WHERE conta_id=? LIMIT 1", (acc_id,))
+    return bool(cur.fetchone())
+
+def delete_financial_account_by_id(acc_id: int):
+    with transaction() as con:
+        con.execute("DELETE FROM contas_financeiras WHERE id=?", (acc_id,))
+
+# --------- Pagar/Receber CRUD ----------
+def _resolve_conta_id(cur, conta_id, conta_nome) -> int | None:
+    if isinstance(conta_id, int):
+        return conta_id
+    try:
+        return int(conta_id)
+    except Exception:
+        pass
+    nome = (conta_nome or "").strip()
+    if nome:
+        cur.execute("SELECT id FROM contas_financeiras WHERE nome=?", (nome,))
+        r = cur.fetchone()
+        if r:
+            return r["id"]
+        cur.execute("INSERT INTO contas_financeiras (nome) VALUES (?)", (nome,))
+        return cur.lastrowid
+    cur.execute("SELECT id FROM contas_financeiras ORDER BY id LIMIT 1")
+    r = cur.fetchone()
+    if r:
+        return r["id"]
+    cur.execute("INSERT INTO contas_financeiras (nome) VALUES ('Conta Importada')")
+    return cur.lastrowid
+
+def add_entry(tipo: str, descricao: str, valor_str: str, data_str: str, conta_id, conta_nome: str, categoria: str):
+    """Retorna o lançamento criado (dict, como em get_entry) ou a mensagem de erro (str)."""
+    if tipo not in ("pagar", "receber"):
+        return "Tipo inválido."
+    descricao = (descricao or "").strip()
+    if not descricao:
+        return "Descrição não pode ser vazia."
+    try:
+        centavos = _parse_centavos(valor_str)
+    except Exception:
+        return "Valor inválido."
+    data = _to_date_yyyy_mm_dd(data_str)
+
+    with transaction() as con:
+        cur = con.cursor()
+        cid = _resolve_conta_id(cur, conta_id, conta_nome)
+        tabela = "contas_a_pagar" if tipo == "pagar" else "contas_a_receber"
+        status_col = "pago" if tipo == "pagar" else "recebido"
+        cur.execute(
+            f"INSERT INTO {tabela} (descricao, valor, valor_centavos, data, conta_id, categoria, {status_col}) "
+            "VALUES (?, ?, ?, ?, ?, ?, 0)",
+            (descricao, centavos / 100, centavos, data, int(cid), (categoria or "").strip())
+        )
+        novo_id = cur.lastrowid
+        if categoria:
+            cur.execute("INSERT OR IGNORE INTO categorias (nome) VALUES (?)", ((categoria or "").strip(),))
+        return get_entry(tipo, novo_id)
+
+def edit_entry(tipo: str, item_id: int, descricao: str, valor_str: str, data_str: str,
+               conta_id, conta_nome: str, categoria: str):
+    """Retorna o lançamento atualizado (dict), a mensagem de erro (str) ou None
+    se o registro não existe mais (excluído por outra instância)."""
+    if tipo not in ("pagar", "receber"):
+        return "Tipo inválido."
+    try:
+        centavos = _parse_centavos(valor_str)
+    except Exception:
+        return "Valor inválido."
+    data = _to_date_yyyy_mm_dd(data_str)
+
+    with transaction() as con:
+        cur = con.cursor()
+        cid = _resolve_conta_id(cur, conta_id, conta_nome)
+        tabela = "contas_a_pagar" if tipo == "pagar" else "contas_a_receber"
+        cur.execute(
+            f"UPDATE {tabela} SET descricao=?, valor=?, valor_centavos=?, data=?, conta_id=?, categoria=? WHERE id=?",
+            (descricao, centavos / 100, centavos, data, int(cid), (categoria or "").strip(), int(item_id))
+        )
+        if categoria:
+            cur.execute("INSERT OR IGNORE INTO categorias (nome) VALUES (?)", ((categoria or "").strip(),))
+        return get_entry(tipo, item_id)
+
+def delete_entry(tipo: str, item_id: int | None = None, descricao: str | None = None,
+                 valor: float | None = None, data_str: str | None = None, conta_id=None, conta_nome: str | None = None):
+    """Exclui por ID; se faltar ID, tenta localizar por (descricao, valor, data[, conta_id]).
+       Retorna o lançamento excluído (dict) ou a mensagem de erro (str)."""
+    if tipo not in ("pagar", "receber"):
+        return "Tipo inválido."
+    tabela = "contas_a_pagar" if tipo == "pagar" else "contas_a_receber"
+    with transaction() as con:
+        cur = con.cursor()
+        if item_id is not None:
+            antigo = get_entry(tipo, item_id) or {"id": int(item_id), "tipo": tipo}
+            cur.execute(f"DELETE FROM {tabela} WHERE id=?", (int(item_id),))
+            return antigo
+
+        if descricao is None or data_str is None or valor is None:
+            return "Registro sem ID e sem dados suficientes para excluir."
+        data = _to_date_yyyy_mm_dd(data_str)
+        centavos = _centavos(valor)
+
+        cid = None
+        try:
+            cid = int(conta_id) if conta_id is not None else None
+        except Exception:
+            cid = _resolve_conta_id(cur, conta_id, conta_nome)
+
+        if isinstance(cid, int):
+            cur.execute(
+                f"""SELECT id FROM {tabela}
+                    WHERE conta_id=? AND data=? AND valor_centavos=? AND descricao=?
+                    ORDER BY id DESC LIMIT 1""",
+                (cid, data, centavos, descricao)
+            )
+        else:
+            cur.execute(
+                f"""SELECT id FROM {tabela}
+                    WHERE data=? AND valor_centavos=? AND descricao=?
+                    ORDER BY id DESC LIMIT 1""",
+                (data, centavos, descricao)
+            )
+
+        row = cur.fetchone()
+        if not row:
+            return "Registro sem ID. Não foi possível localizar no banco para excluir."
+
+        db_id = row["id"]
+        antigo = get_entry(tipo, db_id)
+        cur.execute(f"DELETE FROM {tabela} WHERE id=?", (int(db_id),))
+        return antigo
+
+# ------------- Status (Pago/Recebido) -------------
+# Retornam o lançamento já atualizado (dict), para a GUI atualizar só essa linha.
+def set_paid(item_id: int, paid: bool) -> dict | None:
+    with transaction() as con:
+        con.execute("UPDATE contas_a_pagar SET pago=? WHERE id=?", (1 if paid else 0, int(item_id)))
+        return get_entry("pagar", item_id)
+
+def set_received(item_id: int, received: bool) -> dict | None:
+    with transaction() as con:
+        con.execute("UPDATE contas_a_receber SET recebido=? WHERE id=?", (1 if received else 0, int(item_id)))
+        return get_entry("receber", item_id)
+
+# ================= BUSCAS FLEXÍVEIS =================
+def _intervalo_periodo(ano: int, mes: int | None = None) -> tuple[str, str]:
+    """Intervalo semiaberto [ini, fim) em AAAA-MM-DD para um mês ou ano inteiro."""
+    if mes is None:
+        return f"{ano:04d}-01-01", f"{ano + 1:04d}-01-01"
+    prox_ano, prox_mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+    return f"{ano:04d}-{mes:02d}-01", f"{prox_ano:04d}-{prox_mes:02d}-01"
+
+def _fts_query(texto: str) -> str:
+    """'agua de' -> '"agua de"': no índice trigram uma frase casa como
+       substring do texto todo, igual aos filtros da GUI. Menos de 3
+       caracteres não formam trigrama: devolve '' (a busca vai para o LIKE)."""
+    texto = (texto or "").strip()
+    if len(texto) < 3:
+        return ""
+    return '"' + texto.replace('"', '""') + '"'
+
+def _like_contendo(texto: str) -> str:
+    """Padrão LIKE (com ESCAPE '\\') de substring, sem curingas no texto do usuário."""
+    texto = texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{texto}%"
+
+def _build_where_and_params(alias: str, descricao=None, data_ini=None, data_fim=None,
+                            valor_min=None, valor_max=None, mes=None, ano=None,
+                            conta_id=None, categoria=None, status=None, fts_tabela=None):
+    where = []
+    params = []
+
+    if descricao:
+        consulta = _fts_query(descricao) if (fts_tabela and fts_ativo()) else ""
+        if consulta:
+            where.append(f"{alias}.id IN (SELECT rowid FROM {fts_tabela} WHERE {fts_tabela} MATCH ?)")
+            params.append(consulta)
+        else:
+            # sem índice (ou texto curto): substring sem acento/caixa, como a GUI
+            where.append(f"sem_acento({alias}.descricao) LIKE ? ESCAPE '\\'")
+            params.append(_like_contendo(normalizar(descricao.strip())))
+
+    # 'data' é gravada como AAAA-MM-DD: comparar o texto direto mantém o
+    # predicado indexável (sem date()/strftime() em volta da coluna).
+    if data_ini:
+        where.append(f"{alias}.data >= ?")
+        params.append(_to_date_yyyy_mm_dd(data_ini))
+    if data_fim:
+        where.append(f"{alias}.data <= ?")
+        params.append(_to_date_yyyy_mm_dd(data_fim))
+
+    if valor_min is not None and str(valor_min) != "":
+        try:
+            vmin = _parse_centavos(valor_min)
+            where.append(f"{alias}.valor_centavos >= ?")
+            params.append(vmin)
+        except Exception:
+            pass
+    if valor_max is not None and str(valor_max) != "":
+        try:
+            vmax = _parse_centavos(valor_max)
+            where.append(f"{alias}.valor_centavos <= ?")
+            params.append(vmax)
+        except Exception:
+            pass
+
+    if ano:
+        ini, fim = _intervalo_periodo(int(ano), int(mes) if mes else None)
+        where.append(f"{alias}.data >= ? AND {alias}.data < ?")
+        params.extend([ini, fim])
+    elif mes:
+        # mês sem ano não forma um intervalo contínuo
+        where.append(f"substr({alias}.data, 6, 2) = ?")
+        params.append(f"{int(mes):02d}")
+
+    if conta_id:
+        try:
+            cid = int(conta_id)
+            where.append(f"{alias}.conta_id = ?")
+            params.append(cid)
+        except Exception:
+            pass
+
+    if categoria:
+        where.append(f"{alias}.categoria = ?")
+        params.append(categoria)
+
+    if status in ("pendente", "pago", "recebido"):
+        where.append("__STATUS_PLACEHOLDER__")
+
+    return where, params
+
+def _where_tipo(tipo: str, descricao=None, data_ini=None, data_fim=None,
+                valor_min=None, valor_max=None, mes=None, ano=None,
+                conta_id=None, categoria=None, status=None) -> tuple[list, list]:
+    """Condições (com o status já resolvido) e parâmetros dos filtros de um tipo."""
+    _, alias, status_col, fts = _TIPOS[tipo]
+    where, params = _build_where_and_params(alias, descricao, data_ini, data_fim,
+                                            valor_min, valor_max, mes, ano,
+                                            conta_id, categoria, status, fts)
+    cond_status = f"{alias}.{status_col}=0" if status == "pendente" else f"{alias}.{status_col}=1"
+    return [w.replace("__STATUS_PLACEHOLDER__", cond_status) for w in where], params
+
+def iter_entries(tipo: str, descricao=None, data_ini=None, data_fim=None,
+                 valor_min=None, valor_max=None, mes=None, ano=None,
+                 conta_id=None, categoria=None, status=None):
+    """Gera os lançamentos de 'pagar' ou 'receber' conforme filtros, lendo do
+       cursor linha a linha (nada é acumulado em memória)."""
+    tabela, alias, _, _ = _TIPOS[tipo]
+    where, params = _where_tipo(tipo, descricao, data_ini, data_fim, valor_min, valor_max,
+                                mes, ano, conta_id, categoria, status)
+    sql_where = " AND ".join(where)
+    if sql_where:
+        sql_where = "WHERE " + sql_where
+
+    sql = f"""
+        SELECT {alias}.*, cf.nome AS conta_nome
+          FROM {tabela} {alias}
+          JOIN contas_financeiras cf ON cf.id = {alias}.conta_id
+        {sql_where}
+        ORDER BY {alias}.data ASC, {alias}.id ASC
+    """
+    cur = get_conn().cursor()
+    cur.execute(sql, params)
+    for r in cur:
+        yield _entry_to_dict(r, tipo)
+
+def search_pagar(descricao=None, data_ini=None, data_fim=None,
+                 valor_min=None, valor_max=None, mes=None, ano=None,
+                 conta_id=None, categoria=None, status=None):
+    """Retorna as contas a PAGAR conforme filtros (EntryStore; linhas se leem como dicts)."""
+    return EntryStore("pagar", iter_entries("pagar", descricao, data_ini, data_fim, valor_min, valor_max,
+                                            mes, ano, conta_id, categoria, status), com_tipo=True)
+
+def search_receber(descricao=None, data_ini=None, data_fim=None,
+                   valor_min=None, valor_max=None, mes=None, ano=None,
+                   conta_id=None, categoria=None, status=None):
+    """Retorna as contas a RECEBER conforme filtros (EntryStore; linhas se leem como dicts)."""
+    return EntryStore("receber", iter_entries("receber", descricao, data_ini, data_fim, valor_min, valor_max,
+                                              mes, ano, conta_id, categoria, status), com_tipo=True)
+
+def _status_do_tipo(tipo: str, status):
+    """'pago' só filtra Pagar e 'recebido' só filtra Receber."""
+    return status if status in (None, "pendente", _TIPOS[tipo][2]) else None
+
+def _sql_combinado(filtros: dict, apos: tuple | None = None, limite: int | None = None):
+    """Uma consulta UNION ALL (Pagar + Receber) ordenada por (data, tipo, id).
+
+    apos: chave (data, tipo, id) da última linha já entregue; só vêm as seguintes.
+    Cada ramo filtra e ordena pelo próprio índice (data, id) e, com limite,
+    para após `limite` linhas — a página custa o mesmo com 1 mil ou 1 milhão
+    de lançamentos."""
+    ramos, params = [], []
+    for tipo, (tabela, alias, status_col, _) in _TIPOS.items():
+        where, p = _where_tipo(tipo, **{**filtros, "status": _status_do_tipo(tipo, filtros.get("status"))})
+        if apos is not None:
+            data, tipo_apos, item_id = apos
+            if tipo == tipo_apos:
+                where.append(f"({alias}.data, {alias}.id) > (?, ?)")
+                p += [data, item_id]
+            else:
+                # mesma data: os de tipo "maior" ainda não foram entregues
+                where.append(f"{alias}.data {'>=' if tipo > tipo_apos else '>'} ?")
+                p.append(data)
+        sql_where = ("WHERE " + " AND ".join(where)) if where else ""
+        ramos.append(f"""
+            SELECT * FROM (
+                SELECT {alias}.id, '{tipo}' AS tipo, {alias}.descricao, {alias}.valor_centavos,
+                       {alias}.data, {alias}.conta_id, {alias}.categoria,
+                       {alias}.{status_col} AS status, cf.nome AS conta_nome
+                  FROM {tabela} {alias}
+                  JOIN contas_financeiras cf ON cf.id = {alias}.conta_id
+                {sql_where}
+                 ORDER BY {alias}.data ASC, {alias}.id ASC
+                {"LIMIT ?" if limite is not None else ""}
+            )""")
+        params += p + ([limite] if limite is not None else [])
+    sql = " UNION ALL ".join(ramos) + " ORDER BY data ASC, tipo ASC, id ASC"
+    if limite is not None:
+        sql += " LIMIT ?"
+        params.append(limite)
+    return sql, params
+
+def _codificar_token(chave: tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(chave).encode("utf-8")).decode("ascii")
+
+def _decodificar_token(token: str) -> tuple:
+    try:
+        data, tipo, item_id = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        if not isinstance(data, str) or tipo not in _TIPOS or not isinstance(item_id, int):
+            raise ValueError
+        return data, tipo, item_id
+    except Exception:
+        raise ValueError("Token de continuação inválido.") from None
+
+def search_combined(tipo=None, descricao=None, data_ini=None, data_fim=None,
+                    valor_min=None, valor_max=None, mes=None, ano=None,
+                    conta_id=None, categoria=None, status=None):
+    """
+    Busca combinada. 'tipo': None/'todos' | 'pagar' | 'receber'
+    'status': None | 'pendente' | 'pago' | 'recebido'
+    Com 'todos', a ordem é (data, tipo, id), feita pelo SQLite numa única consulta.
+    Para listas grandes, prefira search_page.
+    """
+    tipo = (tipo or "todos").lower()
+    if tipo == "pagar":
+        return search_pagar(descricao, data_ini, data_fim, valor_min, valor_max, mes, ano, conta_id, categoria,
+                            _status_do_tipo("pagar", status))
+    if tipo == "receber":
+        return search_receber(descricao, data_ini, data_fim, valor_min, valor_max, mes, ano, conta_id, categoria,
+                              _status_do_tipo("receber", status))
+
+    filtros = dict(descricao=descricao, data_ini=data_ini, data_fim=data_fim, valor_min=valor_min,
+                   valor_max=valor_max, mes=mes, ano=ano, conta_id=conta_id, categoria=categoria,
+                   status=status)
+    cur = get_conn().cursor()
+    cur.execute(*_sql_combinado(filtros))
+    return [_entry_to_dict(r, r["tipo"], "status") for r in cur]
+
+def search_page(limite: int = 50, token: str | None = None, descricao=None, data_ini=None,
+                data_fim=None, valor_min=None, valor_max=None, mes=None, ano=None,
+                conta_id=None, categoria=None, status=None) -> tuple[list, str | None]:
+    """
+    Uma página da busca combinada (Pagar + Receber), na ordem (data, tipo, id).
+    Retorna (itens, token): passe o token na chamada seguinte para obter a
+    próxima página; token None indica que não há mais itens. O token é opaco
+    e só vale para os mesmos filtros. Lança ValueError se o token for inválido.
+    """
+    limite = max(1, int(limite))
+    apos = _decodificar_token(token) if token else None
+    filtros = dict(descricao=descricao, data_ini=data_ini, data_fim=data_fim, valor_min=valor_min,
+                   valor_max=valor_max, mes=mes, ano=ano, conta_id=conta_id, categoria=categoria,
+                   status=status)
+    cur = get_conn().cursor()
+    cur.execute(*_sql_combinado(filtros, apos, limite + 1))
+    itens = [_entry_to_dict(r, r["tipo"], "status") for r in cur]
+    if len(itens) <= limite:
+        return itens, None
+    del itens[limite:]
+    ult = itens[-1]
+    return itens, _codificar_token([ult["vencimento"], ult["tipo"], ult["id"]])
+
+# ================= AGREGAÇÕES =================
+# COUNT/SUM feitos pelo SQLite (sobre valor_centavos, inteiro): nada de trazer
+# as linhas para somar em Python. Quando os filtros são só de período, conta,
+# categoria e status, a soma sai do resumo_mensal (mantido por triggers, ver
+# database._sync_resumo) em vez de varrer os lançamentos.
+_AGRUPAMENTOS = ("mes", "categoria", "conta", "status")
+
+def _fonte_lancamentos(tipo: str, filtros: dict):
+    """(FROM, condições, parâmetros, expressões de grupo, COUNT, SUM) sobre a tabela do tipo."""
+    tabela, alias, status_col, _ = _TIPOS[tipo]
+    where, params = _where_tipo(tipo, **filtros)
+    expressoes = {
+        "mes": f"substr({alias}.data, 1, 7)",
+        "categoria": f"COALESCE({alias}.categoria, '')",
+        "conta": f"{alias}.conta_id",
+        "status": f"{alias}.{status_col}",
+    }
+    return (f"{tabela} {alias}", alias, where, params, expressoes,
+            "COUNT(*)", f"COALESCE(SUM({alias}.valor_centavos), 0)")
+
+def _fonte_resumo(tipo: str, filtros: dict):
+    """Mesmo formato de _fonte_lancamentos, lendo de resumo_mensal."""
+    where, params = ["rm.tipo = ?"], [tipo]
+    ano, mes = filtros.get("ano"), filtros.get("mes")
+    if ano:
+        where.append("rm.ano = ?"); params.append(int(ano))
+    if mes:
+        where.append("rm.mes = ?"); params.append(int(mes))
+    if filtros.get("conta_id"):
+        try:
+            params.append(int(filtros["conta_id"]))
+            where.append("rm.conta_id = ?")
+        except Exception:
+            pass
+    if filtros.get("categoria"):
+        where.append("rm.categoria = ?"); params.append(filtros["categoria"])
+    status = filtros.get("status")
+    if status == "pendente":
+        where.append("rm.status = 0")
+    elif status in ("pago", "recebido"):
+        where.append("rm.status = 1")
+    expressoes = {
+        "mes": "CASE WHEN rm.ano = 0 THEN '' ELSE printf('%04d-%02d', rm.ano, rm.mes) END",
+        "categoria": "rm.categoria",
+        "conta": "rm.conta_id",
+        "status": "rm.status",
+    }
+    return ("resumo_mensal rm", "rm", where, params, expressoes,
+            "COALESCE(SUM(rm.qtd), 0)", "COALESCE(SUM(rm.centavos), 0)")
+
+def aggregate(tipo=None, por=(), descricao=None, data_ini=None, data_fim=None,
+              valor_min=None, valor_max=None, mes=None, ano=None,
+              conta_id=None, categoria=None, status=None) -> list[dict]:
+    """
+    Quantidade e soma dos lançamentos que atendem aos filtros (os mesmos de
+    search_pagar/search_receber), agrupados por qualquer combinação de
+    'mes' (AAAA-MM), 'categoria', 'conta' e 'status' ('pendente'/'pago'/'recebido').
+    'tipo': 'pagar' | 'receber' | None/'todos' (um grupo por tipo).
+    Retorna uma lista de dicts ordenada por tipo e pelas chaves pedidas, ex.:
+      aggregate("pagar", por=("categoria",), ano=2024)
+      -> [{'tipo': 'pagar', 'categoria': 'Casa', 'qtd': 12, 'valor_centavos': 150000, 'valor': 1500.0}, ...]
+    Sem 'por', uma única linha com o total (qtd 0 se nada casar).
+    """
+    por = tuple(por or ())
+    invalidos = [p for p in por if p not in _AGRUPAMENTOS]
+    if invalidos:
+        raise ValueError(f"Agrupamento inválido: {', '.join(invalidos)}")
+    tipo = (tipo or "todos").lower()
+    tipos = list(_TIPOS) if tipo == "todos" else [tipo]
+    # descrição, datas soltas e faixa de valor só a tabela de lançamentos responde
+    so_resumo = not (descricao or data_ini or data_fim
+                     or (valor_min is not None and str(valor_min) != "")
+                     or (valor_max is not None and str(valor_max) != ""))
+
+    cur = get_conn().cursor()
+    saida = []
+    for t in tipos:
+        status_col = _TIPOS[t][2]
+        filtros = dict(descricao=descricao, data_ini=data_ini, data_fim=data_fim, valor_min=valor_min,
+                       valor_max=valor_max, mes=mes, ano=ano, conta_id=conta_id, categoria=categoria,
+                       status=_status_do_tipo(t, status))
+        fonte, alias, where, params, expressoes, qtd, soma = (
+            (_fonte_resumo if so_resumo else _fonte_lancamentos)(t, filtros))
+        colunas = [f"{expressoes[p]} AS {p}" for p in por]
+        juncao = ""
+        if "conta" in por:
+            colunas.append("COALESCE(cf.nome, '') AS conta_nome")
+            juncao = f"LEFT JOIN contas_financeiras cf ON cf.id = {alias}.conta_id"
+        sql = f"""
+            SELECT {", ".join(colunas + [f"{qtd} AS qtd", f"{soma} AS centavos"])}
+              FROM {fonte}
+              {juncao}
+            {("WHERE " + " AND ".join(where)) if where else ""}
+        """
+        if por:
+            grupos = ", ".join(expressoes[p] for p in por)
+            sql += f" GROUP BY {grupos} ORDER BY {grupos}"
+        cur.execute(sql, params)
+        for r in cur:
+            item = {"tipo": t}
+            for p in por:
+                item[p] = (status_col if r[p] else "pendente") if p == "status" else r[p]
+            if "conta" in por:
+                item["conta_nome"] = r["conta_nome"]
+            item["qtd"] = r["qtd"]
+            item["valor_centavos"] = r["centavos"]
+            item["valor"] = r["centavos"] / 100
+            saida.append(item)
+    return saida
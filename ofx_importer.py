@@ -1,155 +1,384 @@
-# core/ofx_importer.py — parser de OFX com dedupe via FITID/fingerprint
-
-import os
-import re
-import hashlib
-from datetime import datetime
-from .database import conn
-from .models import _to_date_yyyy_mm_dd, _resolve_conta_id
-
-OFX_BLOCK = re.compile(r"<STMTTRN>(.*?)</STMTTRN>", re.DOTALL | re.IGNORECASE)
-TAG_TRNAMT = re.compile(r"<TRNAMT>([-+]?\d+[.,]?\d*)", re.IGNORECASE)
-TAG_DTPOSTED = re.compile(r"<DTPOSTED>(\d{8})", re.IGNORECASE)
-TAG_MEMO = re.compile(r"<MEMO>(.*?)\s*(?:<|$)", re.IGNORECASE | re.DOTALL)
-TAG_FITID = re.compile(r"<FITID>(.*?)\s*(?:<|$)", re.IGNORECASE | re.DOTALL)
-
-def _ofx_to_date(dt: str) -> str:
-    try:
-        return datetime.strptime(dt[:8], "%Y%m%d").strftime("%Y-%m-%d")
-    except Exception:
-        return dt
-
-def _normalize_text(s: str) -> str:
-    return " ".join((s or "").strip().lower().split())
-
-def _make_fingerprint(descricao: str, valor: float, data: str) -> str:
-    base = f"{_normalize_text(descricao)}|{valor:.6f}|{data}"
-    return hashlib.sha1(base.encode("utf-8")).hexdigest()  # 40 chars
-
-def process_ofx(path: str, conta_id, conta_nome: str):
-    """Lê OFX e retorna (transacoes, erro). Cada transação traz 'fitid' (do arquivo ou fingerprint)."""
-    if not os.path.exists(path):
-        return [], f"Arquivo não encontrado: {path}"
-    try:
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            content = f.read()
-    except Exception as e:
-        return [], f"Erro ao ler OFX: {e}"
-
-    trans = []
-    for m in OFX_BLOCK.finditer(content):
-        block = m.group(1)
-
-        amt_m = TAG_TRNAMT.search(block)
-        if not amt_m:
-            continue
-        valor_raw = amt_m.group(1).strip().replace(",", ".")
-        try:
-            valor = float(valor_raw)
-        except Exception:
-            continue
-
-        dt_m = TAG_DTPOSTED.search(block)
-        data = _ofx_to_date(dt_m.group(1)) if dt_m else ""
-
-        memo_m = TAG_MEMO.search(block)
-        descricao = (memo_m.group(1).strip() if memo_m else "Transação")
-
-        fit_m = TAG_FITID.search(block)
-        fitid = (fit_m.group(1).strip() if fit_m else None)
-
-        tipo = "receber" if valor > 0 else "pagar"
-
-        # Se não houver FITID no arquivo, cria fingerprint estável
-        if not fitid:
-            fitid = _make_fingerprint(descricao, abs(valor), data)
-
-        trans.append({
-            "tipo": tipo,
-            "descricao": descricao,
-            "valor": abs(valor),
-            "data": data,
-            "conta_id": conta_id,
-            "conta_nome": conta_nome,
-            "categoria": "",
-            "fitid": fitid,
-        })
-    return trans, None
-
-def add_imported_transactions(transacoes: list) -> int:
-    """Insere OFX no banco com dedupe:
-       - Se vier fitid: UNIQUE(conta_id, fitid) bloqueia duplicatas.
-       - Se não vier fitid, usamos fingerprint calculado.
-       Retorna quantidade adicionada."""
-    con = conn(); cur = con.cursor()
-    adicionadas = 0
-    try:
-        for t in transacoes:
-            tipo = t.get("tipo")
-            descricao = t.get("descricao", "")
-            valor = float(t.get("valor", 0.0))
-            data = _to_date_yyyy_mm_dd(t.get("data", ""))
-            cid = _resolve_conta_id(cur, t.get("conta_id"), t.get("conta_nome"))
-            categoria = (t.get("categoria") or "").strip()
-            fitid = (t.get("fitid") or "").strip() or None
-
-            if tipo == "pagar":
-                if fitid:
-                    cur.execute("""
-                        SELECT id FROM contas_a_pagar
-                        WHERE conta_id=? AND fitid=?
-                        LIMIT 1
-                    """, (cid, fitid))
-                    if cur.fetchone():
-                        continue
-                else:
-                    cur.execute("""
-                        SELECT id FROM contas_a_pagar
-                        WHERE descricao=? AND ABS(valor-?)<1e-6 AND data=? AND conta_id=?
-                        LIMIT 1
-                    """, (descricao, valor, data, cid))
-                    if cur.fetchone():
-                        continue
-
-                cur.execute("""
-                    INSERT INTO contas_a_pagar (descricao, valor, data, conta_id, categoria, pago, fitid)
-                    VALUES (?, ?, ?, ?, ?, 0, ?)
-                """, (descricao, valor, data, cid, categoria, fitid))
-                con.commit()
-                adicionadas += 1
-
-            else:  # receber
-                if fitid:
-                    cur.execute("""
-                        SELECT id FROM contas_a_receber
-                        WHERE conta_id=? AND fitid=?
-                        LIMIT 1
-                    """, (cid, fitid))
-                    if cur.fetchone():
-                        continue
-                else:
-                    cur.execute("""
-                        SELECT id FROM contas_a_receber
-                        WHERE descricao=? AND ABS(valor-?)<1e-6 AND data=? AND conta_id=?
-                        LIMIT 1
-                    """, (descricao, valor, data, cid))
-                    if cur.fetchone():
-                        continue
-
-                cur.execute("""
-                    INSERT INTO contas_a_receber (descricao, valor, data, conta_id, categoria, recebido, fitid)
-                    VALUES (?, ?, ?, ?, ?, 0, ?)
-                """, (descricao, valor, data, cid, categoria, fitid))
-                con.commit()
-                adicionadas += 1
-
-            if categoria:
-                try:
-                    cur.execute("INSERT INTO categorias (nome) VALUES (?)", (categoria,))
-                    con.commit()
-                except Exception:
-                    pass
-    finally:
-        con.close()
-
-    return adicionadas
+# core/ofx_importer.py — parser de OFX com dedupe via FITID/fingerprint
+
+import os
+import re
+import hashlib
+import pickle
+import tempfile
+from datetime import datetime
+from .database import Cancelado, storage_profile, transaction
+from .models import _to_date_yyyy_mm_dd, _resolve_conta_id, _centavos
+
+TAG_TRNAMT = re.compile(r"<TRNAMT>([-+]?\d+[.,]?\d*)", re.IGNORECASE)
+TAG_DTPOSTED = re.compile(r"<DTPOSTED>(\d{8})", re.IGNORECASE)
+TAG_MEMO = re.compile(r"<MEMO>(.*?)\s*(?:<|$)", re.IGNORECASE | re.DOTALL)
+TAG_FITID = re.compile(r"<FITID>(.*?)\s*(?:<|$)", re.IGNORECASE | re.DOTALL)
+
+def _ofx_to_date(dt: str) -> str:
+    try:
+        return datetime.strptime(dt[:8], "%Y%m%d").strftime("%Y-%m-%d")
+    except Exception:
+        return dt
+
+def _normalize_text(s: str) -> str:
+    return " ".join((s or "").strip().lower().split())
+
+def _make_fingerprint(descricao: str, valor: float, data: str) -> str:
+    base = f"{_normalize_text(descricao)}|{valor:.6f}|{data}"
+    return hashlib.sha1(base.encode("utf-8")).hexdigest()  # 40 chars
+
+def _parse_bloco(block: str, conta_id, conta_nome: str) -> dict | None:
+    """Converte o conteúdo de um <STMTTRN> em transação (None se não tiver valor)."""
+    amt_m = TAG_TRNAMT.search(block)
+    if not amt_m:
+        return None
+    valor_raw = amt_m.group(1).strip().replace(",", ".")
+    try:
+        valor = float(valor_raw)
+    except Exception:
+        return None
+
+    dt_m = TAG_DTPOSTED.search(block)
+    data = _ofx_to_date(dt_m.group(1)) if dt_m else ""
+
+    memo_m = TAG_MEMO.search(block)
+    descricao = (memo_m.group(1).strip() if memo_m else "Transação")
+
+    fit_m = TAG_FITID.search(block)
+    fitid = (fit_m.group(1).strip() if fit_m else None)
+
+    tipo = "receber" if valor > 0 else "pagar"
+
+    # Se não houver FITID no arquivo, cria fingerprint estável
+    if not fitid:
+        fitid = _make_fingerprint(descricao, abs(valor), data)
+
+    return {
+        "tipo": tipo,
+        "descricao": descricao,
+        "valor": abs(valor),
+        "data": data,
+        "conta_id": conta_id,
+        "conta_nome": conta_nome,
+        "categoria": "",
+        "fitid": fitid,
+    }
+
+# ----------------- Leitura em streaming -----------------
+_CHUNK = 64 * 1024             # bytes lidos por vez
+_MAX_BLOCO = 1024 * 1024       # um <STMTTRN> maior que isso é lixo: descartado
+STMTTRN_INI = re.compile(r"<STMTTRN>", re.IGNORECASE)
+# Fim do bloco: tag de fechamento (XML) ou, em SGML sem fechamento, o
+# próximo <STMTTRN> / o fim da lista de transações.
+STMTTRN_FIM = re.compile(r"</STMTTRN>|<STMTTRN>|</BANKTRANLIST>|</CCSTMTRS>|</STMTRS>", re.IGNORECASE)
+
+def _iter_blocos(f):
+    """Gera o conteúdo de cada <STMTTRN> lendo o arquivo em pedaços.
+       Só o pedaço corrente (e um bloco incompleto) fica em memória."""
+    buf = ""
+    dentro = False
+    fim_arquivo = False
+    while not fim_arquivo:
+        chunk = f.read(_CHUNK)
+        fim_arquivo = not chunk
+        buf += chunk
+        pos = 0
+        while True:
+            if not dentro:
+                m = STMTTRN_INI.search(buf, pos)
+                if not m:
+                    # guarda só o suficiente para uma tag partida entre pedaços
+                    pos = max(pos, len(buf) - (len("<STMTTRN>") - 1))
+                    break
+                pos = m.end()
+                dentro = True
+            m = STMTTRN_FIM.search(buf, pos)
+            if not m:
+                if fim_arquivo and buf[pos:].strip():
+                    yield buf[pos:]
+                elif len(buf) - pos > _MAX_BLOCO:
+                    pos, dentro = len(buf), False
+                break
+            yield buf[pos:m.start()]
+            # um <STMTTRN> aberto encerra o anterior e já inicia o próximo
+            dentro = m.group(0).upper() == "<STMTTRN>"
+            pos = m.end()
+        buf = buf[pos:]
+
+def iter_ofx(path: str, conta_id, conta_nome: str):
+    """Gera as transações do OFX (SGML ou XML) à medida que cada bloco termina.
+       Lança OSError se o arquivo não puder ser lido."""
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for block in _iter_blocos(f):
+            t = _parse_bloco(block, conta_id, conta_nome)
+            if t is not None:
+                yield t
+
+def process_ofx(path: str, conta_id, conta_nome: str):
+    """Lê OFX e retorna (transacoes, erro). Cada transação traz 'fitid' (do arquivo ou fingerprint).
+       Para arquivos grandes prefira import_ofx(), que não monta a lista inteira."""
+    if not os.path.exists(path):
+        return [], f"Arquivo não encontrado: {path}"
+    try:
+        return list(iter_ofx(path, conta_id, conta_nome)), None
+    except Exception as e:
+        return [], f"Erro ao ler OFX: {e}"
+
+_LOTE = 5000  # linhas por executemany
+_AVISO = 1000  # a cada quantas transações lidas avisa o progresso / verifica cancelamento
+
+_TABELAS = {
+    "pagar":   ("contas_a_pagar", "pago"),
+    "receber": ("contas_a_receber", "recebido"),
+}
+
+class _Dedupe:
+    """Chaves já presentes no banco, carregadas uma vez por (tabela, conta).
+       Também barra repetições dentro do próprio arquivo."""
+    def __init__(self, cur):
+        self.cur = cur
+        self.fitids = {}      # (tabela, conta_id) -> {fitid}
+        self.sem_fitid = {}   # (tabela, conta_id) -> {(descricao, valor_centavos, data)}
+
+    def _carregar_fitids(self, tabela, cid):
+        chave = (tabela, cid)
+        if chave not in self.fitids:
+            self.cur.execute(f"SELECT fitid FROM {tabela} WHERE conta_id=? AND fitid IS NOT NULL", (cid,))
+            self.fitids[chave] = {r[0] for r in self.cur.fetchall()}
+        return self.fitids[chave]
+
+    def _carregar_sem_fitid(self, tabela, cid):
+        chave = (tabela, cid)
+        if chave not in self.sem_fitid:
+            self.cur.execute(f"SELECT descricao, valor_centavos, data FROM {tabela} WHERE conta_id=?", (cid,))
+            self.sem_fitid[chave] = {(r[0], r[1] or 0, r[2]) for r in self.cur.fetchall()}
+        return self.sem_fitid[chave]
+
+    def novo(self, tabela, cid, fitid, descricao, centavos, data) -> bool:
+        """True se a transação ainda não existe (e a registra como vista)."""
+        if fitid:
+            vistos, chave = self._carregar_fitids(tabela, cid), fitid
+        else:
+            vistos, chave = self._carregar_sem_fitid(tabela, cid), (descricao, centavos, data)
+        if chave in vistos:
+            return False
+        vistos.add(chave)
+        return True
+
+def _inserir_lote(cur, tipo: str, linhas: list) -> int:
+    tabela, status_col = _TABELAS[tipo]
+    cur.executemany(f"""
+        INSERT INTO {tabela} (descricao, valor, valor_centavos, data, conta_id, categoria, {status_col}, fitid)
+        VALUES (?, ?, ?, ?, ?, ?, 0, ?)
+        ON CONFLICT DO NOTHING
+    """, linhas)
+    inseridas = cur.rowcount
+    linhas.clear()
+    return inseridas
+
+def _aviso(progresso, cancelado, total=None):
+    """Junta os callbacks opcionais num aviso(lidas) para _ingerir, ou None.
+       progresso(feito, total, texto) recebe total=None (quantidade desconhecida)
+       ou o total de arquivos do lote; cancelado() True lança Cancelado."""
+    if progresso is None and cancelado is None:
+        return None
+    def aviso(lidas):
+        if cancelado is not None and cancelado():
+            raise Cancelado()
+        if progresso is not None and total is None:
+            progresso(lidas, None, f"{lidas} transações lidas")
+    return aviso
+
+def _ingerir(con, transacoes, aviso=None) -> tuple[int, int]:
+    """Grava as transações na conexão dada (sem commit). Retorna (lidas, inseridas).
+       aviso(lidas), se dado, é chamado a cada _AVISO transações (ver _aviso)."""
+    cur = con.cursor()
+    contas = {}                                   # (conta_id, conta_nome) -> id resolvido
+    dedupe = _Dedupe(cur)
+    lotes = {"pagar": [], "receber": []}
+    categorias = set()
+    lidas = inseridas = 0
+
+    for t in transacoes:
+        lidas += 1
+        if aviso is not None and lidas % _AVISO == 0:
+            aviso(lidas)
+        tipo = "pagar" if t.get("tipo") == "pagar" else "receber"
+        descricao = t.get("descricao", "")
+        centavos = _centavos(t.get("valor", 0.0))
+        data = _to_date_yyyy_mm_dd(t.get("data", ""))
+        chave_conta = (t.get("conta_id"), t.get("conta_nome"))
+        cid = contas.get(chave_conta)
+        if cid is None:
+            cid = contas[chave_conta] = _resolve_conta_id(cur, *chave_conta)
+        categoria = (t.get("categoria") or "").strip()
+        fitid = (t.get("fitid") or "").strip() or None
+
+        if not dedupe.novo(_TABELAS[tipo][0], cid, fitid, descricao, centavos, data):
+            continue
+        lote = lotes[tipo]
+        lote.append((descricao, centavos / 100, centavos, data, cid, categoria, fitid))
+        if categoria:
+            categorias.add(categoria)
+        if len(lote) >= _LOTE:
+            inseridas += _inserir_lote(cur, tipo, lote)
+
+    for tipo, lote in lotes.items():
+        if lote:
+            inseridas += _inserir_lote(cur, tipo, lote)
+    if categorias:
+        cur.executemany("INSERT OR IGNORE INTO categorias (nome) VALUES (?)", [(c,) for c in categorias])
+    return lidas, inseridas
+
+def add_imported_transactions(transacoes: list) -> int:
+    """Insere OFX no banco com dedupe:
+       - Se vier fitid: UNIQUE(conta_id, fitid) bloqueia duplicatas.
+       - Se não vier fitid, compara (descricao, valor em centavos, data, conta).
+       As chaves existentes são lidas uma vez por conta, as linhas vão em
+       lotes (executemany) e tudo é gravado numa única transação, com o
+       perfil 'bulk-import'. Retorna quantidade adicionada."""
+    with storage_profile("bulk-import"), transaction() as con:
+        _, adicionadas = _ingerir(con, transacoes)
+    return adicionadas
+
+def import_ofx(path: str, conta_id, conta_nome: str, progresso=None, cancelado=None):
+    """Lê o OFX em streaming e grava direto em lotes, numa única transação.
+       progresso(feito, total, texto) e cancelado() são opcionais (tarefa em
+       segundo plano); cancelar desfaz a transação inteira.
+       Retorna (quantidade_adicionada, erro)."""
+    if not os.path.exists(path):
+        return 0, f"Arquivo não encontrado: {path}"
+    try:
+        with storage_profile("bulk-import"), transaction() as con:
+            _, adicionadas = _ingerir(con, iter_ofx(path, conta_id, conta_nome),
+                                      _aviso(progresso, cancelado))
+        return adicionadas, None
+    except Cancelado:
+        return 0, "Importação cancelada."
+    except Exception as e:
+        return 0, f"Erro ao importar OFX: {e}"
+
+# ----------------- Importação de vários arquivos -----------------
+def _conta_args(conta) -> tuple:
+    """Aceita dict {'id','nome'}, id ou nome da conta -> (conta_id, conta_nome)."""
+    if isinstance(conta, dict):
+        return conta.get("id"), conta.get("nome")
+    if isinstance(conta, int):
+        return conta, None
+    return None, conta
+
+def _parse_arquivo(path: str, conta_id, conta_nome: str, pasta: str):
+    """Roda num processo do pool: regex, datas e fingerprints; não toca no banco.
+       As transações vão em lotes de _LOTE (pickle) para um arquivo temporário
+       em `pasta`, sem montar a lista do arquivo inteiro: só o caminho volta
+       pelo pool. Retorna (caminho, erro)."""
+    if not os.path.exists(path):
+        return None, f"Arquivo não encontrado: {path}"
+    fd, destino = tempfile.mkstemp(suffix=".lotes", dir=pasta)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            lote = []
+            for t in iter_ofx(path, conta_id, conta_nome):
+                lote.append(t)
+                if len(lote) >= _LOTE:
+                    pickle.dump(lote, f, pickle.HIGHEST_PROTOCOL)
+                    lote.clear()
+            if lote:
+                pickle.dump(lote, f, pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        os.remove(destino)
+        return None, f"Erro ao ler OFX: {e}"
+    return destino, None
+
+def _ler_lotes(caminho: str):
+    """Gera as transações gravadas por _parse_arquivo, um lote por vez."""
+    with open(caminho, "rb") as f:
+        while True:
+            try:
+                lote = pickle.load(f)
+            except EOFError:
+                return
+            yield from lote
+
+def import_ofx_batch(arquivos, max_workers: int | None = None,
+                     progresso=None, cancelado=None) -> list[dict]:
+    """Importa vários OFX: o parse roda em paralelo num pool de processos e
+       um único escritor (este processo) faz dedupe e gravação, um commit por arquivo.
+       O parse devolve as transações num arquivo temporário, lido de volta em
+       lotes: a memória não cresce com o tamanho do lote de arquivos. Um
+       arquivo só é lido em streaming aqui mesmo, como em import_ofx().
+       arquivos: iterável de (path, conta), conta = dict {'id','nome'}, id ou nome.
+       progresso(arquivos_gravados, total_de_arquivos, texto) e cancelado() são
+       opcionais; cancelar mantém os arquivos já gravados e desfaz o atual.
+       Retorna, na ordem de entrada, um resumo por arquivo:
+       {'arquivo', 'lidas', 'inseridas', 'duplicadas', 'erros', 'erro'}."""
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    arquivos = [(path, _conta_args(conta)) for path, conta in arquivos]
+    resumo = [{"arquivo": path, "lidas": 0, "inseridas": 0, "duplicadas": 0, "erros": 0, "erro": None}
+              for path, _ in arquivos]
+    if not arquivos:
+        return resumo
+    aviso = _aviso(progresso, cancelado, total=len(arquivos))
+    gravados = set()                              # índices já resolvidos (gravados ou com erro)
+
+    def _gravar(i, trans, err):
+        r = resumo[i]
+        if err:
+            r["erros"], r["erro"] = 1, err
+        else:
+            try:
+                with transaction() as con:
+                    lidas, inseridas = _ingerir(con, trans, aviso)
+            except Cancelado:
+                raise
+            except OSError as e:
+                r["erros"], r["erro"] = 1, f"Erro ao ler OFX: {e}"
+            except Exception as e:
+                r["erros"], r["erro"] = 1, f"Erro ao gravar: {e}"
+            else:
+                r["lidas"], r["inseridas"], r["duplicadas"] = lidas, inseridas, lidas - inseridas
+        gravados.add(i)
+        if progresso is not None:
+            progresso(len(gravados), len(arquivos),
+                      f"{len(gravados)} de {len(arquivos)} arquivos importados")
+        if cancelado is not None and cancelado():
+            raise Cancelado()
+
+    def _marcar_cancelados():
+        for i, r in enumerate(resumo):
+            if i not in gravados:
+                r["erros"], r["erro"] = 1, "Cancelado."
+
+    with storage_profile("bulk-import"):
+        if len(arquivos) == 1:
+            path, (cid, nome) = arquivos[0]
+            erro = None if os.path.exists(path) else f"Arquivo não encontrado: {path}"
+            try:
+                _gravar(0, iter_ofx(path, cid, nome), erro)
+            except Cancelado:
+                _marcar_cancelados()
+            return resumo
+
+        with tempfile.TemporaryDirectory(prefix="ofx-lote-") as pasta, \
+                ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futuros = {pool.submit(_parse_arquivo, path, cid, nome, pasta): i
+                       for i, (path, (cid, nome)) in enumerate(arquivos)}
+            try:
+                for fut in as_completed(futuros):
+                    try:
+                        caminho, err = fut.result()
+                    except Exception as e:
+                        caminho, err = None, f"Erro ao ler OFX: {e}"
+                    trans = _ler_lotes(caminho) if caminho else ()
+                    try:
+                        _gravar(futuros[fut], trans, err)
+                    finally:
+                        if caminho:
+                            trans.close()
+                            os.remove(caminho)
+            except Cancelado:
+                for fut in futuros:
+                    fut.cancel()       # os que já estão rodando terminam e são descartados
+                _marcar_cancelados()
+    return resumo
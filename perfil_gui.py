@@ -0,0 +1,189 @@
+# gui/perfil_gui.py — perfil de travamentos do laço de eventos do Tk (opcional)
+#
+# Desligado por padrão. Liga com a variável de ambiente:
+#   FINANCEIRO_PERFIL_GUI=/tmp/gui.folded      arquivo de saída (formato "collapsed")
+#   FINANCEIRO_PERFIL_GUI_MS=100               limiar de travamento em ms (padrão 100)
+#
+# Ligado, todo callback que o Tk chama em Python (command= de botões, bind(),
+# after(), traces de variáveis) é medido: quanto tempo o laço de eventos fica
+# parado esperando por ele. Enquanto um callback roda, uma thread amostra a
+# pilha da thread do Tk a cada 5 ms; callbacks acima do limiar são
+# registrados como travamentos e suas amostras vão para o arquivo .folded
+# (uma linha "callback;quadro;quadro... N" por pilha), que abre direto no
+# flamegraph.pl ou no speedscope. O resumo por callback e a lista dos maiores
+# travamentos vão para o mesmo caminho com ".txt" no fim.
+#
+# O tempo em que um callback só espera o usuário (messagebox, filedialog,
+# wait_window) não conta como travamento.
+
+import atexit
+import os
+import sys
+import threading
+import time
+import tkinter as tk
+from collections import Counter
+from tkinter import commondialog
+
+_DESTINO = os.environ.get("FINANCEIRO_PERFIL_GUI", "").strip()
+ATIVO = bool(_DESTINO)
+try:
+    LIMIAR_MS = float(os.environ.get("FINANCEIRO_PERFIL_GUI_MS", "100"))
+except ValueError:
+    LIMIAR_MS = 100.0
+INTERVALO_AMOSTRA_S = 0.005
+_MAX_TRAVAMENTOS = 200        # guardados para o resumo (os maiores)
+
+_lock = threading.Lock()
+_callbacks = {}               # nome -> [chamadas, tempo total, máximo, travamentos]
+_travamentos = []             # (ms, nome, horário, pilha mais frequente)
+_pilhas = Counter()           # pilha "collapsed" -> amostras (só de travamentos)
+_ativos = []                  # callbacks em andamento na thread do Tk (aninham em diálogos)
+_thread_tk = None
+
+class _Execucao:
+    __slots__ = ("nome", "inicio", "pausado", "pausa", "amostras")
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.inicio = time.perf_counter()
+        self.pausado = None       # início da espera pelo usuário, se em diálogo
+        self.pausa = 0.0
+        self.amostras = Counter()
+
+def _nome_callback(fn) -> str:
+    fn = getattr(fn, "__func__", fn)
+    codigo = getattr(fn, "__code__", None)
+    # after() embrulha a função num callit(); o nome útil é o da função original
+    if codigo is not None and codigo.co_name == "callit" and "func" in codigo.co_freevars:
+        fn = fn.__closure__[codigo.co_freevars.index("func")].cell_contents
+        fn = getattr(fn, "__func__", fn)
+        codigo = getattr(fn, "__code__", None)
+    nome = getattr(fn, "__qualname__", None) or type(fn).__qualname__
+    nome = nome.replace(".<locals>", "")
+    if codigo is not None and "<lambda>" in nome:
+        nome += f":{codigo.co_firstlineno}"
+    return nome
+
+def _quadro(codigo) -> str:
+    nome = getattr(codigo, "co_qualname", codigo.co_name).replace(".<locals>", "")
+    return f"{os.path.basename(codigo.co_filename)}:{nome}".replace(";", ",")
+
+# ----------------- Amostragem -----------------
+def _amostrar():
+    while True:
+        time.sleep(INTERVALO_AMOSTRA_S)
+        execucao = _ativos[-1] if _ativos else None
+        if execucao is None or execucao.pausado is not None:
+            continue
+        quadro = sys._current_frames().get(_thread_tk)
+        pilha = []
+        while quadro is not None and quadro.f_code is not _CODIGO_CHAMADA:
+            if quadro.f_code not in _CODIGOS_TKINTER:
+                pilha.append(_quadro(quadro.f_code))
+            quadro = quadro.f_back
+        if quadro is None:
+            continue                  # o callback terminou entre a leitura e a amostra
+        pilha.reverse()
+        execucao.amostras[";".join(pilha)] += 1
+
+# ----------------- Medição dos callbacks -----------------
+class CallWrapperMedido(tk.CallWrapper):
+    """CallWrapper do tkinter que mede quanto o callback segura o laço de eventos."""
+
+    def __call__(self, *args):
+        execucao = _Execucao(_nome_callback(self.func))
+        _ativos.append(execucao)
+        try:
+            return super().__call__(*args)
+        finally:
+            _ativos.pop()
+            _contabilizar(execucao, time.perf_counter() - execucao.inicio - execucao.pausa)
+
+_CODIGO_CHAMADA = CallWrapperMedido.__call__.__code__
+# quadros do próprio tkinter entre o wrapper e o callback (ruído na pilha)
+_CODIGOS_TKINTER = {tk.CallWrapper.__call__.__code__} | {
+    c for c in tk.Misc.after.__code__.co_consts if getattr(c, "co_name", None) == "callit"}
+
+def _contabilizar(execucao, segundos: float):
+    travou = segundos * 1000 >= LIMIAR_MS
+    with _lock:
+        c = _callbacks.get(execucao.nome)
+        if c is None:
+            c = _callbacks[execucao.nome] = [0, 0.0, 0.0, 0]
+        c[0] += 1
+        c[1] += segundos
+        c[2] = max(c[2], segundos)
+        if not travou:
+            return
+        c[3] += 1
+        amostras = execucao.amostras
+        if not amostras:
+            # preso em código C sem soltar o GIL: ao menos o callback aparece
+            amostras = Counter({"": max(1, round(segundos / INTERVALO_AMOSTRA_S))})
+        for pilha, n in amostras.items():
+            _pilhas[f"{execucao.nome};{pilha}" if pilha else execucao.nome] += n
+        principal = amostras.most_common(1)[0][0]
+        _travamentos.append((segundos * 1000, execucao.nome, time.strftime("%H:%M:%S"), principal))
+        if len(_travamentos) > 2 * _MAX_TRAVAMENTOS:
+            _travamentos.sort(reverse=True)
+            del _travamentos[_MAX_TRAVAMENTOS:]
+
+def _sem_contar_espera(metodo):
+    """Embrulha um método que espera o usuário: esse tempo sai do callback."""
+    def embrulho(*args, **kwargs):
+        execucao = _ativos[-1] if _ativos else None
+        if execucao is None or execucao.pausado is not None:
+            return metodo(*args, **kwargs)
+        execucao.pausado = time.perf_counter()
+        try:
+            return metodo(*args, **kwargs)
+        finally:
+            execucao.pausa += time.perf_counter() - execucao.pausado
+            execucao.pausado = None
+    embrulho.__wrapped__ = metodo
+    return embrulho
+
+def ativar():
+    """Liga a medição. Chamar na thread do Tk, antes de criar a janela."""
+    global _thread_tk
+    if _thread_tk is not None:
+        return
+    _thread_tk = threading.get_ident()
+    tk.CallWrapper = CallWrapperMedido
+    tk.Misc.wait_window = _sem_contar_espera(tk.Misc.wait_window)
+    commondialog.Dialog.show = _sem_contar_espera(commondialog.Dialog.show)
+    threading.Thread(target=_amostrar, name="perfil-gui", daemon=True).start()
+    if _DESTINO:
+        atexit.register(gravar)
+
+# ----------------- Saída -----------------
+def resumo() -> str:
+    """Texto com os callbacks (por tempo total) e os maiores travamentos."""
+    with _lock:
+        callbacks = sorted(_callbacks.items(), key=lambda kv: kv[1][1], reverse=True)
+        travamentos = sorted(_travamentos, reverse=True)[:_MAX_TRAVAMENTOS]
+    linhas = [f"== Laço de eventos do Tk — travamento a partir de {LIMIAR_MS:g} ms", "",
+              f"{'chamadas':>9} {'total(s)':>10} {'média(ms)':>10} {'máx(ms)':>10} {'travam.':>8}  callback"]
+    for nome, (n, total, maximo, travou) in callbacks:
+        linhas.append(f"{n:>9} {total:>10.3f} {total / n * 1000:>10.2f} "
+                      f"{maximo * 1000:>10.2f} {travou:>8}  {nome}")
+    linhas += ["", "-- Maiores travamentos (ms, callback, horário, pilha mais amostrada)"]
+    if not travamentos:
+        linhas.append("   nenhum")
+    for ms, nome, hora, pilha in travamentos:
+        linhas.append(f"{ms:>10.1f}  {nome}  {hora}  {';'.join(pilha.split(';')[-3:])}")
+    return "\n".join(linhas) + "\n"
+
+def gravar(destino: str = None):
+    """Grava o .folded (pilhas dos travamentos) e o resumo em <destino>.txt."""
+    destino = destino or _DESTINO
+    with _lock:
+        pilhas = sorted(_pilhas.items())
+    try:
+        with open(destino, "w", encoding="utf-8") as f:
+            f.writelines(f"{pilha} {n}\n" for pilha, n in pilhas)
+        with open(destino + ".txt", "w", encoding="utf-8") as f:
+            f.write(resumo())
+    except OSError as e:
+        sys.stderr.write(f"perfil da GUI: não foi possível gravar {destino}: {e}\n{resumo()}")
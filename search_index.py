@@ -0,0 +1,270 @@
+# core/search_index.py — índice em memória para os filtros ao digitar da GUI
+#
+# Montado uma vez por carga e atualizado a cada inserção/edição/exclusão,
+# evita recalcular por linha e por tecla:
+#   - descrição normalizada (minúsculas, sem acentos: "agua" casa "Água"),
+#     com índice de trigramas para busca por substring;
+#   - textos exibidos já prontos: data BR e valor "r$x,xx";
+#   - valores distintos (em centavos inteiros, como no EntryStore) ordenados,
+#     para casar valor exato/faixa com bisect; somas são exatas.
+#
+# Os dados repetem muito (mesma descrição de OFX, mesma data, mesmo valor):
+# cada coluna guarda as chaves DISTINTAS uma vez e, por linha, só o id da
+# chave (array de inteiros). Trigramas e textos exibidos são por id, e ids
+# nunca mudam — inserir/excluir no meio da lista não obriga a renumerar nada.
+
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from itertools import compress
+
+from .entry_store import _centavos
+
+def normalizar(texto: str) -> str:
+    """Minúsculas e sem acentos (ASCII passa direto, que é o caso comum)."""
+    t = (texto or "").lower()
+    if t.isascii():
+        return t
+    return "".join(c for c in unicodedata.normalize("NFKD", t) if not unicodedata.combining(c))
+
+def _data_br(iso: str) -> str:
+    if len(iso) == 10 and iso[4] == "-" and iso[7] == "-":
+        return f"{iso[8:10]}/{iso[5:7]}/{iso[0:4]}"
+    return iso
+
+def _valor_exibido(centavos: int) -> str:
+    # mesmo texto da grid ("R$ 1234,50"), sem espaço e em minúsculas
+    return f"r${centavos / 100:.2f}".replace(".", ",")
+
+def _trigramas(texto: str):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+# até quantos ids aceitos vale procurar cada um nos bytes da coluna
+_MAX_IDS_BUSCA_BINARIA = 16
+
+def _posicoes_com_ids(ids_por_linha: array, aceitos) -> list:
+    """Critério seletivo (poucos ids): bytes.find em C para cada id, em vez
+       de testar as linhas uma a uma."""
+    brutos = ids_por_linha.tobytes()
+    largura = ids_por_linha.itemsize
+    achadas = []
+    for i in aceitos:
+        alvo = array(ids_por_linha.typecode, (i,)).tobytes()
+        p = brutos.find(alvo)
+        while p != -1:
+            if p % largura == 0:
+                achadas.append(p // largura)
+                p = brutos.find(alvo, p + largura)
+            else:                         # casou no meio de dois itens
+                p = brutos.find(alvo, p + 1)
+    achadas.sort()
+    return achadas
+
+def _selecionar(posicoes, ids_por_linha, aceitos):
+    """Posições cujo id está em `aceitos` (o laço roda em C)."""
+    if isinstance(posicoes, range):       # todas as linhas: percorre a coluna direto
+        if len(aceitos) <= _MAX_IDS_BUSCA_BINARIA:
+            return _posicoes_com_ids(ids_por_linha, aceitos)
+        return compress(posicoes, map(aceitos.__contains__, ids_por_linha))
+    return compress(posicoes, map(aceitos.__contains__, map(ids_por_linha.__getitem__, posicoes)))
+
+class _Coluna:
+    """Chaves distintas de uma coluna + o id da chave de cada linha.
+
+    exibir: se dado, guarda também o texto exibido de cada chave
+    trigramas: se True, indexa as chaves (texto) por trigramas
+    """
+
+    def __init__(self, exibir=None, trigramas: bool = False):
+        self.chaves = []                  # id -> chave
+        self.id_de = {}                   # chave -> id
+        self.exibidos = [] if exibir else None
+        self._exibir = exibir
+        self.tri = {} if trigramas else None   # trigrama -> array de ids
+        self.por_linha = array("I")       # posição da linha -> id da chave
+
+    def _novas(self, chaves):
+        """Registra chaves ainda não vistas (dict.fromkeys preserva a ordem)."""
+        id_de, lista = self.id_de, self.chaves
+        for k in dict.fromkeys(chaves):
+            if k in id_de:
+                continue
+            i = id_de[k] = len(lista)
+            lista.append(k)
+            if self._exibir:
+                self.exibidos.append(self._exibir(k))
+            if self.tri is not None:
+                for t in _trigramas(k):
+                    self.tri.setdefault(t, array("I")).append(i)
+
+    def estender(self, chaves: list):
+        self._novas(chaves)
+        self.por_linha.extend(map(self.id_de.__getitem__, chaves))
+
+    def id(self, chave) -> int:
+        if chave not in self.id_de:
+            self._novas((chave,))
+        return self.id_de[chave]
+
+    def ids_contendo(self, sub: str, exibido: bool = False) -> set:
+        """Ids cujas chaves (ou textos exibidos) contêm `sub`."""
+        textos = self.exibidos if exibido else self.chaves
+        if exibido or self.tri is None or len(sub) < 3:
+            return {i for i, t in enumerate(textos) if sub in t}
+        listas = []
+        for t in _trigramas(sub):
+            ids = self.tri.get(t)
+            if ids is None:
+                return set()
+            listas.append(ids)
+        listas.sort(key=len)
+        candidatos = set(listas[0])
+        for ids in listas[1:]:
+            candidatos.intersection_update(ids)
+            if not candidatos:
+                return candidatos
+        return {i for i in candidatos if sub in textos[i]}
+
+class SearchIndex:
+    """Índice das linhas de uma lista de lançamentos (dicts de models).
+
+    As posições devolvidas são as da lista, na ordem dela. O índice precisa
+    acompanhar as mutações da lista (inserir/substituir/remover), na mesma
+    ordem em que forem feitas nela.
+    """
+
+    def __init__(self, linhas=(), colunas=None):
+        """linhas: lista de lançamentos; colunas: (descrições, datas ISO, centavos)
+           já extraídas — é o que EntryStore.colunas_busca() devolve."""
+        self._lock = threading.Lock()     # filtros rodam fora da thread do Tk
+        self.desc = _Coluna(trigramas=True)
+        self.data = _Coluna(exibir=_data_br)
+        self.valor = _Coluna(exibir=_valor_exibido)
+        self._normalizadas = {}           # descrição original -> normalizada
+
+        if colunas is None and hasattr(linhas, "colunas_busca"):
+            colunas = linhas.colunas_busca()
+        if colunas is not None:
+            # EntryStore: as colunas já vêm prontas, sem passar linha a linha
+            brutas, datas, valores = colunas
+            norm = self._normalizadas
+            descs = [norm[d] if d in norm else norm.setdefault(d, normalizar(d)) for d in brutas]
+            datas = [d.lower() for d in datas]
+        else:
+            descs, datas, valores = [], [], []
+            for c in linhas:
+                d, dt, v = self._campos(c)
+                descs.append(d); datas.append(dt); valores.append(v)
+        self.desc.estender(descs)
+        self.data.estender(datas)
+        self.valor.estender(valores)
+        self._ordenados = sorted(self.valor.chaves)   # centavos distintos
+
+    def __len__(self):
+        return len(self.desc.por_linha)
+
+    # ---- manutenção ----
+    def _campos(self, c):
+        desc = c.get("descricao", "") or ""
+        norm = self._normalizadas.get(desc)
+        if norm is None:
+            norm = self._normalizadas[desc] = normalizar(desc)
+        return norm, (c.get("vencimento", "") or "").lower(), _centavos(c.get("valor"))
+
+    def _ids(self, c):
+        d, dt, v = self._campos(c)
+        novo_valor = v not in self.valor.id_de
+        ids = (self.desc.id(d), self.data.id(dt), self.valor.id(v))
+        if novo_valor:
+            insort(self._ordenados, v)
+        return ids
+
+    def _colunas(self):
+        return (self.desc, self.data, self.valor)
+
+    def inserir(self, pos: int, c):
+        with self._lock:
+            for col, i in zip(self._colunas(), self._ids(c)):
+                col.por_linha.insert(pos, i)
+
+    def substituir(self, pos: int, c):
+        with self._lock:
+            for col, i in zip(self._colunas(), self._ids(c)):
+                col.por_linha[pos] = i
+
+    def remover(self, pos: int):
+        with self._lock:
+            for col in self._colunas():
+                del col.por_linha[pos]
+
+    # ---- consulta ----
+    def soma(self, posicoes) -> float:
+        """Soma dos valores das linhas nas posições dadas (exata: soma os
+           centavos e converte para reais uma vez só)."""
+        with self._lock:
+            chaves, ids = self.valor.chaves, self.valor.por_linha
+            return sum(map(chaves.__getitem__, map(ids.__getitem__, posicoes))) / 100
+
+    def _ids_valor_entre(self, minimo: float, maximo: float) -> set:
+        """Ids dos valores (centavos) na faixa fechada [minimo, maximo] — em centavos."""
+        o = self._ordenados
+        id_de = self.valor.id_de
+        return {id_de[v] for v in o[bisect_left(o, minimo):bisect_right(o, maximo)]}
+
+    def filtrar(self, valor: float | None = None, valor_texto: str = "",
+                descricao: str = "", data: str = "", busca: str = "",
+                valor_min: float | None = None, valor_max: float | None = None,
+                cancelado=lambda: False):
+        """
+        Posições (em ordem) das linhas que atendem a todos os critérios dados:
+        - valor: numérico, casa se |v - valor| < 0.01
+        - valor_texto: substring do valor exibido "r$x,xx" (se valor for None)
+        - valor_min/valor_max: faixa fechada de valores
+        - descricao: substring da descrição (sem acento/caixa)
+        - data: substring da data ISO (AAAA-MM-DD)
+        - busca: substring da descrição, da data BR ou do valor exibido
+        Retorna None se cancelado() ficar verdadeiro no meio do caminho.
+        """
+        with self._lock:
+            # cada critério vira (ids por linha, ids aceitos)
+            testes = []
+            if valor is not None:
+                alvo = valor * 100
+                ids = {i for i in self._ids_valor_entre(alvo - 1, alvo + 1)
+                       if abs(self.valor.chaves[i] - alvo) < 1}
+                testes.append((self.valor.por_linha, ids))
+            elif valor_texto:
+                sub = valor_texto.replace(".", ",").replace(" ", "").lower()
+                testes.append((self.valor.por_linha, self.valor.ids_contendo(sub, exibido=True)))
+            if valor_min is not None or valor_max is not None:
+                lo = float("-inf") if valor_min is None else valor_min * 100
+                hi = float("inf") if valor_max is None else valor_max * 100
+                testes.append((self.valor.por_linha, self._ids_valor_entre(lo, hi)))
+            if descricao:
+                testes.append((self.desc.por_linha, self.desc.ids_contendo(normalizar(descricao))))
+            if data:
+                testes.append((self.data.por_linha, self.data.ids_contendo(data.lower())))
+
+            # o critério mais seletivo primeiro: os seguintes varrem menos linhas
+            testes.sort(key=lambda t: len(t[1]))
+            posicoes = range(len(self))
+            for ids_por_linha, aceitos in testes:
+                if cancelado():
+                    return None
+                posicoes = list(_selecionar(posicoes, ids_por_linha, aceitos))
+                if not posicoes:
+                    return []
+
+            if busca:
+                if cancelado():
+                    return None
+                sub = normalizar(busca)
+                ok = set()
+                for col, aceitos in ((self.desc, self.desc.ids_contendo(sub)),
+                                     (self.data, self.data.ids_contendo(sub, exibido=True)),
+                                     (self.valor, self.valor.ids_contendo(sub, exibido=True))):
+                    if aceitos:
+                        ok.update(_selecionar(posicoes, col.por_linha, aceitos))
+                posicoes = sorted(ok)
+            return list(posicoes)
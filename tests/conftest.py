@@ -0,0 +1,23 @@
+# core/tests/conftest.py — banco temporário para os testes do core
+#
+# Rodar a partir da raiz do projeto (onde ficam os pacotes core/ e gui/):
+#   python -m pytest core/tests
+#
+# Importar o pacote core já confere/migra o schema do banco de FINANCEIRO_DB:
+# aponta para um arquivo temporário antes que qualquer teste importe o core,
+# para nunca tocar no financeiro.db de verdade.
+
+import os
+import shutil
+import sys
+import tempfile
+
+_PASTA = tempfile.mkdtemp(prefix="financeiro-testes-")
+os.environ["FINANCEIRO_DB"] = os.path.join(_PASTA, "testes.db")
+os.environ.pop("FINANCEIRO_INSTRUMENTAR", None)
+
+def pytest_unconfigure(config):
+    database = sys.modules.get("core.database")
+    if database is not None:
+        database.close_all()
+    shutil.rmtree(_PASTA, ignore_errors=True)
@@ -0,0 +1,51 @@
+# core/tests/test_busca.py — busca por descrição no banco casa como os filtros da GUI
+#
+# Com FTS (trigram, SQLite 3.45+) ou sem ele (LIKE sobre sem_acento), a busca
+# é por substring, sem diferenciar acentos nem caixa.
+
+import pytest
+
+from core import models
+from core.database import transaction
+from core.filter_engine import FilterEngine, criterios
+
+DESCRICOES = ["Água de coco", "PAG CONTA AGUA COPASA", "Padaria São José",
+              "Desconto 100% à vista", "TED_RECEBIDA", "Aguardente"]
+
+@pytest.fixture(scope="module", autouse=True)
+def lancamentos():
+    with transaction():
+        for d in DESCRICOES:
+            models.add_entry("receber", d, "1,00", "01/05/2024", None, "Banco", "")
+
+def _no_banco(texto: str) -> list:
+    return [r["descricao"] for r in models.search_receber(descricao=texto)]
+
+def _na_gui(texto: str) -> list:
+    store = models.search_receber()
+    posicoes, _ = FilterEngine(store).filtrar(criterios(descricao=texto))
+    return [store[p]["descricao"] for p in posicoes]
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("gua", ["Água de coco", "PAG CONTA AGUA COPASA", "Aguardente"]),     # no meio da palavra
+    ("ÁGUA", ["Água de coco", "PAG CONTA AGUA COPASA", "Aguardente"]),
+    ("agua de", ["Água de coco"]),                                      # texto todo, contíguo
+    ("sao jose", ["Padaria São José"]),
+    ("de", ["Água de coco", "Desconto 100% à vista", "Aguardente"]),      # curto: sem trigrama
+    ("100%", ["Desconto 100% à vista"]),                                # % e _ são literais
+    ("d_", ["TED_RECEBIDA"]),
+    ("copasa luz", []),
+])
+def test_substring_sem_acento_nem_caixa(texto, esperado):
+    assert sorted(_no_banco(texto)) == sorted(esperado)
+
+@pytest.mark.parametrize("texto", ["gua", "agua de", "DE", "ã", "100%", "_"])
+def test_banco_e_gui_concordam(texto):
+    assert sorted(_no_banco(texto)) == sorted(_na_gui(texto))
+
+def test_busca_acompanha_edicao():
+    item = models.search_receber(descricao="aguardente")[0]
+    models.edit_entry("receber", item["id"], "Cachaça", "1,00", "01/05/2024", item["conta_id"], "", "")
+    assert _no_banco("aguardente") == []
+    assert _no_banco("cachaca") == ["Cachaça"]
+    models.edit_entry("receber", item["id"], "Aguardente", "1,00", "01/05/2024", item["conta_id"], "", "")
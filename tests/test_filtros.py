@@ -0,0 +1,143 @@
+# core/tests/test_filtros.py — filtros ao digitar: FilterEngine e SearchIndex
+
+import pytest
+
+from core.database import transaction
+from core.entry_store import EntryStore, _centavos
+from core.filter_engine import FilterEngine, criterios, parse_valor
+from core.search_index import SearchIndex, normalizar
+
+LANCAMENTOS = [
+    {"id": 1, "descricao": "Água de coco", "valor": 7.5, "vencimento": "2024-01-05", "pago": True},
+    {"id": 2, "descricao": "PAG CONTA AGUA COPASA", "valor": 132.9, "vencimento": "2024-01-10", "pago": False},
+    {"id": 3, "descricao": "Padaria São José", "valor": 0.1, "vencimento": "2024-02-01", "pago": False},
+    {"id": 4, "descricao": "Padaria Sao Jose", "valor": 0.2, "vencimento": "2024-02-15", "pago": True},
+    {"id": 5, "descricao": "Aluguel", "valor": 1500.0, "vencimento": "2024-02-15", "pago": False},
+    {"id": 6, "descricao": "Farmácia", "valor": 132.9, "vencimento": "2024-03-20", "pago": False},
+]
+
+@pytest.fixture(params=["lista", "store"])
+def motor(request):
+    """FilterEngine sobre uma lista de dicts e sobre um EntryStore."""
+    if request.param == "lista":
+        lista = [dict(c) for c in LANCAMENTOS]
+    else:
+        lista = EntryStore("pagar", LANCAMENTOS)
+    return FilterEngine(lista)
+
+def _ids(motor, **campos):
+    posicoes, _ = motor.filtrar(criterios(**campos))
+    return [motor._lista[p]["id"] for p in posicoes]
+
+# ---- critérios ----
+def test_parse_valor():
+    assert parse_valor("1.234,56") == 1234.56
+    assert parse_valor("R$ 1234.56") == 1234.56
+    assert parse_valor("7,5") == 7.5
+    with pytest.raises(ValueError):
+        parse_valor("  ")
+
+def test_campos_vazios_nao_filtram():
+    assert criterios() is None
+    assert criterios(valor=" ", descricao="", data="", busca="  ") is None
+
+def test_valor_texto_nao_numerico():
+    assert criterios(valor="r$ 13")["valor_texto"] == "r$ 13"
+    assert "valor" not in criterios(valor="r$ 13")
+
+# ---- filtros ----
+def test_filtros_combinados(motor):
+    assert _ids(motor, valor="132,90") == [2, 6]
+    assert _ids(motor, valor="132,90", data="2024-03") == [6]
+    assert _ids(motor, descricao="padaria", data="2024-02") == [3, 4]
+    assert _ids(motor, descricao="padaria", data="2024-02-15", valor="0,20") == [4]
+    assert _ids(motor, descricao="padaria", valor="1500") == []
+
+def test_busca_geral_casa_descricao_data_e_valor(motor):
+    assert _ids(motor, busca="15/02/2024") == [4, 5]
+    assert _ids(motor, busca="1500,00") == [5]
+    assert _ids(motor, busca="aluguel") == [5]
+    assert _ids(motor, busca="02/2024", descricao="sao") == [3, 4]
+
+def test_valor_exibido_parcial(motor):
+    assert _ids(motor, valor="r$ 132") == [2, 6]
+    assert _ids(motor, valor="r$0,") == [3, 4]
+
+def test_sem_diferenciar_acentos_nem_caixa(motor):
+    assert normalizar("Água São José") == "agua sao jose"
+    assert _ids(motor, descricao="agua") == [1, 2]
+    assert _ids(motor, descricao="ÁGUA") == [1, 2]
+    assert _ids(motor, descricao="são josé") == [3, 4]
+    assert _ids(motor, descricao="gua") == [1, 2]          # substring no meio da palavra
+    assert _ids(motor, busca="farmacia") == [6]
+
+def test_cancelado_no_meio(motor):
+    assert motor.filtrar(criterios(descricao="agua"), cancelado=lambda: True) is None
+
+# ---- índice acompanhando as mutações ----
+def test_indice_acompanha_inserir_substituir_remover(motor):
+    assert _ids(motor, descricao="agua") == [1, 2]           # monta o índice
+    indice = motor.indice()
+
+    motor.inserir(1, {"id": 7, "descricao": "Água mineral", "valor": 3.0, "vencimento": "2024-01-07"})
+    assert _ids(motor, descricao="agua") == [1, 7, 2]
+    assert _ids(motor, valor="3") == [7]
+
+    motor.substituir(2, {"id": 2, "descricao": "Conta de luz", "valor": 90.0, "vencimento": "2024-01-10"})
+    assert _ids(motor, descricao="agua") == [1, 7]
+    assert _ids(motor, busca="luz") == [2]
+    assert _ids(motor, valor="132,90") == [6]
+
+    motor.remover(0)
+    assert _ids(motor, descricao="agua") == [7]
+    assert _ids(motor, data="2024-02") == [3, 4, 5]
+
+    assert motor.indice() is indice                          # atualizado, não remontado
+    assert len(indice) == len(motor._lista)
+    novo = SearchIndex(motor._lista)
+    crit = criterios(busca="a")
+    assert novo.filtrar(**crit) == indice.filtrar(**crit)
+
+def test_carregar_descarta_o_indice(motor):
+    indice = motor.indice()
+    motor.carregar(EntryStore("pagar", LANCAMENTOS[:2]))
+    assert motor.indice() is not indice
+    assert _ids(motor, descricao="padaria") == []
+
+# ---- totais ----
+def test_soma_das_posicoes_filtradas(motor):
+    # somados em centavos: 0,10 + 0,20 dá 0,30 exato (em float daria 0.30000000000000004)
+    posicoes, soma = motor.filtrar(criterios(descricao="padaria"))
+    assert soma == 0.3
+    _, soma = motor.filtrar(criterios(valor="132,90"))
+    assert soma == 265.8
+    indice = motor.indice()
+    assert indice.soma([]) == 0
+    assert indice.soma(range(len(LANCAMENTOS))) == 1773.6
+
+def test_faixa_de_valores(motor):
+    posicoes = motor.indice().filtrar(valor_min=0.2, valor_max=132.9)
+    assert [motor._lista[p]["id"] for p in posicoes] == [1, 2, 4, 6]
+
+def test_soma_do_store_em_centavos():
+    store = EntryStore("pagar", LANCAMENTOS)
+    assert store.soma() == 1773.6
+    assert store.soma([2, 3]) == 0.3
+
+def test_store_arredonda_meio_centavo_para_cima():
+    # não para o par, como round() em float
+    store = EntryStore("pagar", [{"id": 1, "valor": 0.285}, {"id": 2, "valor": "1.005"}, {"id": 3}])
+    assert list(store.centavos) == [29, 101, 0]
+
+@pytest.mark.parametrize("valor", [0.285, 1.005, 0.145, 2.675, 1234.565, 0.1, 99.995, 0, None])
+def test_centavos_como_o_banco(valor):
+    # grava só 'valor' por SQL cru (como versões antigas): quem preenche
+    # valor_centavos é o trigger do banco, que tem de concordar com _centavos
+    with transaction() as con:
+        con.execute("INSERT OR IGNORE INTO contas_financeiras (nome) VALUES ('Centavos')")
+        cur = con.execute("INSERT INTO contas_a_pagar (descricao, valor, data, conta_id) "
+                          "SELECT 'c', ?, '2024-01-01', id FROM contas_financeiras WHERE nome = 'Centavos'",
+                          (valor,))
+        gravado = con.execute("SELECT valor_centavos FROM contas_a_pagar WHERE id = ?",
+                              (cur.lastrowid,)).fetchone()[0]
+    assert gravado == _centavos(valor)
@@ -0,0 +1,57 @@
+# core/tests/test_indices.py — filtros por período/conta/categoria usam os índices
+#
+# Confere com EXPLAIN QUERY PLAN a consulta que iter_entries manda de verdade
+# ao SQLite (capturada pelo trace da conexão), não uma cópia dela.
+
+import pytest
+
+from core import models
+from core.database import get_conn, transaction
+
+@pytest.fixture(scope="module", autouse=True)
+def lancamentos():
+    with transaction():
+        for mes in range(1, 13):
+            for dia in (1, 15, 28):
+                models.add_entry("pagar", f"Mercado {mes}/{dia}", "10,00", f"{dia:02d}/{mes:02d}/2024",
+                                 None, "Banco", "Mercado" if dia == 1 else "Aluguel")
+
+def _plano(tipo: str, **filtros) -> str:
+    """Plano (EXPLAIN QUERY PLAN) da consulta de iter_entries com esses filtros."""
+    con = get_conn()
+    consultas = []
+    con.set_trace_callback(consultas.append)
+    try:
+        list(models.iter_entries(tipo, **filtros))
+    finally:
+        con.set_trace_callback(None)
+    sql = next(s for s in consultas if s.lstrip().upper().startswith("SELECT"))
+    return "\n".join(linha[-1] for linha in con.execute("EXPLAIN QUERY PLAN " + sql))
+
+def _conta_id() -> int:
+    return get_conn().execute("SELECT id FROM contas_financeiras WHERE nome = 'Banco'").fetchone()[0]
+
+def test_filtros_devolvem_as_linhas():
+    assert len(models.search_pagar(ano=2024, mes=3)) == 3
+    assert len(models.search_pagar(categoria="Mercado", ano=2024)) == 12
+
+@pytest.mark.parametrize("filtros", [
+    {"ano": 2024, "mes": 3},
+    {"ano": 2024},
+    {"data_ini": "01/02/2024", "data_fim": "29/02/2024"},
+])
+def test_periodo_usa_indice_data_id(filtros):
+    plano = _plano("pagar", **filtros)
+    assert "ix_pagar_data_id (data>? AND data<?)" in plano, plano
+
+def test_conta_e_periodo_usam_indice_conta_data_valor():
+    plano = _plano("pagar", conta_id=_conta_id(), ano=2024, mes=6)
+    assert "ix_pagar_conta_data_valor (conta_id=? AND data>? AND data<?)" in plano, plano
+
+def test_categoria_e_periodo_usam_indice_categoria_data():
+    plano = _plano("pagar", categoria="Mercado", data_ini="01/01/2024", data_fim="30/06/2024")
+    assert "ix_pagar_categoria_data (categoria=? AND data>? AND data<?)" in plano, plano
+
+def test_sem_filtro_ordena_pelo_indice_data_id():
+    plano = _plano("pagar")
+    assert "ix_pagar_data_id" in plano and "TEMP B-TREE" not in plano, plano
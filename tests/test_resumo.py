@@ -0,0 +1,61 @@
+# core/tests/test_resumo.py — resumo_mensal mantido pelos triggers == reconstruído do zero
+#
+# As escritas vão por SQL cru, como as de versões antigas do programa no mesmo
+# banco: data NULL ou vazia, e valor gravado só em 'valor' (sem valor_centavos).
+
+import random
+
+from core import database
+from core.database import get_conn, rebuild_resumo_mensal, transaction
+
+def _resumo() -> list:
+    cur = get_conn().execute("SELECT * FROM resumo_mensal ORDER BY ano, mes, conta_id, categoria, tipo, status")
+    return [tuple(r) for r in cur]
+
+def _conta() -> int:
+    with transaction() as con:
+        con.execute("INSERT OR IGNORE INTO contas_financeiras (nome) VALUES ('Resumo')")
+        return con.execute("SELECT id FROM contas_financeiras WHERE nome = 'Resumo'").fetchone()[0]
+
+def test_data_nula_entra_como_ano_e_mes_zero():
+    cid = _conta()
+    with transaction() as con:
+        con.execute("INSERT INTO contas_a_pagar (descricao, valor, data, conta_id) VALUES ('y', 1, NULL, ?)", (cid,))
+    ano_mes = get_conn().execute("SELECT ano, mes FROM resumo_mensal WHERE conta_id = ?", (cid,)).fetchall()
+    assert [tuple(r) for r in ano_mes] == [(0, 0)]
+
+def test_triggers_concordam_com_a_reconstrucao():
+    cid = _conta()
+    sorteio = random.Random(20)
+    datas = [None, "", "2024-01-15", "2024-02-01", "2023-12-31", "lixo"]
+    categorias = [None, "", "Mercado", "Aluguel"]
+    for _ in range(400):
+        tabela, status = sorteio.choice((("contas_a_pagar", "pago"), ("contas_a_receber", "recebido")))
+        ids = [r[0] for r in get_conn().execute(f"SELECT id FROM {tabela}")]
+        acao = sorteio.random()
+        with transaction() as con:
+            if acao < 0.4 or not ids:
+                con.execute(f"INSERT INTO {tabela} (descricao, valor, data, conta_id, categoria, {status}) "
+                            "VALUES ('x', ?, ?, ?, ?, ?)",
+                            (sorteio.randint(1, 99999) / 100, sorteio.choice(datas), cid,
+                             sorteio.choice(categorias), sorteio.randint(0, 1)))
+            elif acao < 0.6:
+                con.execute(f"UPDATE {tabela} SET valor = ? WHERE id = ?",      # só 'valor'
+                            (sorteio.randint(1, 99999) / 100, sorteio.choice(ids)))
+            elif acao < 0.75:
+                con.execute(f"UPDATE {tabela} SET data = ? WHERE id = ?", (sorteio.choice(datas), sorteio.choice(ids)))
+            elif acao < 0.85:
+                con.execute(f"UPDATE {tabela} SET {status} = 1 - {status}, categoria = ? WHERE id = ?",
+                            (sorteio.choice(categorias), sorteio.choice(ids)))
+            else:
+                con.execute(f"DELETE FROM {tabela} WHERE id = ?", (sorteio.choice(ids),))
+
+    mantido = _resumo()
+    assert mantido
+    rebuild_resumo_mensal()
+    assert _resumo() == mantido
+
+def test_migracao_refaz_os_triggers():
+    assert get_conn().execute("PRAGMA user_version").fetchone()[0] == database.SCHEMA_VERSAO
+    nomes = {r[0] for r in get_conn().execute("SELECT name FROM sqlite_master WHERE type='trigger'")}
+    assert {f"trg_resumo_{t}_{e}" for t in ("pagar", "receber") for e in ("ai", "ad", "au")} <= nomes